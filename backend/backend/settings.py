@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Runtime state shared by the processes on this host (revocation list, push
+# spool, throttle buckets, response cache, metrics...). Kept out of the
+# source tree's tracked files; point VAR_DIR elsewhere in production.
+VAR_DIR = Path(os.environ.get('VAR_DIR', BASE_DIR / 'var'))
+VAR_DIR.mkdir(parents=True, exist_ok=True)
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -49,6 +56,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'complaint_system.metrics.MetricsMiddleware',
+    'complaint_system.concurrency.ConcurrencyLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,12 +69,28 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'complaint_system.auth.ClaimsAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'complaint_system.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Token buckets, '<burst>/<period>' per '<scope>.<user|ip|endpoint>'
+    # (see complaint_system/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login.user': '5/min',
+        'login.ip': '20/min',
+        'login.endpoint': '50/s',
+        'register.ip': '10/hour',
+        'register.endpoint': '20/min',
+        'complaint-create.user': '10/min',
+        'complaint-create.ip': '30/min',
+        'complaint-create.endpoint': '50/s',
+    },
 }
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React frontend
@@ -95,10 +120,28 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for many concurrent readers and writers (see
+# complaint_system/storage.py): WAL so reads never wait on the writer,
+# transactions that take the write lock up front and wait for it, and
+# connections kept open between requests.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 10,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA wal_autocheckpoint=1000;'
+            ),
+        },
     }
 }
 
@@ -126,6 +169,18 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_REFRESH_SERIALIZER': 'complaint_system.auth.ClaimsTokenRefreshSerializer',
+}
+
+# Role/worker claims in access tokens (see complaint_system/auth.py)
+JWT_CLAIMS = {
+    'VERSION_CACHE_SECONDS': 30,
+}
+
+# Logout/revocation list (see complaint_system/revocation.py)
+TOKEN_REVOCATION = {
+    'STORE_PATH': VAR_DIR / 'revoked_tokens.sqlite3',
+    'SYNC_SECONDS': 1.0,
 }
 
 
@@ -150,3 +205,77 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Background job queue (see complaint_system/jobs.py); run workers with
+# `python manage.py run_jobs --processes N`
+JOB_QUEUE = {
+    'EAGER': False,
+    'VISIBILITY_TIMEOUT': 60,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+}
+
+# Cached API responses (see complaint_system/response_cache.py). Every server
+# process must share this cache, so it is file-based rather than local-memory.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': VAR_DIR / 'response_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Complaint validation engine (see complaint_system/validation.py)
+COMPLAINT_VALIDATION = {
+    'SCORER': 'complaint_system.validation.KeywordTfidfScorer',
+    'THRESHOLD': 0.35,
+    'BATCH_SIZE': 1000,
+}
+
+# Near-duplicate complaint detection (see complaint_system/duplicates.py)
+COMPLAINT_DUPLICATES = {
+    'THRESHOLD': 0.5,
+    'RADIUS_KM': 0.5,
+    'WINDOW_HOURS': 72,
+}
+
+# Real-time notification push (see complaint_system/push.py). The spool is a
+# SQLite file every server and job process on this host must be able to reach.
+PUSH = {
+    'SPOOL_PATH': VAR_DIR / 'push_spool.sqlite3',
+    'POLL_INTERVAL': 0.25,
+    'KEEPALIVE_SECONDS': 15,
+}
+
+# Retries of writes that find the database locked (see complaint_system/storage.py)
+DATABASE_RETRY = {
+    'RETRIES': 5,
+    'BACKOFF': 0.02,
+}
+
+# Rate-limit buckets (see complaint_system/throttling.py), in a SQLite file
+# shared by every server process on this host.
+THROTTLE = {
+    'ENABLED': os.environ.get('THROTTLE_ENABLED', '1') != '0',
+    'STORE_PATH': VAR_DIR / 'throttle.sqlite3',
+}
+
+# Requests in flight across all server processes on this host (see
+# complaint_system/concurrency.py); the rest get 503 with Retry-After.
+CONCURRENCY_LIMIT = {
+    'MAX_CONCURRENT': 32,
+    'LOCK_DIR': VAR_DIR / 'concurrency_slots',
+    'WAIT_SECONDS': 0.5,
+}
+
+# Request and operation metrics, scraped at /metrics (see
+# complaint_system/metrics.py). Every process writes its numbers to DIRECTORY.
+METRICS = {
+    'DIRECTORY': VAR_DIR / 'metrics',
+    'FLUSH_SECONDS': 5,
+    'TOKEN': os.environ.get('METRICS_TOKEN', ''),
+}
@@ -6,4 +6,5 @@ class ComplaintSystemConfig(AppConfig):
     name = 'complaint_system'
     
     def ready(self):
-        import complaint_system.signals  # This connects the signals
\ No newline at end of file
+        import complaint_system.signals  # This connects the signals
+        import complaint_system.tasks  # This registers the background jobs
\ No newline at end of file
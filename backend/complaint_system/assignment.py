@@ -0,0 +1,344 @@
+# complaint_system/assignment.py
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import counters, inbox, push, response_cache, rollups
+from .duplicates import resolve_duplicates
+from .models import Complaint, ComplaintAssignmentLog, Worker, Notification
+from .spatial import WorkerGridIndex
+from .metrics import timed
+from .storage import retry_on_locked
+
+# Candidates fetched from the index per lookup round; stale entries are
+# dropped and the next round picks up the following nearest workers.
+CANDIDATES_PER_LOOKUP = 5
+
+worker_index = WorkerGridIndex(cell_size=getattr(settings, 'WORKER_INDEX_CELL_SIZE', 0.01))
+_index_loaded_at = None
+
+
+def get_worker_index():
+    """
+    Return the process-wide worker index, (re)loading it from the database on
+    first use and every ``WORKER_INDEX_REFRESH_SECONDS`` afterwards. Between
+    reloads it is kept current by the ``Worker`` signals in ``signals.py``;
+    the periodic reload only catches changes made by other processes or by
+    ``QuerySet.update()``.
+    """
+    global _index_loaded_at
+    refresh = getattr(settings, 'WORKER_INDEX_REFRESH_SECONDS', 300)
+    now = time.monotonic()
+    if _index_loaded_at is None or now - _index_loaded_at > refresh:
+        rows = Worker.objects.filter(is_available=True).values_list('id', 'latitude', 'longitude')
+        worker_index.load(rows.iterator())
+        _index_loaded_at = now
+    return worker_index
+
+
+def sync_worker(worker, deleted=False):
+    """Reflect a saved or deleted worker in the index"""
+    if deleted:
+        worker_index.remove(worker.id)
+    else:
+        worker_index.update(worker.id, worker.is_available, worker.latitude, worker.longitude)
+
+
+@retry_on_locked
+def reserve_worker(worker_id):
+    """
+    Take one capacity slot on a worker. The check and the increment are a
+    single conditional UPDATE, so concurrent reservations can never push a
+    worker past ``max_active_complaints`` and no row lock is held.
+    """
+    reserved = Worker.objects.filter(
+        id=worker_id,
+        is_available=True,
+        active_complaint_count__lt=F('max_active_complaints'),
+    ).update(active_complaint_count=F('active_complaint_count') + 1) == 1
+    return reserved
+
+
+@retry_on_locked
+def release_worker(worker_id):
+    """Give back a capacity slot taken by ``reserve_worker``"""
+    Worker.objects.filter(id=worker_id, active_complaint_count__gt=0).update(
+        active_complaint_count=F('active_complaint_count') - 1
+    )
+
+
+@timed('reserve_nearest_worker')
+def reserve_nearest_worker(latitude, longitude):
+    """
+    Reserve a slot on the nearest available worker with spare capacity and
+    return that worker, or ``None``.
+
+    Each round checks a handful of index candidates in one query; workers
+    that turned out to be unavailable are evicted from the index, workers
+    that are merely full are skipped for this lookup only.
+    """
+    index = get_worker_index()
+    skipped = set()
+    while True:
+        candidates = index.nearest(latitude, longitude, limit=CANDIDATES_PER_LOOKUP, exclude=skipped)
+        if not candidates:
+            return None
+        ids = [worker_id for worker_id, _ in candidates]
+        rows = Worker.objects.filter(id__in=ids).values_list(
+            'id', 'is_available', 'active_complaint_count', 'max_active_complaints'
+        )
+        state = {row[0]: row[1:] for row in rows}
+        for worker_id in ids:
+            skipped.add(worker_id)
+            is_available, active, capacity = state.get(worker_id, (False, 0, 0))
+            if not is_available:
+                index.remove(worker_id)
+            elif active < capacity and reserve_worker(worker_id):
+                return Worker.objects.select_related('user').get(id=worker_id)
+
+
+def assign_complaint(complaint, worker, message=None):
+    """
+    Assign ``complaint`` to ``worker``, whose slot the caller has already
+    reserved, and optionally notify the worker.
+
+    The complaint row is only updated if it still has the status and worker
+    we loaded, so two concurrent assignments of one complaint cannot both
+    win. The loser gets ``False`` back and its reservation is released.
+    """
+    previous_status = complaint.status
+    previous_worker_id = complaint.assigned_worker_id
+    assigned_at = timezone.now()
+    with transaction.atomic():
+        updated = Complaint.objects.filter(
+            id=complaint.id, status=previous_status, assigned_worker_id=previous_worker_id
+        ).update(assigned_worker=worker, status='ASSIGNED', assigned_at=assigned_at, updated_at=assigned_at)
+        if updated:
+            counters.record_status_change(previous_status, 'ASSIGNED')
+            rollups.record_change([complaint], previous_status, 'ASSIGNED')
+            response_cache.invalidate(Complaint)
+    if not updated:
+        release_worker(worker.id)
+        return False
+    if previous_status == 'ASSIGNED' and previous_worker_id:
+        release_worker(previous_worker_id)
+
+    complaint.assigned_worker = worker
+    complaint.status = 'ASSIGNED'
+    complaint.assigned_at = assigned_at
+    complaint.updated_at = assigned_at
+    if message:
+        Notification.objects.create(worker=worker, complaint=complaint, message=message)
+    return True
+
+
+@timed('auto_assign_complaint')
+def auto_assign_complaint(complaint, message=None):
+    """Assign ``complaint`` to the nearest worker with capacity; returns the worker or ``None``"""
+    worker = reserve_nearest_worker(complaint.latitude, complaint.longitude)
+    if worker is None or not assign_complaint(complaint, worker, message=message):
+        return None
+    return worker
+
+
+@timed('change_complaint_status')
+def change_complaint_status(complaint, new_status):
+    """
+    Move ``complaint`` to ``new_status``, freeing its worker's slot when it
+    leaves ASSIGNED and resolving its duplicates with it. Returns ``False`` if the complaint changed concurrently.
+    """
+    previous_status = complaint.status
+    changes = {'status': new_status, 'updated_at': timezone.now()}
+    if new_status == 'RESOLVED':
+        changes['resolved_at'] = changes['updated_at']
+    if new_status == 'PENDING':
+        changes['assigned_worker'] = None
+        changes['assigned_at'] = None
+    with transaction.atomic():
+        updated = Complaint.objects.filter(id=complaint.id, status=previous_status).update(**changes)
+        if updated:
+            counters.record_status_change(previous_status, new_status)
+            rollups.record_change([complaint], previous_status, new_status)
+            response_cache.invalidate(Complaint)
+            if new_status == 'RESOLVED':
+                resolve_duplicates(complaint.id, changes['resolved_at'])
+    if not updated:
+        return False
+    if previous_status == 'ASSIGNED' and new_status != 'ASSIGNED' and complaint.assigned_worker_id:
+        release_worker(complaint.assigned_worker_id)
+    for field, value in changes.items():
+        setattr(complaint, field, value)
+    return True
+
+
+# Batch assignment tuning: how many nearest workers are considered per
+# complaint in each matching round, and how many kilometres of extra travel
+# a fully loaded worker is "worth" when breaking ties between workers.
+BATCH_CANDIDATES = 8
+BATCH_MAX_ROUNDS = 4
+LOAD_PENALTY_KM = 2.0
+UNLOCATED_COST_KM = 1000.0
+
+
+def plan_assignments(complaints, workers):
+    """
+    Globally match complaints to workers in one pass.
+
+    ``complaints`` are ``(complaint_id, latitude, longitude)`` tuples and
+    ``workers`` are ``(worker_id, latitude, longitude, active, capacity)``
+    tuples. Every complaint gets edges to its nearest workers (cost =
+    distance plus a load penalty); edges are taken cheapest-first while the
+    complaint is unmatched and the worker has a free slot. Complaints whose
+    candidates all fill up are retried against the remaining workers.
+    Returns ``{complaint_id: (worker_id, distance_km)}``.
+    """
+    remaining = {w[0]: w[4] - w[3] for w in workers if w[4] > w[3]}
+    load = {w[0]: (w[3] / w[4]) if w[4] else 1.0 for w in workers}
+    positions = {w[0]: (w[1], w[2]) for w in workers}
+    plan = {}
+    unmatched = list(complaints)
+
+    for _ in range(BATCH_MAX_ROUNDS):
+        if not unmatched or not remaining:
+            break
+        index = WorkerGridIndex(cell_size=worker_index.cell_size)
+        index.load((worker_id,) + positions[worker_id] for worker_id in remaining)
+
+        edges = []
+        for complaint_id, latitude, longitude in unmatched:
+            for worker_id, distance in index.nearest(latitude, longitude, limit=BATCH_CANDIDATES):
+                cost = (UNLOCATED_COST_KM if distance is None else distance) + LOAD_PENALTY_KM * load[worker_id]
+                edges.append((cost, complaint_id, worker_id, distance))
+        edges.sort(key=lambda edge: edge[:3])
+
+        for cost, complaint_id, worker_id, distance in edges:
+            if complaint_id in plan or not remaining.get(worker_id):
+                continue
+            plan[complaint_id] = (worker_id, distance)
+            remaining[worker_id] -= 1
+            if not remaining[worker_id]:
+                del remaining[worker_id]
+
+        unmatched = [c for c in unmatched if c[0] not in plan]
+    return plan
+
+
+def _shift_worker_load(deltas):
+    """Apply ``{worker_id: delta}`` to active_complaint_count, one UPDATE per 500 workers"""
+    items = [(worker_id, delta) for worker_id, delta in deltas.items() if delta]
+    for start in range(0, len(items), 500):
+        chunk = items[start:start + 500]
+        Worker.objects.filter(id__in=[worker_id for worker_id, _ in chunk]).update(
+            active_complaint_count=F('active_complaint_count') + Case(
+                *[When(id=worker_id, then=Value(delta)) for worker_id, delta in chunk],
+                default=Value(0),
+            )
+        )
+
+
+@timed('batch_assign_pending')
+def batch_assign_pending(limit=None):
+    """
+    Assign PENDING, unassigned, non-duplicate complaints (oldest first, up to ``limit``)
+    in one global matching pass and write the result with a handful of
+    bulk queries. Returns ``(assigned, considered)`` counts.
+
+    Only the oldest ``BATCH_CANDIDATES`` complaints per free worker slot
+    are considered, so a large backlog costs no more than the capacity it
+    can actually fill; the rest wait for the next pass.
+    """
+    workers = list(Worker.objects.filter(
+        is_available=True, active_complaint_count__lt=F('max_active_complaints')
+    ).values_list('id', 'latitude', 'longitude', 'active_complaint_count', 'max_active_complaints'))
+    free_slots = sum(capacity - active for _, _, _, active, capacity in workers)
+    window = free_slots * BATCH_CANDIDATES
+    if limit:
+        window = min(window, limit)
+    if not window:
+        return 0, 0
+    pending = Complaint.objects.filter(
+        status='PENDING', assigned_worker__isnull=True, duplicate_of__isnull=True
+    ).order_by('created_at')
+    complaints = list(pending.values_list('id', 'latitude', 'longitude')[:window])
+    plan = plan_assignments(complaints, workers)
+    if not plan:
+        return 0, len(complaints)
+
+    with transaction.atomic():
+        # Take the slots first: it is one relative UPDATE, so it cannot lose
+        # concurrent reservations, and on SQLite it grabs the write lock
+        # before anything below is read.
+        taken = Counter(worker_id for worker_id, _ in plan.values())
+        _shift_worker_load(taken)
+
+        # Drop complaints assigned elsewhere meanwhile, and give back slots
+        # on workers that concurrent reservations pushed over capacity.
+        still_pending = set(
+            Complaint.objects.select_for_update()
+            .filter(id__in=plan, status='PENDING', assigned_worker__isnull=True)
+            .values_list('id', flat=True)
+        )
+        overflow = dict(
+            Worker.objects.filter(id__in=taken, active_complaint_count__gt=F('max_active_complaints'))
+            .annotate(excess=F('active_complaint_count') - F('max_active_complaints'))
+            .values_list('id', 'excess')
+        )
+        give_back = Counter()
+        for complaint_id, (worker_id, _) in plan.items():
+            if complaint_id not in still_pending:
+                give_back[worker_id] -= 1
+        for worker_id, excess in overflow.items():
+            excess += give_back[worker_id]
+            if excess <= 0:
+                continue
+            mine = sorted((c for c in still_pending if plan[c][0] == worker_id), reverse=True)
+            for complaint_id in mine[:excess]:
+                still_pending.discard(complaint_id)
+                give_back[worker_id] -= 1
+        _shift_worker_load(give_back)
+
+        assigned_at = timezone.now()
+        assigned = list(Complaint.objects.filter(id__in=still_pending).only('id', 'category', 'created_at'))
+        for complaint in assigned:
+            complaint.assigned_worker_id = plan[complaint.id][0]
+            complaint.status = 'ASSIGNED'
+            complaint.assigned_at = assigned_at
+            complaint.updated_at = assigned_at
+        Complaint.objects.bulk_update(assigned, ['assigned_worker', 'status', 'assigned_at', 'updated_at'],
+                                      batch_size=500)
+        counters.record_status_change('PENDING', 'ASSIGNED', len(assigned))
+        rollups.record_change(assigned, 'PENDING', 'ASSIGNED')
+        response_cache.invalidate(Complaint, Notification)
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                worker_id=complaint.assigned_worker_id,
+                complaint=complaint,
+                message=f"New complaint assigned to you: {complaint.get_category_display()}",
+                created_at=assigned_at,
+            )
+            for complaint in assigned
+        ], batch_size=500)
+        inbox.record_created(notifications)
+        push.publish_notifications(notifications)
+        ComplaintAssignmentLog.objects.bulk_create([
+            ComplaintAssignmentLog(
+                complaint=complaint,
+                attempted_worker_id=complaint.assigned_worker_id,
+                attempted_at=assigned_at,
+                was_assigned=True,
+                reason=_batch_reason(plan[complaint.id][1]),
+            )
+            for complaint in assigned
+        ], batch_size=500)
+    return len(assigned), len(complaints)
+
+
+def _batch_reason(distance):
+    if distance is None:
+        return "Batch assignment (no location)"
+    return f"Batch assignment: {distance:.2f} km away"
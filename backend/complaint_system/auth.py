@@ -0,0 +1,144 @@
+# complaint_system/auth.py
+"""
+Claims-based JWT authentication.
+
+Tokens issued by ``issue_tokens()`` carry the user's ``role``,
+``worker_id`` and token version (``ver``). ``ClaimsAuthentication``
+builds a ``ClaimsUser`` from those claims, so permission checks and worker
+lookups need no query for the user row.
+
+Changing a user's role or active flag, or creating or deleting their worker
+profile, bumps ``CustomUser.token_version`` (see ``signals.py``). Each
+request compares the token's version with the current one, which is
+cached for ``VERSION_CACHE_SECONDS``; an outdated token falls back to
+loading the user row like ``JWTAuthentication`` does, so the change takes
+effect everywhere within that window. Refreshing issues an access token
+with the new claims.
+
+Both also reject tokens on the revocation list (``revocation.py``).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+from .revocation import is_revoked
+
+DEFAULTS = {
+    'VERSION_CACHE_SECONDS': 30,  # How long a role change may take to reach every process
+    'CACHE': 'default',
+}
+
+
+def claims_setting(name):
+    return getattr(settings, 'JWT_CLAIMS', {}).get(name, DEFAULTS[name])
+
+
+def _version_key(user_id):
+    return f"token-version:{user_id}"
+
+
+def add_claims(token, user):
+    token['username'] = user.username
+    token['role'] = user.role
+    token['worker_id'] = user.worker_id
+    token['ver'] = user.token_version
+    return token
+
+
+def issue_tokens(user):
+    """``{'refresh': ..., 'access': ...}`` for ``user``, both carrying its claims"""
+    refresh = add_claims(RefreshToken.for_user(user), user)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+def current_version(user_id):
+    """The user's token version, or ``None`` if the user is gone or inactive"""
+    cache = caches[claims_setting('CACHE')]
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        row = CustomUser.objects.filter(id=user_id).values_list('token_version', 'is_active').first()
+        version = row[0] if row and row[1] else -1
+        cache.set(key, version, timeout=claims_setting('VERSION_CACHE_SECONDS'))
+    return None if version == -1 else version
+
+
+def forget_versions(user_ids):
+    """Drop cached versions once the transaction commits"""
+    keys = [_version_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: caches[claims_setting('CACHE')].delete_many(keys))
+
+
+def bump_token_version(user_ids):
+    """Invalidate the claims in every token issued to ``user_ids``"""
+    CustomUser.objects.filter(id__in=user_ids).update(token_version=F('token_version') + 1)
+    forget_versions(user_ids)
+
+
+class ClaimsUser(TokenUser):
+    """Request user built from token claims; has no database row loaded"""
+
+    @cached_property
+    def id(self):
+        # simplejwt writes the claim as a string; compare equal to CustomUser.id
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def worker_id(self):
+        return self.token.get('worker_id')
+
+    @cached_property
+    def token_version(self):
+        return self.token.get('ver')
+
+
+class ClaimsAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that trusts current claims instead of loading the user"""
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if 'role' in validated_token and validated_token.get('ver') == current_version(user_id):
+            return ClaimsUser(validated_token)
+        # Issued before claims existed, or outdated: read the row (and
+        # reject the token if the user is gone or inactive)
+        return super().get_user(validated_token)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh with claims read fresh from the user row"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise InvalidToken("Token has been revoked")
+        user = CustomUser.objects.filter(id=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User not found or inactive", code='user_inactive')
+        return {'access': str(add_claims(refresh.access_token, user))}
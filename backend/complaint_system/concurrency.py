@@ -0,0 +1,133 @@
+# complaint_system/concurrency.py
+"""
+Host-wide cap on requests in flight.
+
+Past the point where every worker is busy, extra requests only queue and
+drag everyone's latency down. ``ConcurrencyLimitMiddleware`` admits at most
+``MAX_CONCURRENT`` requests at a time across all processes on the host and
+answers the rest with 503 and ``Retry-After`` once they have waited
+``WAIT_SECONDS`` for a slot.
+
+Slots are lock files taken with non-blocking ``fcntl.flock()``; the kernel
+drops a process's locks when it dies, so a crashed worker never leaks a
+slot. Where ``fcntl`` is unavailable the cap falls back to a per-process
+semaphore. Long-lived streams (``EXEMPT_PATHS``) don't take a slot.
+"""
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+DEFAULTS = {
+    'MAX_CONCURRENT': 32,       # Requests in flight across every process on the host
+    'LOCK_DIR': None,           # Defaults to concurrency_slots/ in VAR_DIR
+    'WAIT_SECONDS': 0.5,        # How long a request may queue for a slot
+    'RETRY_AFTER': 1,           # Seconds, sent with 503s
+    'EXEMPT_PATHS': ['/api/my-notifications/stream/'],
+}
+
+POLL_SECONDS = 0.01
+
+
+def concurrency_setting(name):
+    value = getattr(settings, 'CONCURRENCY_LIMIT', {}).get(name, DEFAULTS[name])
+    if name == 'LOCK_DIR' and value is None:
+        value = os.path.join(getattr(settings, 'VAR_DIR', settings.BASE_DIR), 'concurrency_slots')
+    return value
+
+
+class FileSlots:
+    """``size`` slots shared between processes through ``flock()`` on lock files"""
+
+    def __init__(self, directory, size):
+        os.makedirs(directory, exist_ok=True)
+        self._files = [os.open(os.path.join(directory, f'slot-{i}'), os.O_RDWR | os.O_CREAT, 0o600)
+                       for i in range(size)]
+        # flock() is per open file, so threads of one process must not share a slot
+        self._taken = set()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Return a slot number, or ``None`` if all are busy"""
+        size = len(self._files)
+        start = random.randrange(size)  # Spread processes over the files
+        with self._lock:
+            for offset in range(size):
+                slot = (start + offset) % size
+                if slot in self._taken:
+                    continue
+                try:
+                    fcntl.flock(self._files[slot], fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                self._taken.add(slot)
+                return slot
+        return None
+
+    def release(self, slot):
+        with self._lock:
+            fcntl.flock(self._files[slot], fcntl.LOCK_UN)
+            self._taken.discard(slot)
+
+
+class SemaphoreSlots:
+    """Per-process fallback with the same interface"""
+
+    def __init__(self, size):
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    def try_acquire(self):
+        return 0 if self._semaphore.acquire(blocking=False) else None
+
+    def release(self, slot):
+        self._semaphore.release()
+
+
+def make_slots():
+    size = concurrency_setting('MAX_CONCURRENT')
+    if fcntl is not None:
+        try:
+            return FileSlots(concurrency_setting('LOCK_DIR'), size)
+        except OSError:
+            pass  # Read-only or missing directory: cap this process alone
+    return SemaphoreSlots(size)
+
+
+class ConcurrencyLimitMiddleware:
+    """Shed requests with 503 once ``MAX_CONCURRENT`` are in flight on the host"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slots = make_slots()
+        self.exempt = tuple(concurrency_setting('EXEMPT_PATHS'))
+
+    def acquire(self):
+        deadline = time.monotonic() + concurrency_setting('WAIT_SECONDS')
+        while True:
+            slot = self.slots.try_acquire()
+            if slot is not None or time.monotonic() >= deadline:
+                return slot
+            time.sleep(POLL_SECONDS)
+
+    def __call__(self, request):
+        if request.path.startswith(self.exempt):
+            return self.get_response(request)
+        slot = self.acquire()
+        if slot is None:
+            response = JsonResponse({'error': 'Server is busy, please retry shortly'},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(concurrency_setting('RETRY_AFTER'))
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release(slot)
@@ -0,0 +1,88 @@
+# complaint_system/conditional.py
+"""
+ETag / Last-Modified support for complaint endpoints.
+
+A response's version stamp is the latest ``updated_at`` and the row count
+of the queryset it is built from. The count makes deletions change the
+ETag even though they leave no newer timestamp behind. For a whole table
+the count is read from its ``DashboardCounter`` rather than with
+``COUNT(*)``, and ``MAX(updated_at)`` is an index lookup, so the stamp
+stays cheap however many rows there are. When the client already has the
+current version the view answers 304 before anything is loaded or
+serialized.
+"""
+import functools
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Complaint, DashboardCounter
+
+# Tables whose row count is maintained in a DashboardCounter
+ROW_COUNTERS = {Complaint: DashboardCounter.COMPLAINTS}
+
+
+def version_stamp(queryset, field='updated_at'):
+    """``(last_modified, count)`` for ``queryset``"""
+    if not queryset.query.where and queryset.model in ROW_COUNTERS:
+        last_modified = queryset.aggregate(last_modified=Max(field))['last_modified']
+        count = DashboardCounter.objects.filter(
+            name=ROW_COUNTERS[queryset.model]
+        ).values_list('value', flat=True).first()
+        return last_modified, count or 0
+    stamp = queryset.aggregate(last_modified=Max(field), count=Count('pk'))
+    return stamp['last_modified'], stamp['count']
+
+
+def make_etag(request, last_modified, count):
+    # The URL covers the page and filters; the user covers scoped querysets
+    raw = repr((request.get_full_path(), request.user.pk, last_modified and last_modified.isoformat(), count))
+    return 'W/' + quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def is_current(request, etag, last_modified):
+    """Whether the client's cached copy (per RFC 9110 precedence) is still valid"""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        # Weak comparison: ignore the W/ prefix on either side
+        return '*' in candidates or etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in candidates]
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def conditional_get(handler):
+    """
+    Answer GET with 304 when the client is current, and add validators to
+    fresh responses. Needs ``view.get_queryset()``; a ``pk`` URL kwarg
+    narrows the stamp to that object.
+    """
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        queryset = view.get_queryset()
+        lookup = kwargs.get(getattr(view, 'lookup_url_kwarg', None) or getattr(view, 'lookup_field', 'pk'))
+        if lookup is not None:
+            queryset = queryset.filter(pk=lookup)
+        last_modified, count = version_stamp(queryset)
+        if lookup is not None and not count:
+            return handler(view, request, *args, **kwargs)  # Let the view produce its 404
+
+        etag = make_etag(request, last_modified, count)
+        if is_current(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Clients may keep the payload but must revalidate before reusing it
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,69 @@
+# complaint_system/counters.py
+"""
+Maintenance of the ``DashboardCounter`` rows.
+
+Saves and deletes go through the signals in ``signals.py``. Code that
+changes complaints with ``QuerySet.update()``, ``bulk_update()`` or
+``bulk_create()`` must report the change here itself, inside the same
+transaction.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Complaint, CustomUser, DashboardCounter
+
+
+def adjust(deltas):
+    """Apply ``{counter_name: delta}`` atomically"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        for name, delta in deltas.items():
+            updated = DashboardCounter.objects.filter(name=name).update(value=F('value') + delta)
+            if not updated:
+                DashboardCounter.objects.get_or_create(name=name)
+                DashboardCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def record_complaints_created(statuses):
+    """Count newly inserted complaints, given their statuses"""
+    per_status = Counter(statuses)
+    deltas = {DashboardCounter.status_key(status): count for status, count in per_status.items()}
+    deltas[DashboardCounter.COMPLAINTS] = sum(per_status.values())
+    adjust(deltas)
+
+
+def record_complaints_deleted(statuses):
+    per_status = Counter(statuses)
+    deltas = {DashboardCounter.status_key(status): -count for status, count in per_status.items()}
+    deltas[DashboardCounter.COMPLAINTS] = -sum(per_status.values())
+    adjust(deltas)
+
+
+def record_status_change(old_status, new_status, count=1):
+    if old_status == new_status or not count:
+        return
+    adjust({
+        DashboardCounter.status_key(old_status): -count,
+        DashboardCounter.status_key(new_status): count,
+    })
+
+
+def record_users(delta):
+    adjust({DashboardCounter.USERS: delta})
+
+
+def rebuild():
+    """Recompute every counter from the tables; returns the new values"""
+    with transaction.atomic():
+        values = {DashboardCounter.USERS: CustomUser.objects.count()}
+        stats = Complaint.objects.aggregate_dashboard_stats()
+        values[DashboardCounter.COMPLAINTS] = stats['total_complaints']
+        for code, _ in Complaint.STATUS_CHOICES:
+            values[DashboardCounter.status_key(code)] = stats[f'{code.lower()}_complaints']
+        for name, value in values.items():
+            DashboardCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return values
@@ -0,0 +1,322 @@
+# complaint_system/duplicates.py
+"""
+Near-duplicate detection for new complaints.
+
+Every recent open complaint's description is reduced to a MinHash
+signature (character shingles, ``NUM_PERM`` hash permutations) and filed
+under ``BANDS`` locality-sensitive hash buckets, per category and per grid
+cell of ``RADIUS_KM``. A new complaint only has to be compared with the
+complaints sharing a bucket with it in its own and the neighbouring cells,
+so a lookup costs the same however many complaints are open. Candidates
+must lie within ``RADIUS_KM`` and reach ``THRESHOLD`` estimated Jaccard
+similarity; complaints without a location only match each other.
+
+A duplicate is linked to its parent through ``Complaint.duplicate_of``
+and is never dispatched; it is resolved together with the parent.
+
+The index is per process, like the worker index: it is loaded on first
+use, picks up complaints created elsewhere with one primary-key range
+query per lookup, drops complaints older than ``WINDOW_HOURS`` and evicts
+candidates found closed or linked when they are checked.
+"""
+import heapq
+import math
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, response_cache, rollups
+from .models import Complaint
+from .spatial import KM_PER_DEGREE, haversine_km
+
+DEFAULTS = {
+    'NUM_PERM': 64,             # MinHash permutations per signature
+    'BANDS': 16,                # LSH bands (NUM_PERM / BANDS rows each)
+    'SHINGLE_SIZE': 5,          # Characters per shingle
+    'THRESHOLD': 0.5,           # Minimum estimated Jaccard similarity
+    'RADIUS_KM': 0.5,           # Located complaints further apart are never duplicates
+    'WINDOW_HOURS': 72,         # Only complaints this recent can be parents
+    'REFRESH_SECONDS': 3600,    # Full reload from the database
+}
+
+OPEN_STATUSES = ('PENDING', 'ASSIGNED')
+
+# Mersenne prime for the universal hash family; (a * x + b) stays below 2**64
+# for 32-bit shingle hashes and 31-bit coefficients.
+PRIME = (1 << 31) - 1
+
+WORDS = re.compile(r"[a-z0-9]+")
+
+
+def duplicate_setting(name):
+    return getattr(settings, 'COMPLAINT_DUPLICATES', {}).get(name, DEFAULTS[name])
+
+
+class MinHasher:
+    """MinHash signatures over the character shingles of a text"""
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        text = ' '.join(WORDS.findall(text.lower()))
+        size = self.shingle_size
+        if len(text) <= size:
+            return {text}
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def signature(self, text):
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in self.shingles(text)), dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % PRIME).min(axis=0)
+
+    @staticmethod
+    def similarity(first, second):
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / len(first)
+
+
+class DuplicateIndex:
+    """
+    In-memory LSH index of open complaints' MinHash signatures.
+
+    Each entry is ``(signature, category, location, created_at)``; ``bands``
+    slices of every signature are hashed into buckets per category and grid
+    cell (``cell_km`` wide; ``None`` for unlocated complaints), and any two
+    complaints sharing a bucket are candidate duplicates.
+    """
+
+    def __init__(self, hasher, bands=16, cell_km=0.5):
+        if hasher.num_perm % bands:
+            raise ValueError("NUM_PERM must be a multiple of BANDS")
+        self.hasher = hasher
+        self.bands = bands
+        self.rows = hasher.num_perm // bands
+        self.cell_km = cell_km
+        self.cell_size = cell_km / KM_PER_DEGREE
+        self._entries = {}
+        self._buckets = defaultdict(set)
+        self._by_age = []  # (created_at, id) heap; removed ids are skipped lazily
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, complaint_id):
+        return complaint_id in self._entries
+
+    def _cell(self, location):
+        if location is None:
+            return None
+        return (math.floor(location[0] / self.cell_size), math.floor(location[1] / self.cell_size))
+
+    def _neighbours(self, location):
+        """Cells that can hold a point within ``cell_km`` of ``location``"""
+        if location is None:
+            return [None]
+        row, col = self._cell(location)
+        # A degree of longitude shrinks towards the poles
+        edge_lat = min(89.0, abs(location[0]) + self.cell_size)
+        span = math.ceil(1 / math.cos(math.radians(edge_lat)))
+        return [(r, c) for r in range(row - 1, row + 2) for c in range(col - span, col + span + 1)]
+
+    def _bands(self, signature):
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [(band, raw[band * width:(band + 1) * width]) for band in range(self.bands)]
+
+    def _keys(self, signature, category, cell):
+        return [(category, cell, band, chunk) for band, chunk in self._bands(signature)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._by_age.clear()
+
+    def add(self, complaint_id, description, category, latitude, longitude, created_at, signature=None):
+        if signature is None:
+            signature = self.hasher.signature(description)
+        location = None if latitude is None or longitude is None else (float(latitude), float(longitude))
+        with self._lock:
+            self.remove(complaint_id)
+            self._entries[complaint_id] = (signature, category, location, created_at)
+            for key in self._keys(signature, category, self._cell(location)):
+                self._buckets[key].add(complaint_id)
+            heapq.heappush(self._by_age, (created_at, complaint_id))
+
+    def remove(self, complaint_id):
+        with self._lock:
+            entry = self._entries.pop(complaint_id, None)
+            if entry is None:
+                return
+            for key in self._keys(entry[0], entry[1], self._cell(entry[2])):
+                self._buckets[key].discard(complaint_id)
+                if not self._buckets[key]:
+                    del self._buckets[key]
+
+    def expire(self, before):
+        """Drop complaints created before ``before``"""
+        with self._lock:
+            while self._by_age and self._by_age[0][0] < before:
+                created_at, complaint_id = heapq.heappop(self._by_age)
+                entry = self._entries.get(complaint_id)
+                if entry is not None and entry[3] == created_at:
+                    self.remove(complaint_id)
+
+    def matches(self, signature, category, latitude=None, longitude=None, below_id=None):
+        """
+        ``[(complaint_id, similarity)]`` of indexed complaints similar enough
+        to ``signature``, best first. Only ids below ``below_id`` qualify, so
+        a parent is always older than its duplicates.
+        """
+        threshold = duplicate_setting('THRESHOLD')
+        location = None if latitude is None or longitude is None else (float(latitude), float(longitude))
+        found = []
+        with self._lock:
+            candidates = set()
+            bands = self._bands(signature)
+            for cell in self._neighbours(location):
+                for band, chunk in bands:
+                    bucket = self._buckets.get((category, cell, band, chunk))
+                    if bucket:
+                        candidates |= bucket
+            for complaint_id in candidates:
+                if below_id is not None and complaint_id >= below_id:
+                    continue
+                other, _, other_location, _ = self._entries[complaint_id]
+                if location and haversine_km(*location, *other_location) > self.cell_km:
+                    continue
+                similarity = self.hasher.similarity(signature, other)
+                if similarity >= threshold:
+                    found.append((complaint_id, similarity))
+        found.sort(key=lambda match: (-match[1], match[0]))
+        return found
+
+
+duplicate_index = DuplicateIndex(
+    MinHasher(duplicate_setting('NUM_PERM'), duplicate_setting('SHINGLE_SIZE')),
+    bands=duplicate_setting('BANDS'),
+    cell_km=duplicate_setting('RADIUS_KM'),
+)
+_index_loaded_at = None
+_last_seen_id = 0
+_sync_lock = threading.Lock()
+
+INDEX_FIELDS = ('id', 'description', 'category', 'latitude', 'longitude', 'created_at')
+
+
+def open_parents():
+    """Complaints new ones may be linked to: recent, open and not duplicates themselves"""
+    since = timezone.now() - timedelta(hours=duplicate_setting('WINDOW_HOURS'))
+    return Complaint.objects.filter(created_at__gte=since, status__in=OPEN_STATUSES, duplicate_of__isnull=True)
+
+
+def get_duplicate_index():
+    """
+    Return the process-wide index, fully reloaded on first use and every
+    ``REFRESH_SECONDS``; otherwise only complaints created since the last
+    call are added, with one query on the primary key.
+    """
+    global _index_loaded_at, _last_seen_id
+    with _sync_lock:
+        now = time.monotonic()
+        if _index_loaded_at is None or now - _index_loaded_at > duplicate_setting('REFRESH_SECONDS'):
+            duplicate_index.clear()
+            _last_seen_id = Complaint.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            rows = open_parents().filter(id__lte=_last_seen_id).values_list(*INDEX_FIELDS)
+            _index_loaded_at = now
+        else:
+            rows = open_parents().filter(id__gt=_last_seen_id).values_list(*INDEX_FIELDS)
+        for row in rows.iterator(chunk_size=2000):
+            duplicate_index.add(*row)
+            _last_seen_id = max(_last_seen_id, row[0])
+        duplicate_index.expire(timezone.now() - timedelta(hours=duplicate_setting('WINDOW_HOURS')))
+    return duplicate_index
+
+
+def _still_open(ids):
+    return set(open_parents().filter(id__in=ids).values_list('id', flat=True))
+
+
+def find_duplicates(complaints):
+    """
+    Return ``{complaint_id: parent_id}`` for the near-duplicates among
+    ``complaints`` (which need ``id``, ``description``, ``category``,
+    ``latitude``, ``longitude`` and ``created_at``). Complaints in the same
+    batch can be each other's parents.
+    """
+    index = get_duplicate_index()
+    links = {}
+    checked = {}  # Candidate id -> still a valid parent
+    for complaint in sorted(complaints, key=lambda c: c.id):
+        signature = index.hasher.signature(complaint.description)
+        matches = index.matches(signature, complaint.category, complaint.latitude, complaint.longitude,
+                                below_id=complaint.id)
+        unknown = [match_id for match_id, _ in matches if match_id not in checked and match_id not in links]
+        if unknown:
+            valid = _still_open(unknown)
+            for match_id in unknown:
+                checked[match_id] = match_id in valid
+                if match_id not in valid:
+                    index.remove(match_id)
+        parent_id = next((match_id for match_id, _ in matches
+                          if match_id not in links and checked.get(match_id, True)), None)
+        if parent_id is None:
+            index.add(complaint.id, complaint.description, complaint.category,
+                      complaint.latitude, complaint.longitude, complaint.created_at, signature=signature)
+        else:
+            links[complaint.id] = parent_id
+            index.remove(complaint.id)
+    return links
+
+
+def link_duplicates(complaints):
+    """
+    Find near-duplicates among ``complaints`` and link them to their
+    parents. Returns ``{complaint_id: parent_id}``.
+    """
+    links = find_duplicates(complaints)
+    if not links:
+        return links
+    now = timezone.now()
+    linked = [c for c in complaints if c.id in links]
+    for complaint in linked:
+        complaint.duplicate_of_id = links[complaint.id]
+        complaint.updated_at = now
+    with transaction.atomic():
+        # Only complaints nobody has dispatched meanwhile
+        pending = set(
+            Complaint.objects.filter(id__in=links, status='PENDING', assigned_worker__isnull=True)
+            .values_list('id', flat=True)
+        )
+        Complaint.objects.bulk_update([c for c in linked if c.id in pending], ['duplicate_of', 'updated_at'],
+                                      batch_size=500)
+        response_cache.invalidate(Complaint)
+    return {complaint_id: parent_id for complaint_id, parent_id in links.items() if complaint_id in pending}
+
+
+def resolve_duplicates(parent_id, resolved_at):
+    """Resolve the still-open duplicates of a resolved complaint; call inside its transaction"""
+    duplicates = list(Complaint.objects.filter(duplicate_of_id=parent_id, status='PENDING')
+                      .only('id', 'category', 'created_at'))
+    if not duplicates:
+        return 0
+    resolved = Complaint.objects.filter(id__in=[c.id for c in duplicates], status='PENDING').update(
+        status='RESOLVED', resolved_at=resolved_at, updated_at=resolved_at
+    )
+    counters.record_status_change('PENDING', 'RESOLVED', resolved)
+    rollups.record_change(duplicates, 'PENDING', 'RESOLVED')
+    response_cache.invalidate(Complaint)
+    return resolved
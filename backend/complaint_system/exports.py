@@ -0,0 +1,97 @@
+# complaint_system/exports.py
+"""
+Streaming complaint exports for reporting.
+
+Rows are read with ``values_list()`` off a chunked database iterator and
+written out a few thousand at a time, so an export of any size runs in
+constant memory and the first bytes go out straight away.
+"""
+import csv
+import io
+from decimal import Decimal
+
+from .models import Complaint
+from .renderers import encode_json
+
+# (column, lookup) pairs; complaints joined with their user and assigned worker
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('category', 'category'),
+    ('status', 'status'),
+    ('description', 'description'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('assigned_at', 'assigned_at'),
+    ('resolved_at', 'resolved_at'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('user_id', 'user_id'),
+    ('user_username', 'user__username'),
+    ('user_email', 'user__email'),
+    ('user_phone_number', 'user__phone_number'),
+    ('worker_id', 'assigned_worker_id'),
+    ('worker_username', 'assigned_worker__user__username'),
+    ('worker_phone_number', 'assigned_worker__user__phone_number'),
+]
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_queryset(start=None, end=None, status=None, category=None):
+    """Complaints created in ``[start, end)`` matching the filters, oldest first"""
+    complaints = Complaint.objects.all()
+    if start is not None:
+        complaints = complaints.filter(created_at__gte=start)
+    if end is not None:
+        complaints = complaints.filter(created_at__lt=end)
+    if status:
+        complaints = complaints.filter(status=status)
+    if category:
+        complaints = complaints.filter(category=category)
+    return complaints.order_by('created_at', 'id').values_list(*[lookup for _, lookup in EXPORT_COLUMNS])
+
+
+def _plain(value):
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    for count, row in enumerate(rows, 1):
+        writer.writerow(['' if value is None else _plain(value) for value in row])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(rows):
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        lines.append(encode_json(dict(zip(columns, map(_plain, row)))))
+        if len(lines) == CHUNK_SIZE:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def export_chunks(queryset, export_type):
+    """Byte chunks of ``queryset`` (from ``export_queryset()``) as ``'csv'`` or ``'ndjson'``"""
+    rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+    return csv_chunks(rows) if export_type == 'csv' else ndjson_chunks(rows)
@@ -0,0 +1,187 @@
+# complaint_system/imports.py
+"""
+Bulk complaint import from CSV or NDJSON.
+
+Rows are checked in plain Python and inserted ``BATCH_SIZE`` at a time with
+``bulk_create()``, so none of the per-complaint signals run: the dashboard
+counters, rollups and response cache are updated once per batch instead.
+Each inserted batch is validated and checked for duplicates before the
+next one is read, so memory stays bounded by the batch size; assignment is
+one set-based pass at the end.
+
+Columns: ``category`` and ``description`` are required; ``latitude``,
+``longitude``, ``created_at``, ``status`` (PENDING or RESOLVED) and
+``username`` or ``user_id`` (the complaint's owner, defaulting to the
+importing user) are optional.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, response_cache, rollups
+from .assignment import batch_assign_pending
+from .duplicates import link_duplicates
+from .models import Complaint, CustomUser
+from .validation import validate_complaints, validation_setting
+
+BATCH_SIZE = 5000
+IMPORT_STATUSES = ('PENDING', 'RESOLVED')
+MIN_DESCRIPTION_LENGTH = 10
+
+
+def _text_lines(stream):
+    first = True
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig' if first else 'utf-8')
+        first = False
+        yield line
+
+
+def read_rows(stream, import_type):
+    """Yield ``(row_number, dict)`` from a binary or text stream (or ``bytes``/``str``)"""
+    if isinstance(stream, (bytes, str)):
+        stream = io.BytesIO(stream) if isinstance(stream, bytes) else io.StringIO(stream, newline='')
+    lines = _text_lines(stream)
+    if import_type == 'csv':
+        # Row 1 is the header
+        yield from enumerate(csv.DictReader(lines), 2)
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else {'__invalid__': line}
+
+
+def _coordinate(value, limit):
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(str(value)).quantize(Decimal('0.000001'))
+    except InvalidOperation:
+        raise ValueError("must be a number")
+    if abs(number) > limit:
+        raise ValueError(f"must be between -{limit} and {limit}")
+    return number
+
+
+def clean_row(row, owners, default_owner_id, now):
+    """Return ``(Complaint, None)`` for a valid row or ``(None, errors)``"""
+    if '__invalid__' in row:
+        return None, {'row': 'not a JSON object'}
+    errors = {}
+    category = str(row.get('category') or '').strip().upper()
+    if category not in dict(Complaint.CATEGORY_CHOICES):
+        errors['category'] = f"must be one of {', '.join(dict(Complaint.CATEGORY_CHOICES))}"
+    description = str(row.get('description') or '').strip()
+    if len(description) < MIN_DESCRIPTION_LENGTH:
+        errors['description'] = f"must be at least {MIN_DESCRIPTION_LENGTH} characters"
+    complaint_status = str(row.get('status') or 'PENDING').strip().upper()
+    if complaint_status not in IMPORT_STATUSES:
+        errors['status'] = f"must be one of {', '.join(IMPORT_STATUSES)}"
+
+    coordinates = {}
+    for field, limit in (('latitude', 90), ('longitude', 180)):
+        try:
+            coordinates[field] = _coordinate(row.get(field), limit)
+        except ValueError as exc:
+            errors[field] = str(exc)
+
+    created_at = now
+    if row.get('created_at'):
+        created_at = rollups.parse_moment(str(row['created_at']))
+        if created_at is None:
+            errors['created_at'] = "must be an ISO date or date-time"
+
+    owner_id = default_owner_id
+    if row.get('user_id') not in (None, ''):
+        owner_id = owners['ids'].get(str(row['user_id']).strip())
+    elif row.get('username'):
+        owner_id = owners['usernames'].get(str(row['username']).strip())
+    if owner_id is None:
+        errors['user'] = "unknown user"
+
+    if errors:
+        return None, errors
+    return Complaint(
+        user_id=owner_id,
+        category=category,
+        description=description,
+        status=complaint_status,
+        created_at=created_at,
+        resolved_at=created_at if complaint_status == 'RESOLVED' else None,
+        **coordinates,
+    ), None
+
+
+def _resolve_owners(rows):
+    """Map the batch's user ids and usernames to ids with two queries"""
+    ids = {str(row.get('user_id')).strip() for _, row in rows if row.get('user_id') not in (None, '')}
+    usernames = {str(row.get('username')).strip() for _, row in rows if row.get('username')}
+    owners = {'ids': {}, 'usernames': {}}
+    if ids:
+        numeric = [int(value) for value in ids if value.isdigit()]
+        owners['ids'] = {str(user_id): user_id
+                         for user_id in CustomUser.objects.filter(id__in=numeric).values_list('id', flat=True)}
+    if usernames:
+        owners['usernames'] = dict(CustomUser.objects.filter(username__in=usernames).values_list('username', 'id'))
+    return owners
+
+
+def _insert(complaints):
+    with transaction.atomic():
+        created = Complaint.objects.bulk_create(complaints)
+        counters.record_complaints_created([c.status for c in created])
+        rollups.record_created(created)
+        response_cache.invalidate(Complaint)
+    return created
+
+
+def import_complaints(rows, default_owner_id=None, assign=True, validate=True, batch_size=BATCH_SIZE):
+    """
+    Import ``(row_number, dict)`` rows. Valid rows are inserted even when
+    others fail. Returns a report with counts and per-row errors.
+    """
+    report = {'imported': 0, 'failed': 0, 'duplicates': 0, 'assigned': 0, 'errors': []}
+    now = timezone.now()
+    validation_batch = validation_setting('BATCH_SIZE')
+
+    def flush(batch):
+        owners = _resolve_owners(batch)
+        complaints = []
+        for number, row in batch:
+            complaint, errors = clean_row(row, owners, default_owner_id, now)
+            if errors:
+                report['errors'].append({'row': number, 'errors': errors})
+            else:
+                complaints.append(complaint)
+        report['failed'] = len(report['errors'])
+        if not complaints:
+            return
+        created = _insert(complaints)
+        report['imported'] += len(created)
+        if validate:
+            for start in range(0, len(created), validation_batch):
+                validate_complaints(created[start:start + validation_batch])
+        report['duplicates'] += len(link_duplicates(created))
+
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) == batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    if assign and report['imported']:
+        report['assigned'], _ = batch_assign_pending()
+    return report
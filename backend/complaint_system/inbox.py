@@ -0,0 +1,60 @@
+# complaint_system/inbox.py
+"""
+Per-worker unread notification counts and bulk read-state changes.
+
+``Worker.unread_notification_count`` is a denormalized counter, so the
+badge endpoint reads one worker row instead of counting notifications.
+Saves and deletes are recorded by the signals in ``signals.py``; code that
+creates notifications with ``bulk_create()`` calls ``record_created()``.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+
+from . import response_cache
+from .models import Notification, Worker
+
+
+def adjust_unread(deltas):
+    """Apply ``{worker_id: delta}`` to the unread counters, one UPDATE per 500 workers"""
+    items = [(worker_id, delta) for worker_id, delta in deltas.items() if delta]
+    for start in range(0, len(items), 500):
+        chunk = items[start:start + 500]
+        Worker.objects.filter(id__in=[worker_id for worker_id, _ in chunk]).update(
+            unread_notification_count=F('unread_notification_count') + Case(
+                *[When(id=worker_id, then=Value(delta)) for worker_id, delta in chunk],
+                default=Value(0),
+            )
+        )
+
+
+def record_created(notifications):
+    adjust_unread(Counter(n.worker_id for n in notifications if not n.is_read))
+
+
+def unread_count(worker_id):
+    return Worker.objects.filter(id=worker_id).values_list('unread_notification_count', flat=True).first() or 0
+
+
+def mark_read(worker_id, ids=None):
+    """
+    Mark the worker's unread notifications (only ``ids``, when given) as
+    read with a single UPDATE. Returns how many changed.
+    """
+    notifications = Notification.objects.filter(worker_id=worker_id, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    with transaction.atomic():
+        marked = notifications.update(is_read=True)
+        adjust_unread({worker_id: -marked})
+        if marked:
+            response_cache.invalidate(Notification)
+    return marked
+
+
+def actual_unread_counts():
+    """``{worker_id: unread}`` counted from the notifications table"""
+    return dict(
+        Notification.objects.filter(is_read=False).order_by().values_list('worker').annotate(count=Count('id'))
+    )
@@ -0,0 +1,190 @@
+# complaint_system/jobs.py
+"""
+Database-backed job queue.
+
+Jobs are rows in the ``Job`` table, so the queue needs no external broker
+and survives restarts. Worker processes (``manage.py run_jobs``) claim jobs
+with a conditional UPDATE, which makes a claim atomic even on SQLite. A
+claimed job stays invisible to other workers until its visibility timeout
+expires; if the worker dies before finishing, the job is picked up again.
+Handlers that can outlive the timeout call ``heartbeat()`` between batches
+to extend their claim. Failed jobs are retried with exponential backoff up to ``max_attempts``.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .storage import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EAGER': False,             # Run handlers inline at enqueue time (tests, single-process dev)
+    'VISIBILITY_TIMEOUT': 60,   # Seconds a claimed job stays hidden from other workers
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,         # Seconds before the first retry, doubled on each attempt
+    'POLL_INTERVAL': 1.0,       # Seconds an idle worker sleeps between polls
+    'BATCH_SIZE': 20,           # Jobs claimed per poll
+    'RETENTION_DAYS': 7,        # Finished jobs older than this are purged
+}
+
+_handlers = {}
+# The claim of the job this thread is running: (job id, worker id, locked_until)
+_running = threading.local()
+
+
+class LeaseLost(Exception):
+    """The running job's claim expired and another worker took the job over"""
+
+
+def queue_setting(name):
+    return getattr(settings, 'JOB_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def job(name):
+    """Register the decorated function as the handler for jobs called ``name``"""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+@retry_on_locked
+def enqueue(name, payload=None, delay=0, max_attempts=None):
+    """Queue a job; returns the ``Job`` row, or ``None`` when running eagerly"""
+    payload = payload or {}
+    if queue_setting('EAGER'):
+        _handlers[name](**payload)
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts or queue_setting('MAX_ATTEMPTS'),
+        available_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _claimable(now):
+    return (Q(status='QUEUED', available_at__lte=now)
+            | Q(status='RUNNING', locked_until__lt=now))
+
+
+@retry_on_locked
+def claim_jobs(worker_id, limit=None):
+    """Atomically claim up to ``limit`` due jobs for ``worker_id``"""
+    now = timezone.now()
+    limit = limit or queue_setting('BATCH_SIZE')
+    locked_until = now + timedelta(seconds=queue_setting('VISIBILITY_TIMEOUT'))
+    candidate_ids = list(
+        Job.objects.filter(_claimable(now)).order_by('available_at', 'id').values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidate_ids:
+        # Only one worker's UPDATE can match while the row is still claimable
+        won = Job.objects.filter(_claimable(now), id=job_id).update(
+            status='RUNNING',
+            locked_by=worker_id,
+            locked_until=locked_until,
+            attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed, locked_by=worker_id).order_by('available_at', 'id'))
+
+
+@retry_on_locked
+def heartbeat():
+    """
+    Extend the claim of the job running in this thread once less than half
+    of its visibility timeout is left. Raises ``LeaseLost`` if another worker
+    has already reclaimed the job; does nothing outside a job.
+    """
+    claim = getattr(_running, 'claim', None)
+    if claim is None:
+        return
+    job_id, worker_id, locked_until = claim
+    timeout = queue_setting('VISIBILITY_TIMEOUT')
+    now = timezone.now()
+    if locked_until - now > timedelta(seconds=timeout / 2):
+        return
+    locked_until = now + timedelta(seconds=timeout)
+    if not Job.objects.filter(id=job_id, locked_by=worker_id, status='RUNNING').update(locked_until=locked_until):
+        raise LeaseLost(f"Job #{job_id} was reclaimed by another worker")
+    _running.claim = (job_id, worker_id, locked_until)
+
+
+def run_job(job_row, worker_id):
+    """Run a claimed job and record the outcome"""
+    owned = Job.objects.filter(id=job_row.id, locked_by=worker_id, status='RUNNING')
+    handler = _handlers.get(job_row.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job_row.name}'")
+        if job_row.attempts > job_row.max_attempts:
+            raise RuntimeError("Visibility timeout expired on the final attempt")
+        _running.claim = (job_row.id, worker_id, job_row.locked_until)
+        try:
+            handler(**job_row.payload)
+        finally:
+            _running.claim = None
+    except LeaseLost:
+        # The worker that reclaimed the job owns its outcome now
+        logger.warning("Job #%s (%s) lost its claim while running", job_row.id, job_row.name)
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job #%s (%s) failed on attempt %s", job_row.id, job_row.name, job_row.attempts)
+        if handler is None or job_row.attempts >= job_row.max_attempts:
+            owned.update(status='FAILED', last_error=error, locked_until=None, finished_at=timezone.now())
+        else:
+            backoff = queue_setting('RETRY_BACKOFF') * 2 ** (job_row.attempts - 1)
+            owned.update(status='QUEUED', last_error=error, locked_until=None,
+                         available_at=timezone.now() + timedelta(seconds=backoff))
+        return False
+    owned.update(status='DONE', locked_until=None, finished_at=timezone.now())
+    return True
+
+
+def purge_finished_jobs(older_than_days=None):
+    days = queue_setting('RETENTION_DAYS') if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status='DONE', finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def work(worker_id=None, once=False, stop=None):
+    """
+    Claim and run jobs until ``stop()`` returns true, or until the queue is
+    empty when ``once`` is set. Returns the number of jobs processed.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    last_purge = time.monotonic()
+    while not (stop and stop()):
+        close_old_connections()
+        jobs = claim_jobs(worker_id)
+        for job_row in jobs:
+            run_job(job_row, worker_id)
+            processed += 1
+        if time.monotonic() - last_purge > 3600:
+            purge_finished_jobs()
+            last_purge = time.monotonic()
+        if not jobs:
+            if once:
+                break
+            time.sleep(queue_setting('POLL_INTERVAL'))
+    return processed
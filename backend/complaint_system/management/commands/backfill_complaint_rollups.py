@@ -0,0 +1,27 @@
+# complaint_system/management/commands/backfill_complaint_rollups.py
+from django.core.management.base import BaseCommand, CommandError
+
+from complaint_system import rollups
+
+
+def parse_moment(value):
+    moment = rollups.parse_moment(value)
+    if moment is None:
+        raise CommandError(f"Invalid date: {value}")
+    return moment
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly and daily complaint rollups from the complaint table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help="First date/time to rebuild (default: all history)")
+        parser.add_argument('--to', dest='end', help="Rebuild buckets before this date/time (default: no limit)")
+
+    def handle(self, *args, **options):
+        start = parse_moment(options['start']) if options['start'] else None
+        end = parse_moment(options['end']) if options['end'] else None
+        written = rollups.backfill(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rollups rebuilt: {written['hour']} hourly and {written['day']} daily row(s)"
+        ))
@@ -0,0 +1,84 @@
+# complaint_system/management/commands/benchmark_duplicates.py
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from complaint_system.duplicates import DuplicateIndex, MinHasher, duplicate_setting
+
+SUBJECTS = {
+    'DOG': ['stray dog', 'pack of dogs', 'aggressive dog', 'injured puppy', 'barking dogs', 'rabid dog'],
+    'GARBAGE': ['garbage pile', 'overflowing dustbin', 'dumped waste', 'plastic litter', 'rotting trash'],
+}
+EVENTS = ['bit a child', 'chased a cyclist', 'is blocking the road', 'has not been cleared for days',
+          'smells terrible', 'keeps everyone awake', 'attacked a delivery boy', 'is spreading onto the street']
+PLACES = ['near the school gate on', 'behind the market on', 'opposite the temple on', 'at the bus stop on',
+          'in the park off', 'outside the hospital on']
+SYLLABLES = ['ka', 'ra', 'ma', 'ni', 'shi', 'pu', 'la', 'van', 'gir', 'dha', 'nag', 'ko', 'te', 'bha', 'sun']
+
+
+class Command(BaseCommand):
+    help = ("Measure near-duplicate lookup time against in-memory indexes of increasing size "
+            "(no database access)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000,100000',
+                            help="Comma-separated numbers of open complaints to index")
+        parser.add_argument('--lookups', type=int, default=2000, help="Lookups timed per size")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def street(self, rng):
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    def describe(self, rng, category):
+        # Free text varies far more than this, so every complaint gets its own street
+        return (f"{rng.choice(SUBJECTS[category]).capitalize()} {rng.choice(EVENTS)} "
+                f"{rng.choice(PLACES)} {self.street(rng)} {self.street(rng)} road, house {rng.randint(1, 999)}")
+
+    def complaint(self, rng, now):
+        category = rng.choice(list(SUBJECTS))
+        return (self.describe(rng, category), category,
+                12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2, now)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        hasher = MinHasher(duplicate_setting('NUM_PERM'), duplicate_setting('SHINGLE_SIZE'))
+        self.stdout.write(f"{'open':>8} {'build s':>8} {'sig us':>8} {'p50 us':>8} {'p99 us':>8} {'matches':>8}")
+
+        for size in [int(value) for value in options['sizes'].split(',')]:
+            index = DuplicateIndex(hasher, bands=duplicate_setting('BANDS'), cell_km=duplicate_setting('RADIUS_KM'))
+            rows = [self.complaint(rng, now) for _ in range(size)]
+            started = time.perf_counter()
+            for complaint_id, row in enumerate(rows, 1):
+                index.add(complaint_id, *row)
+            build = time.perf_counter() - started
+
+            # Half the probes are reworded copies of indexed complaints
+            probes = []
+            for _ in range(options['lookups']):
+                description, category, latitude, longitude, _ = rng.choice(rows)
+                if rng.random() < 0.5:
+                    description = self.complaint(rng, now)[0]
+                else:
+                    description = description.upper().replace(' ROAD', ' MAIN ROAD')
+                probes.append((description, category, latitude, longitude))
+
+            signature_times, lookup_times, found = [], [], 0
+            for description, category, latitude, longitude in probes:
+                started = time.perf_counter()
+                signature = hasher.signature(description)
+                signed = time.perf_counter()
+                matches = index.matches(signature, category, latitude, longitude)
+                lookup_times.append(time.perf_counter() - signed)
+                signature_times.append(signed - started)
+                found += len(matches)
+
+            lookup_times.sort()
+            self.stdout.write(
+                f"{size:>8} {build:>8.2f} {statistics.median(signature_times) * 1e6:>8.1f} "
+                f"{statistics.median(lookup_times) * 1e6:>8.1f} "
+                f"{lookup_times[int(len(lookup_times) * 0.99)] * 1e6:>8.1f} {found / len(probes):>8.2f}"
+            )
@@ -0,0 +1,85 @@
+# complaint_system/management/commands/benchmark_revocation.py
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
+
+from complaint_system import revocation
+from complaint_system.auth import ClaimsAuthentication, issue_tokens
+from complaint_system.models import CustomUser
+
+
+class WithoutRevocation(ClaimsAuthentication):
+    def get_validated_token(self, raw_token):
+        return super(ClaimsAuthentication, self).get_validated_token(raw_token)
+
+
+class StoreOnly(ClaimsAuthentication):
+    """What a plain table lookup per request costs (no Bloom filter)"""
+
+    def get_validated_token(self, raw_token):
+        validated_token = super(ClaimsAuthentication, self).get_validated_token(raw_token)
+        revocation.revocations.store.contains(validated_token['jti'])
+        return validated_token
+
+
+class Command(BaseCommand):
+    help = ("Measure per-request JWT authentication time without revocation checks, with the "
+            "Bloom-filtered revocation list, and with a store lookup on every request. The random "
+            "revocations go to a scratch store, not the configured one")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--revoked', type=int, default=50000,
+                            help="Revocations to add to the list first (random jtis)")
+        parser.add_argument('--user', help="Username to authenticate as (default: first active user)")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.filter(is_active=True)
+        user = users.get(username=options['user']) if options['user'] else users.order_by('id').first()
+        if user is None:
+            self.stderr.write("No active user to issue tokens for")
+            return
+
+        directory = tempfile.mkdtemp(prefix='benchmark_revocation_')
+        scratch = dict(getattr(settings, 'TOKEN_REVOCATION', {}),
+                       STORE_PATH=os.path.join(directory, 'revoked_tokens.sqlite3'))
+        try:
+            with override_settings(TOKEN_REVOCATION=scratch):
+                revocation.revocations.reset()
+                self.benchmark(user, options)
+        finally:
+            revocation.revocations.reset()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def benchmark(self, user, options):
+        expires = time.time() + 3600
+        for _ in range(options['revoked']):
+            revocation.revocations.store.add(uuid.uuid4().hex, expires)
+        revocation.revocations.reset()
+
+        request = Request(RequestFactory().get(
+            '/api/my-complaints/', HTTP_AUTHORIZATION=f"Bearer {issue_tokens(user)['access']}"
+        ))
+        self.stdout.write(f"{'mode':<20} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+        for label, authentication in (('no revocation', WithoutRevocation()),
+                                      ('bloom filter', ClaimsAuthentication()),
+                                      ('store lookup', StoreOnly())):
+            authentication.authenticate(request)  # Warm caches and the filter
+            timings = []
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                authentication.authenticate(request)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f"{label:<20} {statistics.median(timings) * 1e6:>8.1f} "
+                f"{timings[int(len(timings) * 0.99)] * 1e6:>8.1f} {statistics.fmean(timings) * 1e6:>8.1f}"
+            )
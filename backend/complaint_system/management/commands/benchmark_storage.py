@@ -0,0 +1,131 @@
+# complaint_system/management/commands/benchmark_storage.py
+import copy
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, connections
+
+from complaint_system.models import Complaint, CustomUser
+from complaint_system.storage import retry_on_locked
+
+DESCRIPTIONS = ['Stray dog chasing children near the school gate', 'Garbage pile not cleared for a week',
+                'Pack of dogs barking all night behind the market', 'Overflowing dustbin at the bus stop']
+
+
+def profiles():
+    """Plain SQLite as Django ships it, and the profile configured in settings"""
+    configured = settings.DATABASES['default']
+    return {
+        'baseline': ({'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}}, False),
+        'tuned': ({'CONN_MAX_AGE': configured.get('CONN_MAX_AGE', 0),
+                   'CONN_HEALTH_CHECKS': configured.get('CONN_HEALTH_CHECKS', False),
+                   'OPTIONS': copy.deepcopy(configured.get('OPTIONS', {}))}, True),
+    }
+
+
+def use_database(path, profile):
+    connections.close_all()
+    connection.settings_dict.update(NAME=path, **copy.deepcopy(profile))
+
+
+def client(worker, deadline, write_ratio, user_id, retry, results):
+    """One process's mix of complaint submissions and newest-first list reads"""
+    rng = random.Random(worker)
+    save = retry_on_locked(Complaint.save) if retry else Complaint.save
+    timings = {'write': [], 'read': []}
+    errors = 0
+    while time.time() < deadline:
+        close_old_connections()  # Request boundary: closes the connection unless it is persistent
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                save(Complaint(user_id=user_id, category=rng.choice(['DOG', 'GARBAGE']),
+                               description=rng.choice(DESCRIPTIONS),
+                               latitude=round(12.9 + rng.random() * 0.2, 6),
+                               longitude=round(77.5 + rng.random() * 0.2, 6)))
+            else:
+                list(Complaint.objects.order_by('-id').values('id', 'category', 'status', 'created_at')[:50])
+        except OperationalError:
+            errors += 1
+            continue
+        timings[kind].append(time.perf_counter() - started)
+    connections.close_all()
+    results.put((timings, errors))
+
+
+class Command(BaseCommand):
+    help = ("Run concurrent complaint writes and reads from several processes against scratch "
+            "databases with plain SQLite and with the configured storage profile, and report "
+            "throughput, p50/p99 latency and 'database is locked' failures")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+        parser.add_argument('--seed-rows', type=int, default=1000, help="Complaints created before timing")
+        parser.add_argument('--profiles', default='baseline,tuned')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write("This benchmark compares SQLite profiles; the default database is not SQLite")
+            return
+        original = copy.deepcopy(connection.settings_dict)
+        directory = tempfile.mkdtemp(prefix='benchmark_storage_')
+        context = multiprocessing.get_context('fork')
+        self.stdout.write(f"{'profile':<10} {'writes/s':>9} {'reads/s':>9} {'w p50 ms':>9} {'w p99 ms':>9} "
+                          f"{'r p50 ms':>9} {'r p99 ms':>9} {'errors':>7}")
+        try:
+            for name in options['profiles'].split(','):
+                profile, retry = profiles()[name]
+                use_database(os.path.join(directory, f'{name}.sqlite3'), profile)
+                call_command('migrate', verbosity=0, interactive=False)
+                user = CustomUser.objects.create_user('benchmark', password='benchmark', role='USER')
+                Complaint.objects.bulk_create(
+                    Complaint(user=user, category='DOG', description=DESCRIPTIONS[i % len(DESCRIPTIONS)])
+                    for i in range(options['seed_rows'])
+                )
+                connections.close_all()  # Children must not inherit an open connection
+
+                results = context.Queue()
+                deadline = time.time() + options['seconds']
+                processes = [
+                    context.Process(target=client, args=(worker, deadline, options['write_ratio'],
+                                                         user.id, retry, results))
+                    for worker in range(options['processes'])
+                ]
+                for process in processes:
+                    process.start()
+                outcomes = [results.get() for _ in processes]
+                for process in processes:
+                    process.join()
+                self.report(name, outcomes, options['seconds'])
+        finally:
+            use_database(original['NAME'], {key: original[key] for key in
+                                            ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')})
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def report(self, name, outcomes, seconds):
+        writes = sorted(t for timings, _ in outcomes for t in timings['write'])
+        reads = sorted(t for timings, _ in outcomes for t in timings['read'])
+        errors = sum(count for _, count in outcomes)
+
+        def quantiles(values):
+            if not values:
+                return 0.0, 0.0
+            return statistics.median(values) * 1e3, values[int(len(values) * 0.99)] * 1e3
+
+        write_p50, write_p99 = quantiles(writes)
+        read_p50, read_p99 = quantiles(reads)
+        self.stdout.write(
+            f"{name:<10} {len(writes) / seconds:>9.1f} {len(reads) / seconds:>9.1f} {write_p50:>9.2f} "
+            f"{write_p99:>9.2f} {read_p50:>9.2f} {read_p99:>9.2f} {errors:>7}"
+        )
@@ -0,0 +1,20 @@
+# complaint_system/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+
+from complaint_system.queryplans import all_plans, check_query_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot query shapes and fail if any of them scans a whole table"
+
+    def handle(self, *args, **options):
+        if options['verbosity'] > 1:
+            for name, plan in all_plans():
+                self.stdout.write(f"{name}\n  " + plan.replace('\n', '\n  '))
+
+        problems = check_query_plans()
+        for name, tables, plan in problems:
+            self.stderr.write(f"{name}: full scan of {', '.join(tables)}\n  " + plan.replace('\n', '\n  '))
+        if problems:
+            raise CommandError(f"{len(problems)} query shape(s) scan whole tables")
+        self.stdout.write(self.style.SUCCESS("All query shapes use indexes"))
@@ -0,0 +1,51 @@
+# complaint_system/management/commands/import_complaints.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from complaint_system.imports import BATCH_SIZE, import_complaints, read_rows
+from complaint_system.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Bulk-import complaints from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--type', choices=['csv', 'ndjson'], help="Input format (default: from the extension)")
+        parser.add_argument('--user', help="Username owning rows without username/user_id")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--no-assign', action='store_true', help="Skip the batch assignment pass")
+        parser.add_argument('--errors', help="Write the per-row error report to this file as JSON")
+
+    def handle(self, *args, **options):
+        import_type = options['type'] or ('ndjson' if options['path'].endswith(('.ndjson', '.jsonl')) else 'csv')
+        owner_id = None
+        if options['user']:
+            owner_id = CustomUser.objects.filter(username=options['user']).values_list('id', flat=True).first()
+            if owner_id is None:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_complaints(
+                    read_rows(stream, import_type),
+                    default_owner_id=owner_id,
+                    assign=not options['no_assign'],
+                    batch_size=options['batch_size'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        if options['errors']:
+            with open(options['errors'], 'w') as output:
+                json.dump(report['errors'], output, indent=2)
+        else:
+            for error in report['errors'][:20]:
+                self.stderr.write(f"Row {error['row']}: {error['errors']}")
+            if len(report['errors']) > 20:
+                self.stderr.write(f"... and {len(report['errors']) - 20} more (use --errors FILE)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} complaint(s), {report['failed']} row(s) failed, "
+            f"{report['duplicates']} linked as duplicates, {report['assigned']} assigned"
+        ))
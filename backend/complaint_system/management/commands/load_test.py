@@ -0,0 +1,266 @@
+# complaint_system/management/commands/load_test.py
+import http.client
+import json
+import platform
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_duplicates import EVENTS, PLACES, SUBJECTS
+from .seed_data import CENTER, DEFAULT_PASSWORD, SPREAD
+
+# persona -> {action: weight}; every persona logs in first and now and then again
+PERSONAS = {
+    'citizen': {'login': 2, 'submit': 15, 'list': 40, 'my-complaints': 35, 'profile': 8},
+    'worker': {'login': 2, 'worker-complaints': 55, 'unread-count': 35, 'notifications': 8},
+    'admin': {'login': 2, 'dashboard': 45, 'trends': 25, 'list': 28},
+}
+ACCOUNTS = {'citizen': 'user', 'worker': 'worker', 'admin': 'admin'}
+PATHS = {
+    'list': '/api/complaints/',
+    'my-complaints': '/api/my-complaints/',
+    'profile': '/api/auth/profile/',
+    'worker-complaints': '/api/worker-complaints/',
+    'unread-count': '/api/my-notifications/unread-count/',
+    'notifications': '/api/my-notifications/',
+    'dashboard': '/api/dashboard/stats/',
+    'trends': '/api/dashboard/trends/',
+}
+
+
+class VirtualUser:
+    """One simulated client: its own account, connection and random stream"""
+
+    def __init__(self, index, persona, account, options):
+        self.persona = persona
+        self.account = account
+        self.password = options['password']
+        self.rng = random.Random(f"{options['seed']}:{index}")
+        self.actions = list(PERSONAS[persona])
+        self.weights = [PERSONAS[persona][action] for action in self.actions]
+        self.target = urlsplit(options['base_url'])
+        self.timeout = options['timeout']
+        self.think = options['think_ms'] / 1000
+        self.connection = None
+        self.token = None
+        self.samples = []  # (action, status, seconds)
+
+    def request(self, method, path, body=None):
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        for attempt in range(2):
+            if self.connection is None:
+                connection_class = (http.client.HTTPSConnection if self.target.scheme == 'https'
+                                    else http.client.HTTPConnection)
+                self.connection = connection_class(self.target.netloc, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                # Keep-alive connection dropped by the server: reconnect once
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    return 0, b''
+
+    def login(self):
+        status, body = self.request('POST', '/api/auth/login/',
+                                    {'username': self.account, 'password': self.password})
+        if status == 200:
+            self.token = json.loads(body)['tokens']['access']
+        return status
+
+    def perform(self, action):
+        if action == 'login':
+            return self.login()
+        if action == 'submit':
+            category = self.rng.choice(list(SUBJECTS))
+            return self.request('POST', '/api/complaints/', {
+                'category': category,
+                'description': (f"{self.rng.choice(SUBJECTS[category]).capitalize()} "
+                                f"{self.rng.choice(EVENTS)} {self.rng.choice(PLACES)} main road"),
+                'latitude': round(CENTER[0] + self.rng.uniform(-SPREAD, SPREAD), 6),
+                'longitude': round(CENTER[1] + self.rng.uniform(-SPREAD, SPREAD), 6),
+            })[0]
+        return self.request('GET', PATHS[action])[0]
+
+    def timed(self, action):
+        started = time.perf_counter()
+        status = self.perform(action)
+        self.samples.append((action, status, time.perf_counter() - started))
+
+    def run(self, start, duration, iterations):
+        start.wait()
+        deadline = time.monotonic() + duration
+        self.timed('login')
+        done = 0
+        while (iterations and done < iterations) or (not iterations and time.monotonic() < deadline):
+            self.timed(self.rng.choices(self.actions, self.weights)[0])
+            done += 1
+            if self.think:
+                time.sleep(self.rng.uniform(0, 2 * self.think))
+        if self.connection is not None:
+            self.connection.close()
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(seconds for _, _, seconds in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def quantile(q):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1e3, 2)
+
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if not 200 <= status < 400),
+        'statuses': statuses,
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1e3, 2),
+        'p50_ms': quantile(0.5),
+        'p90_ms': quantile(0.9),
+        'p99_ms': quantile(0.99),
+        'max_ms': round(latencies[-1] * 1e3, 2),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Drive the running API with concurrent simulated citizens, workers and admins (accounts from "
+            "seed_data) and report throughput and latency per endpoint; --output saves the report as JSON "
+            "and --compare shows the change against an earlier one. Run the server with THROTTLE_ENABLED=0 "
+            "unless the rate limits are what you want to measure")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=20, help="Simulated clients, one thread each")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run (ignored with --iterations)")
+        parser.add_argument('--iterations', type=int, default=0,
+                            help="Requests per client after login; makes the request mix exactly repeatable")
+        parser.add_argument('--mix', default='citizen=70,worker=25,admin=5', help="Share of clients per persona")
+        parser.add_argument('--prefix', default='load', help="Account prefix used by seed_data")
+        parser.add_argument('--users', type=int, default=20000, help="Seeded citizen accounts to spread over")
+        parser.add_argument('--workers', type=int, default=2000, help="Seeded worker accounts to spread over")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--think-ms', type=float, default=0, help="Mean pause between a client's requests")
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--label', default='', help="Stored in the report, e.g. a release tag")
+        parser.add_argument('--output', help="Write the JSON report here")
+        parser.add_argument('--compare', help="Earlier JSON report to compare against")
+
+    def parse_mix(self, mix):
+        shares = {}
+        for part in mix.split(','):
+            persona, _, share = part.partition('=')
+            if persona.strip() not in PERSONAS:
+                raise CommandError(f"Unknown persona '{persona}'; use {', '.join(PERSONAS)}")
+            try:
+                shares[persona.strip()] = float(share)
+            except ValueError:
+                raise CommandError(f"Invalid --mix entry: {part}")
+        return shares
+
+    def clients(self, options):
+        shares = self.parse_mix(options['mix'])
+        total = sum(shares.values())
+        personas = []
+        # Largest remainder, so the split is the same on every run
+        quotas = {persona: share / total * options['concurrency'] for persona, share in shares.items()}
+        for persona, quota in quotas.items():
+            personas.extend([persona] * int(quota))
+        remainders = sorted(quotas, key=lambda persona: quotas[persona] - int(quotas[persona]), reverse=True)
+        personas.extend(remainders[:options['concurrency'] - len(personas)])
+        rng = random.Random(options['seed'])
+        rng.shuffle(personas)
+
+        clients = []
+        for index, persona in enumerate(personas):
+            kind = ACCOUNTS[persona]
+            if kind == 'admin':
+                account = f"{options['prefix']}-admin"
+            else:
+                pool = options['users'] if kind == 'user' else options['workers']
+                account = f"{options['prefix']}-{kind}-{rng.randrange(pool)}"
+            clients.append(VirtualUser(index, persona, account, options))
+        return clients
+
+    def handle(self, *args, **options):
+        clients = self.clients(options)
+        start = threading.Barrier(len(clients) + 1)
+        threads = [threading.Thread(target=client.run, args=(start, options['duration'], options['iterations']),
+                                    daemon=True)
+                   for client in clients]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.monotonic()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        samples = [sample for client in clients for sample in client.samples]
+        if not samples:
+            raise CommandError("No requests completed")
+        actions = sorted({action for action, _, _ in samples})
+        report = {
+            'label': options['label'],
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'base_url': options['base_url'],
+            'python': platform.python_version(),
+            'options': {key: options[key] for key in ('concurrency', 'duration', 'iterations', 'mix', 'seed',
+                                                      'think_ms', 'users', 'workers')},
+            'elapsed_seconds': round(elapsed, 3),
+            'total': summarize(samples, elapsed),
+            'endpoints': {action: summarize([s for s in samples if s[0] == action], elapsed) for action in actions},
+        }
+        self.print_report(report)
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    self.print_comparison(report, json.load(handle))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def print_report(self, report):
+        self.stdout.write(f"{'endpoint':<18} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} "
+                          f"{'p90 ms':>8} {'p99 ms':>8} {'max ms':>9}")
+        rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+        for name, row in rows:
+            self.stdout.write(f"{name:<18} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8.1f} "
+                              f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>9.1f}")
+        failures = {status: count for status, count in report['total']['statuses'].items()
+                    if not 200 <= int(status) < 400}
+        if failures:
+            self.stdout.write(f"Failed responses by status (0 = connection error): {failures}")
+
+    def print_comparison(self, report, baseline):
+        self.stdout.write(f"\nAgainst {baseline.get('label') or baseline.get('started_at')}:")
+        self.stdout.write(f"{'endpoint':<18} {'rps':>9} {'p50':>9} {'p99':>9} {'errors':>9}")
+
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+
+        rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+        for name, row in rows:
+            old = baseline['total'] if name == 'TOTAL' else baseline.get('endpoints', {}).get(name)
+            if old is None:
+                self.stdout.write(f"{name:<18} {'new':>9}")
+                continue
+            self.stdout.write(f"{name:<18} {change(row['rps'], old['rps']):>9} "
+                              f"{change(row['p50_ms'], old['p50_ms']):>9} {change(row['p99_ms'], old['p99_ms']):>9} "
+                              f"{row['errors'] - old['errors']:>+9}")
@@ -0,0 +1,13 @@
+# complaint_system/management/commands/rebuild_dashboard_counters.py
+from django.core.management.base import BaseCommand
+
+from complaint_system import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard counters from the user and complaint tables"
+
+    def handle(self, *args, **options):
+        for name, value in sorted(counters.rebuild().items()):
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters rebuilt"))
@@ -0,0 +1,30 @@
+# complaint_system/management/commands/rebuild_search_index.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from complaint_system import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the complaint full-text search index from the complaint table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--optimize', action='store_true', help="Merge the index into one b-tree afterwards")
+        parser.add_argument('--check', action='store_true', help="Only verify the index against the table")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            try:
+                search.integrity_check()
+            except DatabaseError as exc:
+                raise CommandError(f"Search index is out of sync: {exc}")
+            self.stdout.write(self.style.SUCCESS("Search index is consistent"))
+            return
+
+        started = time.perf_counter()
+        search.rebuild()
+        if options['optimize']:
+            search.optimize()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search index in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,46 @@
+# complaint_system/management/commands/reconcile_worker_load.py
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from complaint_system.inbox import actual_unread_counts
+from complaint_system.models import Complaint, Worker
+
+
+class Command(BaseCommand):
+    help = ("Repair drift in Worker.active_complaint_count (from the actual ASSIGNED complaints) "
+            "and Worker.unread_notification_count (from the unread notifications)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it")
+
+    def handle(self, *args, **options):
+        active = dict(
+            Complaint.objects.filter(status='ASSIGNED', assigned_worker__isnull=False)
+            .order_by()
+            .values_list('assigned_worker')
+            .annotate(count=Count('id'))
+        )
+        self.reconcile('active_complaint_count', active, options['dry_run'])
+        self.reconcile('unread_notification_count', actual_unread_counts(), options['dry_run'])
+
+    def reconcile(self, field, actual, dry_run):
+        checked = repaired = skipped = 0
+        workers = Worker.objects.order_by('id').values_list('id', field)
+        for worker_id, recorded in workers.iterator(chunk_size=2000):
+            checked += 1
+            expected = actual.get(worker_id, 0)
+            if recorded == expected:
+                continue
+            self.stdout.write(f"Worker #{worker_id} {field}: recorded {recorded}, actual {expected}")
+            if dry_run:
+                continue
+            # Only overwrite the value we read, so a concurrent change wins
+            # and is picked up on the next run instead of being clobbered.
+            if Worker.objects.filter(id=worker_id, **{field: recorded}).update(**{field: expected}):
+                repaired += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{field}: checked {checked} worker(s), repaired {repaired}, skipped {skipped} changed concurrently"
+        ))
@@ -0,0 +1,32 @@
+# complaint_system/management/commands/revalidate_complaints.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from complaint_system.jobs import enqueue
+from complaint_system.validation import get_scorer, revalidate, stale_complaints
+
+
+class Command(BaseCommand):
+    help = ("Re-score complaints with the current validation model (by default only those "
+            "never validated or scored by an older model version)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-score every complaint, not just stale ones")
+        parser.add_argument('--enqueue', action='store_true', help="Queue a job instead of running inline")
+
+    def handle(self, *args, **options):
+        stale_only = not options['all']
+        if options['enqueue']:
+            enqueue('complaints.revalidate', {'stale_only': stale_only})
+            self.stdout.write("Revalidation queued")
+            return
+
+        if stale_only:
+            self.stdout.write(f"{stale_complaints().count()} complaint(s) stale for {get_scorer().version}")
+        started = time.perf_counter()
+        count = revalidate(stale_only=stale_only)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Validated {count} complaint(s) in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f}/s)"
+        ))
@@ -0,0 +1,58 @@
+# complaint_system/management/commands/run_jobs.py
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+
+
+def _worker_process(index, once):
+    # Runs in a spawned child, so Django must be set up before app imports
+    import django
+    django.setup()
+    from complaint_system.jobs import default_worker_id, work
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    try:
+        work(f"{default_worker_id()}-{index}", once=once, stop=lambda: bool(stopping))
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = "Run background job workers for the database-backed job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help="Number of worker processes to start")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no due jobs are left instead of polling forever")
+
+    def handle(self, *args, **options):
+        from complaint_system.jobs import work
+
+        processes = max(1, options['processes'])
+        once = options['once']
+
+        if processes == 1:
+            try:
+                count = work(once=once)
+            except KeyboardInterrupt:
+                return
+            self.stdout.write(self.style.SUCCESS(f"Processed {count} job(s)"))
+            return
+
+        # Spawned (not forked) children so no DB connection is shared
+        context = multiprocessing.get_context('spawn')
+        children = [context.Process(target=_worker_process, args=(i, once)) for i in range(processes)]
+        for child in children:
+            child.start()
+        self.stdout.write(f"Started {processes} job worker processes")
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+            for child in children:
+                child.join()
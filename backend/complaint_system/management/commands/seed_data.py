@@ -0,0 +1,144 @@
+# complaint_system/management/commands/seed_data.py
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from complaint_system import counters, response_cache, rollups
+from complaint_system.models import Complaint, CustomUser, Worker
+
+from .benchmark_duplicates import EVENTS, PLACES, SUBJECTS, SYLLABLES
+
+# Seeded accounts all share this password unless --password is given
+DEFAULT_PASSWORD = 'loadtest-password'
+CENTER = (12.97, 77.59)
+SPREAD = 0.15  # Degrees around CENTER, roughly a 30 km square
+
+
+class Command(BaseCommand):
+    help = ("Fill the database with synthetic users, workers with coordinates and complaints "
+            "(bulk inserts; counters, rollups and worker load are rebuilt afterwards). Accounts are "
+            "named <prefix>-user-N, <prefix>-worker-N and <prefix>-admin")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--workers', type=int, default=2000)
+        parser.add_argument('--complaints', type=int, default=1000000)
+        parser.add_argument('--days', type=int, default=365, help="Spread complaints over this many past days")
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Accounts named '{prefix}-...' already exist; pick another --prefix")
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        batch_size = options['batch_size']
+        # Hashing is deliberately slow; every seeded account shares one hash
+        password = make_password(options['password'])
+        started = time.perf_counter()
+
+        CustomUser.objects.create(username=f"{prefix}-admin", password=password, role='ADMIN', is_staff=True)
+        user_ids = self.create_users(prefix, 'user', 'USER', options['users'], password, now, rng, batch_size)
+        worker_user_ids = self.create_users(prefix, 'worker', 'WORKER', options['workers'], password, now, rng,
+                                            batch_size)
+        workers = self.create_workers(worker_user_ids, rng, batch_size)
+        self.stdout.write(f"Users: {len(user_ids)}, workers: {len(workers)} ({time.perf_counter() - started:.1f}s)")
+
+        loads = self.create_complaints(options['complaints'], options['days'], user_ids, workers, now, rng,
+                                       batch_size, started)
+        for worker in workers:
+            worker.active_complaint_count = loads.get(worker.id, 0)
+        Worker.objects.bulk_update(workers, ['active_complaint_count'], batch_size=batch_size)
+
+        # bulk_create() skips the signals that keep these up to date
+        counters.rebuild()
+        rollups.backfill()
+        response_cache.invalidate(Complaint, Worker, CustomUser)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids)} users, {len(workers)} workers and {options['complaints']} complaints "
+            f"in {time.perf_counter() - started:.1f}s; password: {options['password']}"
+        ))
+
+    def create_users(self, prefix, kind, role, count, password, now, rng, batch_size):
+        ids = []
+        for start in range(0, count, batch_size):
+            users = [
+                CustomUser(
+                    username=f"{prefix}-{kind}-{i}",
+                    email=f"{prefix}-{kind}-{i}@example.com",
+                    password=password,
+                    role=role,
+                    phone_number=f"9{rng.randrange(10 ** 9):09d}",
+                    date_joined=now - timedelta(days=rng.uniform(0, 730)),
+                )
+                for i in range(start, min(count, start + batch_size))
+            ]
+            with transaction.atomic():
+                ids.extend(user.id for user in CustomUser.objects.bulk_create(users))
+        return ids
+
+    def create_workers(self, user_ids, rng, batch_size):
+        workers = []
+        for user_id in user_ids:
+            latitude, longitude = self.point(rng)
+            workers.append(Worker(
+                user_id=user_id,
+                is_available=rng.random() < 0.9,
+                latitude=latitude,
+                longitude=longitude,
+                current_location=f"{latitude}, {longitude}",
+            ))
+        with transaction.atomic():
+            return Worker.objects.bulk_create(workers, batch_size=batch_size)
+
+    def point(self, rng):
+        return (round(CENTER[0] + rng.uniform(-SPREAD, SPREAD), 6),
+                round(CENTER[1] + rng.uniform(-SPREAD, SPREAD), 6))
+
+    def describe(self, rng, category):
+        street = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        return (f"{rng.choice(SUBJECTS[category]).capitalize()} {rng.choice(EVENTS)} "
+                f"{rng.choice(PLACES)} {street} road, house {rng.randint(1, 999)}")
+
+    def create_complaints(self, count, days, user_ids, workers, now, rng, batch_size, started):
+        """Insert ``count`` complaints; returns ``{worker_id: ASSIGNED complaints}``"""
+        loads = {}
+        categories = list(SUBJECTS)
+        for start in range(0, count, batch_size):
+            complaints = []
+            for _ in range(min(batch_size, count - start)):
+                category = rng.choice(categories)
+                # Skewed towards recent complaints, as real traffic is
+                created_at = now - timedelta(days=days * rng.random() ** 2)
+                latitude, longitude = self.point(rng)
+                complaint = Complaint(
+                    user_id=rng.choice(user_ids), category=category, description=self.describe(rng, category),
+                    created_at=created_at, latitude=latitude, longitude=longitude,
+                )
+                worker = rng.choice(workers) if workers else None
+                roll = rng.random()
+                if worker and roll < 0.7:
+                    complaint.status = 'RESOLVED'
+                    complaint.assigned_worker_id = worker.id
+                    complaint.assigned_at = min(now, created_at + timedelta(hours=rng.uniform(0.1, 12)))
+                    complaint.resolved_at = min(now, complaint.assigned_at + timedelta(hours=rng.uniform(0.5, 72)))
+                elif worker and roll < 0.85 and loads.get(worker.id, 0) < worker.max_active_complaints:
+                    complaint.status = 'ASSIGNED'
+                    complaint.assigned_worker_id = worker.id
+                    complaint.assigned_at = min(now, created_at + timedelta(hours=rng.uniform(0.1, 12)))
+                    loads[worker.id] = loads.get(worker.id, 0) + 1
+                complaints.append(complaint)
+            with transaction.atomic():
+                Complaint.objects.bulk_create(complaints)
+            done = start + len(complaints)
+            if done % (batch_size * 20) == 0 or done == count:
+                self.stdout.write(f"Complaints: {done}/{count} ({time.perf_counter() - started:.1f}s)")
+        return loads
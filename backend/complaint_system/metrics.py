@@ -0,0 +1,275 @@
+# complaint_system/metrics.py
+"""
+Request and operation metrics in the Prometheus text format.
+
+``MetricsMiddleware`` records a latency histogram per resolved URL name and
+method. It also records each request's SQL query count and time, through a
+``connection.execute_wrapper()``, and the size of each response. Code paths
+that are not requests, such as complaint intake and assignment, are timed
+with ``timed()``.
+
+Each process keeps its own series in memory behind one lock and writes a
+snapshot file at most every ``FLUSH_SECONDS``. The ``/metrics`` view adds
+up every process's snapshot, so a scrape covers the whole host whichever
+process serves it. Snapshots of processes that have exited are kept, so
+counters don't go backwards, until they are ``RETENTION_SECONDS`` old.
+"""
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIRECTORY': None,            # Defaults to metrics/ in VAR_DIR
+    'FLUSH_SECONDS': 5,           # How stale another process's numbers may be in a scrape
+    'RETENTION_SECONDS': 86400,   # Snapshots of exited processes are dropped after this
+    'TOKEN': '',                  # Bearer token for scrapers; admins can always read /metrics
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': ('counter', "Requests by URL name, method and status", None),
+    'http_request_duration_seconds': ('histogram', "Time to produce the response", LATENCY_BUCKETS),
+    'http_request_db_queries': ('histogram', "SQL queries run per request", QUERY_BUCKETS),
+    'http_request_db_seconds': ('histogram', "Time spent in SQL per request", LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', "Response body size (not streamed responses)", SIZE_BUCKETS),
+    'operation_duration_seconds': ('histogram', "Time spent in instrumented code paths", LATENCY_BUCKETS),
+    'operation_errors_total': ('counter', "Instrumented code paths that raised", None),
+}
+
+
+def metrics_setting(name):
+    value = getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+    if name == 'DIRECTORY' and value is None:
+        value = os.path.join(getattr(settings, 'VAR_DIR', settings.BASE_DIR), 'metrics')
+    return value
+
+
+class Registry:
+    """This process's series: ``{(name, labels): values}``"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._pid = None
+        self._path = None
+        self._flushed_at = time.monotonic()
+
+    def _check_fork(self):
+        # A forked worker would otherwise report its parent's numbers again
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = None
+            self._series = {}
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._check_fork()
+            self._series.setdefault((name, labels), [0])[0] += amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self._lock:
+            self._check_fork()
+            series = self._series.get((name, labels))
+            if series is None:
+                # Per-bucket counts (made cumulative on export), then sum and count
+                series = self._series[(name, labels)] = [0] * (len(buckets) + 3)
+            series[bisect.bisect_left(buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            self._check_fork()
+            return [[name, list(labels), list(values)] for (name, labels), values in self._series.items()]
+
+    def path(self):
+        if self._path is None:
+            self._path = os.path.join(metrics_setting('DIRECTORY'), f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json")
+        return self._path
+
+    def flush(self):
+        series = self.snapshot()
+        if not series:
+            return
+        path = self.path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as handle:
+            json.dump(series, handle)
+        os.replace(temporary, path)
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        if now - self._flushed_at >= metrics_setting('FLUSH_SECONDS'):
+            self._flushed_at = now
+            try:
+                self.flush()
+            except OSError:
+                pass  # Metrics must never fail a request
+
+
+registry = Registry()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        registry.flush()
+    except OSError:
+        pass
+
+
+def collect():
+    """Every process's series added up: ``{(name, labels): values}``"""
+    directory = metrics_setting('DIRECTORY')
+    own = registry.path()
+    snapshots = [registry.snapshot()]
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        names = []
+    expired = time.time() - metrics_setting('RETENTION_SECONDS')
+    for name in names:
+        path = os.path.join(directory, name)
+        if not name.endswith('.json') or path == own:
+            continue
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+                continue
+            with open(path) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            continue  # Removed or replaced while we read it
+    merged = {}
+    for snapshot in snapshots:
+        for name, labels, values in snapshot:
+            if name not in METRICS:
+                continue
+            key = (name, tuple(tuple(pair) for pair in labels))
+            total = merged.get(key)
+            if total is None or len(total) != len(values):
+                merged[key] = list(values)
+            else:
+                merged[key] = [a + b for a, b in zip(total, values)]
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in pairs)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(series=None):
+    """Prometheus text exposition format"""
+    series = collect() if series is None else series
+    by_name = {}
+    for (name, labels), values in series.items():
+        by_name.setdefault(name, []).append((labels, values))
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text, buckets = METRICS[name]
+        full_name = f"complaint_system_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        for labels, values in sorted(by_name[name]):
+            label_text = _labels(labels)
+            if kind == 'counter':
+                lines.append(f"{full_name}{{{label_text}}} {_number(values[0])}")
+                continue
+            prefix = f"{label_text}," if label_text else ''
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), values[:-2]):
+                cumulative += count
+                lines.append(f'{full_name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{full_name}_sum{{{label_text}}} {_number(values[-2])}")
+            lines.append(f"{full_name}_count{{{label_text}}} {values[-1]}")
+    return '\n'.join(lines) + '\n'
+
+
+def timed(operation):
+    """Record how long the decorated function takes as ``operation``"""
+    def decorator(func):
+        labels = (('operation', operation),)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics_setting('ENABLED'):
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                registry.inc('operation_errors_total', labels)
+                raise
+            finally:
+                registry.observe('operation_duration_seconds', labels, time.perf_counter() - started)
+                registry.maybe_flush()
+        return wrapper
+    return decorator
+
+
+class QueryTimer:
+    """``connection.execute_wrapper()`` callable that counts and times queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency, SQL and response size per URL name and method"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = metrics_setting('ENABLED')
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        queries = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        labels = (('view', view), ('method', request.method))
+        registry.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+        registry.observe('http_request_duration_seconds', labels, elapsed)
+        registry.observe('http_request_db_queries', labels, queries.count)
+        registry.observe('http_request_db_seconds', labels, queries.seconds)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content))
+        registry.maybe_flush()
+        return response
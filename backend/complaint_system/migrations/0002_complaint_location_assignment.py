@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint_system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='assigned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='assigned_worker',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_complaints', to='complaint_system.worker'),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='complaint',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('ASSIGNED', 'Assigned'), ('RESOLVED', 'Resolved')], default='PENDING', max_length=20),
+        ),
+    ]
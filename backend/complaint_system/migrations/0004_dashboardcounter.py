@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_counters(apps, schema_editor):
+    CustomUser = apps.get_model('complaint_system', 'CustomUser')
+    Complaint = apps.get_model('complaint_system', 'Complaint')
+    DashboardCounter = apps.get_model('complaint_system', 'DashboardCounter')
+
+    values = {'users': CustomUser.objects.count(), 'complaints': Complaint.objects.count()}
+    for status in ('PENDING', 'ASSIGNED', 'RESOLVED'):
+        values[f'complaints.{status}'] = 0
+    for row in Complaint.objects.order_by().values('status').annotate(count=Count('id')):
+        values[f"complaints.{row['status']}"] = row['count']
+    DashboardCounter.objects.bulk_create([DashboardCounter(name=name, value=value) for name, value in values.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint_system', '0003_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:48
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_unread(apps, schema_editor):
+    Notification = apps.get_model('complaint_system', 'Notification')
+    Worker = apps.get_model('complaint_system', 'Worker')
+
+    unread = Notification.objects.filter(is_read=False).order_by().values_list('worker').annotate(count=Count('id'))
+    for worker_id, count in unread:
+        Worker.objects.filter(id=worker_id).update(unread_notification_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint_system', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='worker',
+            name='unread_notification_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
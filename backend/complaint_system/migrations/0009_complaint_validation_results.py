@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint_system', '0008_complaint_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='ai_feedback',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='ai_validation_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='is_ai_validated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='validated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='validation_model',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations
+
+# External-content FTS5 index over complaint descriptions and categories,
+# kept in sync by triggers (see complaint_system/search.py)
+CREATE_SQL = [
+    """CREATE VIRTUAL TABLE complaint_search USING fts5(
+        description, category,
+        content='complaint_system_complaint', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER complaint_search_ai AFTER INSERT ON complaint_system_complaint BEGIN
+        INSERT INTO complaint_search(rowid, description, category) VALUES (new.id, new.description, new.category);
+    END""",
+    """CREATE TRIGGER complaint_search_ad AFTER DELETE ON complaint_system_complaint BEGIN
+        INSERT INTO complaint_search(complaint_search, rowid, description, category)
+        VALUES ('delete', old.id, old.description, old.category);
+    END""",
+    # Fires for any UPDATE whose SET list names description or category, changed or not:
+    # Model.save() without update_fields always does. Status changes and assignment
+    # (assignment.py) update only their own columns with QuerySet.update(), so they skip it
+    """CREATE TRIGGER complaint_search_au AFTER UPDATE OF description, category ON complaint_system_complaint BEGIN
+        INSERT INTO complaint_search(complaint_search, rowid, description, category)
+        VALUES ('delete', old.id, old.description, old.category);
+        INSERT INTO complaint_search(rowid, description, category) VALUES (new.id, new.description, new.category);
+    END""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS complaint_search_au",
+    "DROP TRIGGER IF EXISTS complaint_search_ad",
+    "DROP TRIGGER IF EXISTS complaint_search_ai",
+    "DROP TABLE IF EXISTS complaint_search",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+    schema_editor.execute("INSERT INTO complaint_search(complaint_search) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint_system', '0010_complaint_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
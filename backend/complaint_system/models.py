@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.core.validators import MinLengthValidator
 from django.contrib.auth.models import AbstractUser
 
@@ -16,18 +17,52 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='USER')
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    # Bumped whenever the claims in issued tokens go stale (see auth.py)
+    token_version = models.PositiveIntegerField(default=0)
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin user list, newest first (cursor pagination)
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username} - {self.get_role_display()}"
 
+    @cached_property
+    def worker_id(self):
+        # Same attribute as on token users (auth.ClaimsUser)
+        return Worker.objects.filter(user_id=self.id).values_list('id', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # token_version only moves through auth.bump_token_version(); never
+            # write back a value this instance may have loaded before a bump
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'token_version' and field.attname not in deferred
+            ]
+        # post_save receivers (dashboard counters etc.) commit with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 class Worker(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="worker_profile")
     is_available = models.BooleanField(default=True)
     current_location = models.CharField(max_length=255, blank=True, null=True)
     max_active_complaints = models.IntegerField(default=3)
     active_complaint_count = models.IntegerField(default=0)
+    # Maintained by complaint_system/inbox.py so badges never count rows
+    unread_notification_count = models.IntegerField(default=0)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Available-worker lists and the spatial index reload
+            models.Index(fields=['id'], condition=models.Q(is_available=True), name='worker_available_idx'),
+        ]
     
     def __str__(self):
         return f"Worker: {self.user.username}"
@@ -38,6 +73,92 @@ from django.utils import timezone
 from django.core.validators import MinLengthValidator
 from .models import CustomUser  # adjust import if needed
 
+
+# Remove AdminDashboard model - better to calculate metrics dynamically
+# You can create a view or manager methods instead
+
+class DashboardCounter(models.Model):
+    """
+    Incrementally maintained counters behind the admin dashboard.
+
+    Rows are adjusted in the same transaction as the change they count (see
+    ``counters.py``), so reading the dashboard is one query on a tiny table.
+    """
+    USERS = 'users'
+    COMPLAINTS = 'complaints'
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    @staticmethod
+    def status_key(status):
+        return f"complaints.{status}"
+
+
+class ComplaintRollup(models.Model):
+    """
+    Number of complaints created in a time bucket, per category and current
+    status. Kept up to date incrementally by ``rollups.py``.
+    """
+    bucket = models.DateTimeField()  # Start of the hour/day, UTC
+    category = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M} {self.category}/{self.status}: {self.count}"
+
+
+class HourlyComplaintRollup(ComplaintRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'category', 'status'], name='hourly_rollup_unique_bucket'),
+        ]
+
+
+class DailyComplaintRollup(ComplaintRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'category', 'status'], name='daily_rollup_unique_bucket'),
+        ]
+
+
+class ComplaintManager(models.Manager):
+    def get_dashboard_stats(self):
+        """Get statistics for admin dashboard"""
+        counters = dict(DashboardCounter.objects.values_list('name', 'value'))
+        names = [DashboardCounter.USERS, DashboardCounter.COMPLAINTS]
+        names += [DashboardCounter.status_key(code) for code, _ in Complaint.STATUS_CHOICES]
+        if all(name in counters for name in names):
+            stats = {
+                'total_users': counters[DashboardCounter.USERS],
+                'total_complaints': counters[DashboardCounter.COMPLAINTS],
+            }
+            for code, _ in Complaint.STATUS_CHOICES:
+                stats[f'{code.lower()}_complaints'] = counters[DashboardCounter.status_key(code)]
+        else:
+            # Counters not built yet: fall back to counting the tables
+            stats = self.aggregate_dashboard_stats()
+            stats['total_users'] = CustomUser.objects.count()
+
+        total_complaints = stats['total_complaints']
+        stats['resolution_rate'] = (stats['resolved_complaints'] / total_complaints * 100) if total_complaints > 0 else 0
+        return stats
+
+    def aggregate_dashboard_stats(self):
+        """Count complaints in total and per status with one conditional-aggregation query"""
+        aggregates = {'total_complaints': models.Count('id')}
+        for code, _ in Complaint.STATUS_CHOICES:
+            aggregates[f'{code.lower()}_complaints'] = models.Count('id', filter=models.Q(status=code))
+        return self.order_by().aggregate(**aggregates)
+
+
 class Complaint(models.Model):
     CATEGORY_CHOICES = [
         ("DOG", "Dog Nuisance"),
@@ -46,6 +167,7 @@ class Complaint(models.Model):
 
     STATUS_CHOICES = [
         ("PENDING", "Pending"),
+        ("ASSIGNED", "Assigned"),
         ("RESOLVED", "Resolved"),
     ]
 
@@ -54,13 +176,50 @@ class Complaint(models.Model):
     description = models.TextField(validators=[MinLengthValidator(10)])
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
     created_at = models.DateTimeField(default=timezone.now)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    assigned_worker = models.ForeignKey(
+        Worker, on_delete=models.SET_NULL, blank=True, null=True, related_name="assigned_complaints"
+    )
+    assigned_at = models.DateTimeField(blank=True, null=True)
+    resolved_at = models.DateTimeField(blank=True, null=True)
+    # Version stamp for conditional GETs; QuerySet.update() callers set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
+    # Written by complaint_system/validation.py
+    is_ai_validated = models.BooleanField(default=False)
+    ai_validation_score = models.FloatField(blank=True, null=True)
+    ai_feedback = models.TextField(blank=True, default="")
+    validation_model = models.CharField(max_length=50, blank=True, default="")
+    validated_at = models.DateTimeField(blank=True, null=True)
+    # Set by complaint_system/duplicates.py; duplicates are never dispatched
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, blank=True, null=True, related_name="duplicates"
+    )
+
+    objects = ComplaintManager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Complaint list and "recent complaints" ranges
+            models.Index(fields=["created_at", "id"], name="complaint_created_idx"),
+            # Dashboard/batch filters by status, oldest or newest first
+            models.Index(fields=["status", "created_at"], name="complaint_status_created_idx"),
+            # "My complaints" and "assigned to me", newest first
+            models.Index(fields=["user", "created_at"], name="complaint_user_created_idx"),
+            models.Index(fields=["assigned_worker", "created_at"], name="complaint_worker_created_idx"),
+            # Latest change across all complaints (collection ETags)
+            models.Index(fields=["updated_at"], name="complaint_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Complaint #{self.id} - {self.get_category_display()} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        # post_save receivers (dashboard counters etc.) commit with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 
 class Notification(models.Model):
@@ -73,6 +232,16 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A worker's notifications, newest first
+            models.Index(fields=['worker', 'created_at'], name='notification_worker_idx'),
+            models.Index(fields=['worker'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        # The worker's unread counter is adjusted by a post_save receiver
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     def __str__(self):
         return f"Notification for {self.worker.user.username} - Complaint #{self.complaint.id}"
@@ -90,24 +259,31 @@ class ComplaintAssignmentLog(models.Model):
         return f"Assignment log for Complaint #{self.complaint.id}"
 
 
-# Remove AdminDashboard model - better to calculate metrics dynamically
-# You can create a view or manager methods instead
+class Job(models.Model):
+    """Durable background job, claimed and run by `manage.py run_jobs` worker processes"""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
 
-class ComplaintManager(models.Manager):
-    def get_dashboard_stats(self):
-        """Get statistics for admin dashboard"""
-        total_complaints = self.count()
-        resolved_complaints = self.filter(status="RESOLVED").count()
-        pending_complaints = self.filter(status="PENDING").count()
-        in_progress_complaints = self.filter(status="IN_PROGRESS").count()
-        
-        return {
-            'total_complaints': total_complaints,
-            'resolved_complaints': resolved_complaints,
-            'pending_complaints': pending_complaints,
-            'in_progress_complaints': in_progress_complaints,
-            'resolution_rate': (resolved_complaints / total_complaints * 100) if total_complaints > 0 else 0
-        }
-
-# Add the manager to Complaint model
-Complaint.objects = ComplaintManager()
\ No newline at end of file
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    available_at = models.DateTimeField(default=timezone.now)  # Not run before this time
+    locked_until = models.DateTimeField(blank=True, null=True)  # Visibility timeout while RUNNING
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='job_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} - {self.name} - {self.status}"
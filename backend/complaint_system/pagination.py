@@ -0,0 +1,31 @@
+# complaint_system/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    """
+    Keyset pagination on ``-created_at`` (``-id`` breaks ties), so page N
+    costs the same index range scan as page one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class UserCursorPagination(NewestFirstCursorPagination):
+    ordering = ('-date_joined', '-id')
+
+
+class WorkerCursorPagination(NewestFirstCursorPagination):
+    ordering = ('id',)
+
+
+def paginated_response(view, queryset, serializer_class, pagination_class=NewestFirstCursorPagination):
+    """Paginate ``queryset`` for an ``APIView`` and return the page response"""
+    if hasattr(serializer_class, 'setup_eager_loading'):
+        queryset = serializer_class.setup_eager_loading(queryset)
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, view.request, view=view)
+    serializer = serializer_class(page, many=True, context={'request': view.request})
+    return paginator.get_paginated_response(serializer.data)
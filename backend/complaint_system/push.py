@@ -0,0 +1,222 @@
+# complaint_system/push.py
+"""
+Real-time notification push.
+
+Every server process keeps an in-process ``Broker`` that maps worker ids
+to the queues of their open event streams. A new ``Notification`` is
+published to that broker and appended to a small spool -- a separate
+SQLite file shared by all processes on the host -- so notifications
+created by other web or job-queue processes reach local subscribers too.
+A relay thread tails the spool while anyone in the process is listening;
+no external broker is needed.
+
+Stream events carry the notification id, so a reconnecting client sends
+``Last-Event-ID`` and gets whatever it missed from the database. That is
+also what keeps streams served over WSGI bounded: each one holds a thread,
+so it ends after ``SYNC_STREAM_SECONDS`` and the client reconnects.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SPOOL_PATH': None,          # Defaults to push_spool.sqlite3 in VAR_DIR
+    'POLL_INTERVAL': 0.25,       # Seconds between spool reads while streams are open
+    'RETENTION_SECONDS': 300,    # Spooled events older than this are pruned
+    'KEEPALIVE_SECONDS': 15,     # Comment line sent on idle streams
+    'QUEUE_SIZE': 100,           # Events buffered per stream before dropping
+    'REPLAY_LIMIT': 100,         # Missed notifications replayed on reconnect
+    'SYNC_STREAM_SECONDS': 30,   # Lifetime of a stream served over WSGI, which holds a thread
+}
+
+# Identifies this process in the spool, so the relay skips its own events
+ORIGIN = uuid.uuid4().hex
+
+
+def push_setting(name):
+    value = getattr(settings, 'PUSH', {}).get(name, DEFAULTS[name])
+    if name == 'SPOOL_PATH' and value is None:
+        value = os.path.join(getattr(settings, 'VAR_DIR', settings.BASE_DIR), 'push_spool.sqlite3')
+    return value
+
+
+def notification_event(notification):
+    """The stream payload for a notification, built without extra queries"""
+    return {
+        'id': notification.id,
+        'worker': notification.worker_id,
+        'complaint': notification.complaint_id,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at,
+    }
+
+
+class Spool:
+    """Append-only event log in its own SQLite file, shared between processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._ready = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS push_event ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " origin TEXT NOT NULL,"
+                " worker_id INTEGER NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            self._ready = True
+        return connection
+
+    def append(self, events):
+        """Append ``[(worker_id, payload)]``"""
+        now = time.time()
+        rows = [(ORIGIN, worker_id, json.dumps(payload, cls=DjangoJSONEncoder), now)
+                for worker_id, payload in events]
+        connection = self._connect()
+        try:
+            connection.executemany(
+                "INSERT INTO push_event (origin, worker_id, payload, created) VALUES (?, ?, ?, ?)", rows
+            )
+            connection.execute("DELETE FROM push_event WHERE created < ?",
+                               (now - push_setting('RETENTION_SECONDS'),))
+        finally:
+            connection.close()
+
+    def last_id(self, connection):
+        return connection.execute("SELECT COALESCE(MAX(id), 0) FROM push_event").fetchone()[0]
+
+    def read_after(self, connection, cursor):
+        """
+        Return ``(new_cursor, events)`` for rows above ``cursor``; events are
+        ``(worker_id, payload)`` from other processes only.
+        """
+        rows = connection.execute(
+            "SELECT id, origin, worker_id, payload FROM push_event WHERE id > ? ORDER BY id", (cursor,)
+        ).fetchall()
+        if rows:
+            cursor = rows[-1][0]
+        return cursor, [(row[2], json.loads(row[3])) for row in rows if row[1] != ORIGIN]
+
+
+class Broker:
+    """Process-wide fan-out from published events to open streams"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._relay = None
+        self._spool = None
+
+    @property
+    def spool(self):
+        if self._spool is None:
+            self._spool = Spool(push_setting('SPOOL_PATH'))
+        return self._spool
+
+    def subscribe(self, worker_id, threaded=False):
+        """
+        Open a stream for ``worker_id``; call from the stream's event loop,
+        or pass ``threaded=True`` for a stream read by a blocking thread.
+        """
+        if threaded:
+            subscription = (None, queue.Queue(maxsize=push_setting('QUEUE_SIZE')))
+        else:
+            subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=push_setting('QUEUE_SIZE')))
+        with self._lock:
+            self._subscribers[worker_id].add(subscription)
+            if self._relay is None:
+                self._relay = threading.Thread(target=self._run_relay, name='push-relay', daemon=True)
+                self._relay.start()
+        return subscription
+
+    def unsubscribe(self, worker_id, subscription):
+        with self._lock:
+            self._subscribers[worker_id].discard(subscription)
+            if not self._subscribers[worker_id]:
+                del self._subscribers[worker_id]
+
+    def deliver(self, worker_id, payload):
+        """Hand ``payload`` to this process's streams for ``worker_id``; thread-safe"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(worker_id, ()))
+        for loop, events in subscriptions:
+            if loop is None:
+                _offer(events, payload)
+            else:
+                loop.call_soon_threadsafe(_offer, events, payload)
+
+    def publish(self, events):
+        """Deliver ``[(worker_id, payload)]`` locally and spool them for other processes"""
+        for worker_id, payload in events:
+            self.deliver(worker_id, payload)
+        try:
+            self.spool.append(events)
+        except sqlite3.Error:
+            logger.exception("Could not spool %s push event(s)", len(events))
+
+    def _still_needed(self):
+        with self._lock:
+            if not self._subscribers:
+                self._relay = None
+                return False
+            return True
+
+    def _run_relay(self):
+        connection = None
+        cursor = None
+        while self._still_needed():
+            try:
+                if connection is None:
+                    connection = self.spool._connect()
+                    if cursor is None:
+                        cursor = self.spool.last_id(connection)
+                cursor, events = self.spool.read_after(connection, cursor)
+                for worker_id, payload in events:
+                    self.deliver(worker_id, payload)
+            except sqlite3.Error:
+                logger.exception("Push relay could not read the spool")
+                if connection is not None:
+                    connection.close()
+                connection = None
+            time.sleep(push_setting('POLL_INTERVAL'))
+        if connection is not None:
+            connection.close()
+
+
+def _offer(events, payload):
+    # A client too slow to drain its queue loses events here; it catches
+    # up from the database through Last-Event-ID when it reconnects
+    try:
+        events.put_nowait(payload)
+    except (asyncio.QueueFull, queue.Full):
+        pass
+
+
+broker = Broker()
+
+
+def publish_notifications(notifications):
+    """Push ``notifications`` to their workers once the current transaction commits"""
+    events = [(n.worker_id, notification_event(n)) for n in notifications]
+    if events:
+        transaction.on_commit(lambda: broker.publish(events))
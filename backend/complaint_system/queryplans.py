@@ -0,0 +1,192 @@
+# complaint_system/queryplans.py
+"""
+EXPLAIN-based checks for the hot query shapes.
+
+Every router viewset's list queryset is checked automatically, with its
+eager loading, pagination ordering and page limit applied; querysets built
+inline by ``APIView`` handlers are registered below with ``@register``. A shape
+fails when its plan reads a table without an index (SQLite ``SCAN t``,
+PostgreSQL ``Seq Scan on t``), unless that table is explicitly allowed.
+
+Run ``manage.py check_query_plans``, or call ``check_query_plans()`` from a
+test and assert that it returns nothing.
+"""
+import re
+from types import SimpleNamespace
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .duplicates import INDEX_FIELDS, open_parents
+from .exports import export_queryset
+from .jobs import _claimable
+from .models import (
+    Complaint, CustomUser, DashboardCounter, HourlyComplaintRollup, Job, Notification, Worker
+)
+from .pagination import NewestFirstCursorPagination, UserCursorPagination, WorkerCursorPagination
+from .serializers import NotificationSerializer, WorkerSerializer
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)$')
+POSTGRES_SEQ_SCAN = re.compile(r'\bSeq Scan on (\w+)')
+
+_shapes = []
+
+
+def register(name, allow_scans=()):
+    """Register a function returning a queryset whose plan must use indexes"""
+    def decorator(func):
+        _shapes.append((name, func, set(allow_scans)))
+        return func
+    return decorator
+
+
+def full_table_scans(queryset):
+    """Return ``(tables, plan)`` for the tables ``queryset`` reads without an index"""
+    plan = queryset.explain()
+    tables = []
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and 'USING' not in match.group(2):
+            tables.append(match.group(1))
+            continue
+        match = POSTGRES_SEQ_SCAN.search(line)
+        if match:
+            tables.append(match.group(1))
+    return tables, plan
+
+
+def sample_user(role):
+    """An unsaved stand-in user that related filters accept as saved"""
+    user = CustomUser(id=1, username=f'plan-check-{role.lower()}', role=role)
+    user._state.adding = False
+    user.worker_id = 1  # Like the token claim; skips the worker lookup
+    return user
+
+
+def page(queryset, pagination_class=NewestFirstCursorPagination):
+    """What a cursor page fetches: the paginator's ordering and one row extra"""
+    return queryset.order_by(*pagination_class.ordering)[:pagination_class.page_size + 1]
+
+
+def viewset_shapes():
+    from .urls import router
+
+    for prefix, viewset, basename in router.registry:
+        for role, _ in CustomUser.ROLE_CHOICES:
+            view = viewset(action='list', kwargs={}, format_kwarg=None)
+            view.request = SimpleNamespace(user=sample_user(role), query_params={}, method='GET')
+            queryset = view.filter_queryset(view.get_queryset())
+            if not isinstance(queryset, QuerySet) or queryset.query.is_empty():
+                continue
+            allow_scans = set()
+            if view.pagination_class is not None:
+                queryset = page(queryset, view.pagination_class)
+                if tuple(view.pagination_class.ordering) == ('id',) and not queryset.query.where:
+                    # An unfiltered page in primary-key order is a LIMITed walk
+                    # of the table b-tree itself (WorkerViewSet.list); with a
+                    # filter the scan could read the whole table
+                    allow_scans.add(queryset.model._meta.db_table)
+            yield f"{viewset.__name__}.list ({role})", queryset, allow_scans
+
+
+def registered_shapes():
+    for name, func, allow_scans in _shapes:
+        yield name, func(), allow_scans
+
+
+def check_query_plans():
+    """Return ``[(name, tables, plan)]`` for every shape with a full-table scan"""
+    problems = []
+    for name, queryset, allow_scans in list(viewset_shapes()) + list(registered_shapes()):
+        tables, plan = full_table_scans(queryset)
+        tables = [table for table in tables if table not in allow_scans]
+        if tables:
+            problems.append((name, tables, plan))
+    return problems
+
+
+def all_plans():
+    """Return ``[(name, plan)]`` for every checked shape"""
+    shapes = list(viewset_shapes()) + list(registered_shapes())
+    return [(name, full_table_scans(queryset)[1]) for name, queryset, _ in shapes]
+
+
+# Allowed scans, and only these: the unfiltered worker pages
+# (WorkerManagementView.get here, WorkerViewSet.list in viewset_shapes())
+# walk the rowid b-tree in primary-key order and stop after one page, and
+# the dashboard counters are a handful of rows.
+
+@register('AdminUserManagementView.get')
+def _admin_users():
+    return page(CustomUser.objects.all(), UserCursorPagination)
+
+
+@register('WorkerManagementView.get', allow_scans={Worker._meta.db_table})
+def _admin_workers():
+    return page(WorkerSerializer.setup_eager_loading(Worker.objects.all()), WorkerCursorPagination)
+
+
+@register('AvailableWorkers.get')
+def _available_workers():
+    return page(WorkerSerializer.setup_eager_loading(Worker.objects.filter(is_available=True)),
+                WorkerCursorPagination)
+
+
+@register('UserComplaints.get')
+def _user_complaints():
+    return page(Complaint.objects.filter(user_id=sample_user('USER').id))
+
+
+@register('WorkerComplaints.get')
+def _worker_complaints():
+    return page(Complaint.objects.filter(assigned_worker_id=sample_user('WORKER').worker_id))
+
+
+@register('UserNotifications.get')
+def _user_notifications():
+    notifications = Notification.objects.filter(worker_id=sample_user('WORKER').worker_id)
+    return page(NotificationSerializer.setup_eager_loading(notifications))
+
+
+@register('DashboardStats.get (counters)', allow_scans={DashboardCounter._meta.db_table})
+def _dashboard_counters():
+    return DashboardCounter.objects.values_list('name', 'value')
+
+
+@register('DashboardStats.get (recent complaints)')
+def _recent_complaints():
+    return Complaint.objects.filter(created_at__gte=timezone.now()).values('id')
+
+
+@register('ComplaintTrends.get')
+def _trends():
+    now = timezone.now()
+    return HourlyComplaintRollup.objects.filter(bucket__gte=now, bucket__lt=now, count__gt=0)
+
+
+@register('ComplaintExport.get')
+def _export():
+    now = timezone.now()
+    return export_queryset(start=now, end=now)
+
+
+@register('batch_assign_pending')
+def _pending_complaints():
+    return Complaint.objects.filter(
+        status='PENDING', assigned_worker__isnull=True, duplicate_of__isnull=True
+    ).order_by('created_at')
+
+
+@register('get_worker_index')
+def _worker_index_reload():
+    return Worker.objects.filter(is_available=True).values_list('id', 'latitude', 'longitude')
+
+
+@register('get_duplicate_index (catch-up)')
+def _duplicate_index_catch_up():
+    return open_parents().filter(id__gt=0).values_list(*INDEX_FIELDS)
+
+
+@register('claim_jobs')
+def _claim_jobs():
+    return Job.objects.filter(_claimable(timezone.now())).order_by('available_at', 'id').values_list('id')[:20]
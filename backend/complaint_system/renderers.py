@@ -0,0 +1,113 @@
+# complaint_system/renderers.py
+"""
+JSON rendering for the API.
+
+``FastJSONRenderer`` is the project default: DRF's ``JSONRenderer`` with
+the encoding done by orjson when it is installed (it falls back to the
+standard library otherwise). ``streaming_json_response()`` is for lists too
+large to hold in memory: it serializes a queryset in chunks straight off a
+database iterator and writes the JSON array as it goes, optionally gzipped.
+"""
+import zlib
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(value):
+    # Types orjson doesn't know natively (Decimal, lazy strings, ...) are
+    # encoded the way DRF would encode them
+    return _fallback_encoder.default(value)
+
+
+def encode_json(data):
+    """Compact UTF-8 JSON bytes for ``data``"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return _fallback_encoder.encode(data).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` backed by orjson for the common, compact case"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if orjson is None or (indent and indent != 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, default=_default, option=option)
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of byte chunks incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def streaming_response(chunks, content_type, request=None, gzip=None, filename=None):
+    """
+    Wrap a generator of byte chunks in a ``StreamingHttpResponse``, gzipped
+    when ``gzip`` is true (default: when the client accepts it).
+    """
+    if gzip is None:
+        gzip = request is not None and accepts_gzip(request)
+    response = StreamingHttpResponse(gzip_chunks(chunks) if gzip else chunks, content_type=content_type)
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
+    response['X-Accel-Buffering'] = 'no'
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def serialized_batches(queryset, serializer_class, context=None, chunk_size=500):
+    """
+    Yield lists of serialized rows for ``queryset`` while holding at most
+    ``chunk_size`` model instances in memory.
+    """
+    if hasattr(serializer_class, 'setup_eager_loading'):
+        queryset = serializer_class.setup_eager_loading(queryset)
+    batch = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        batch.append(instance)
+        if len(batch) == chunk_size:
+            yield serializer_class(batch, many=True, context=context).data
+            batch = []
+    if batch:
+        yield serializer_class(batch, many=True, context=context).data
+
+
+def streaming_json_response(request, queryset, serializer_class, chunk_size=500, gzip=None):
+    """
+    Stream ``{"results": [...]}`` for every row of ``queryset``, encoding
+    one chunk of rows at a time so memory stays flat however large it is.
+    """
+    def chunks():
+        yield b'{"results":['
+        separator = b''
+        for rows in serialized_batches(queryset, serializer_class, {'request': request}, chunk_size):
+            yield separator + b','.join(encode_json(row) for row in rows)
+            separator = b','
+        yield b']}'
+
+    return streaming_response(chunks(), 'application/json', request=request, gzip=gzip)
@@ -0,0 +1,111 @@
+# complaint_system/response_cache.py
+"""
+Response cache for read-heavy endpoints.
+
+A cached GET handler is keyed on the view, the user's role and the full
+request URL, plus a generation token for every model the response is
+built from. Changing a model replaces its token once the transaction
+commits -- via the signals in ``signals.py``, or by an explicit
+``invalidate()`` in code that writes with ``QuerySet.update()`` or the
+bulk methods -- so stale entries are simply never looked up again and
+expire on their own.
+
+Entries and tokens live in the ``responses`` cache alias, which must be
+shared by all server processes (the file-based backend by default).
+Hit, miss and invalidation counts are kept per process; see ``stats()``.
+"""
+import functools
+import hashlib
+import threading
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'responses'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS if CACHE_ALIAS in settings.CACHES else 'default']
+
+
+def _count(event, amount=1):
+    with _stats_lock:
+        _stats[event] += amount
+
+
+def stats():
+    """This process's hit, miss and invalidation counts plus the hit rate"""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    lookups = snapshot.get('hits', 0) + snapshot.get('misses', 0)
+    snapshot.setdefault('hits', 0)
+    snapshot.setdefault('misses', 0)
+    snapshot.setdefault('invalidations', 0)
+    snapshot['hit_rate'] = round(snapshot['hits'] / lookups, 4) if lookups else None
+    return snapshot
+
+
+def _generation_key(model):
+    return f"generation:{model._meta.label_lower}"
+
+
+def invalidate(*models):
+    """Drop every cached response built from ``models`` once the transaction commits"""
+    def bump():
+        get_cache().set_many({_generation_key(model): uuid.uuid4().hex for model in models}, timeout=None)
+        _count('invalidations', len(models))
+    transaction.on_commit(bump)
+
+
+def _response_key(view, request, models):
+    cache = get_cache()
+    keys = [_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in generations}
+    if missing:
+        # add() keeps a token another process set first
+        for key, token in missing.items():
+            cache.add(key, token, timeout=None)
+        generations.update(cache.get_many(list(missing)))
+    params = sorted(request.query_params.lists())
+    raw = repr((
+        type(view).__name__, getattr(view, 'action', None), request.user.role,
+        request.build_absolute_uri(request.path), params, [generations.get(key) for key in keys],
+    ))
+    return "response:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cache_response(*models, timeout=None):
+    """
+    Cache a GET handler's successful responses until one of ``models``
+    changes or ``timeout`` seconds (default ``RESPONSE_CACHE_TIMEOUT``) pass.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            cache = get_cache()
+            key = _response_key(view, request, models)
+            cached = cache.get(key)
+            if cached is not None:
+                _count('hits')
+                data, status_code = cached
+                response = Response(data, status=status_code)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _count('misses')
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code == 200 and isinstance(response, Response):  # Not streamed ones
+                ttl = timeout if timeout is not None else getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+                cache.set(key, (response.data, response.status_code), timeout=ttl)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
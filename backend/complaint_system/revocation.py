@@ -0,0 +1,186 @@
+# complaint_system/revocation.py
+"""
+JWT revocation list.
+
+Revoked token ids (``jti``) are kept until the token would have expired
+anyway, in a small SQLite file shared by every process on the host (like
+the push spool), and compacted as they lapse. Each process mirrors the
+list in a Bloom filter: a token that isn't in the filter -- nearly every
+token -- is known not to be revoked without any I/O, and only filter hits
+are confirmed against the file.
+
+Revocations made by other processes are picked up by a primary-key range
+read at most every ``SYNC_SECONDS``; the process that revokes a token sees
+it at once.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULTS = {
+    'STORE_PATH': None,           # Defaults to revoked_tokens.sqlite3 in VAR_DIR
+    'SYNC_SECONDS': 1.0,          # How stale another process's view of the list may be
+    'CAPACITY': 100000,           # Revoked tokens the filter is sized for; it grows past that
+    'FALSE_POSITIVE_RATE': 0.001,
+    'COMPACT_SECONDS': 600,       # Minimum time between expiry compactions
+}
+
+
+def revocation_setting(name):
+    value = getattr(settings, 'TOKEN_REVOCATION', {}).get(name, DEFAULTS[name])
+    if name == 'STORE_PATH' and value is None:
+        value = os.path.join(getattr(settings, 'VAR_DIR', settings.BASE_DIR), 'revoked_tokens.sqlite3')
+    return value
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity, false_positive_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """Revoked ``jti``s with their expiry, in their own SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._ready = False
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            if not self._ready:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS revoked_token ("
+                    " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " jti TEXT NOT NULL UNIQUE,"
+                    " expires REAL NOT NULL)"
+                )
+                self._ready = True
+            self._local.connection = connection
+        return connection
+
+    def add(self, jti, expires):
+        self._connect().execute("INSERT OR IGNORE INTO revoked_token (jti, expires) VALUES (?, ?)", (jti, expires))
+
+    def contains(self, jti):
+        row = self._connect().execute("SELECT expires FROM revoked_token WHERE jti = ?", (jti,)).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def read_after(self, seq):
+        """``(new_seq, jtis)`` of live revocations added after ``seq``"""
+        rows = self._connect().execute(
+            "SELECT seq, jti FROM revoked_token WHERE seq > ? AND expires > ? ORDER BY seq", (seq, time.time())
+        ).fetchall()
+        return (rows[-1][0] if rows else seq), [jti for _, jti in rows]
+
+    def compact(self):
+        """Delete revocations of tokens that have expired; returns how many"""
+        return self._connect().execute("DELETE FROM revoked_token WHERE expires <= ?", (time.time(),)).rowcount
+
+
+class RevocationList:
+    """Process-wide Bloom-filtered view of the revocation store"""
+
+    def __init__(self):
+        self._store = None
+        self._filter = None
+        self._seq = 0
+        self._synced_at = 0.0
+        self._compacted_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = RevocationStore(revocation_setting('STORE_PATH'))
+        return self._store
+
+    def _rebuild(self, capacity):
+        seq, jtis = self.store.read_after(0)
+        capacity = max(capacity, 2 * len(jtis))
+        self._filter = BloomFilter(capacity, revocation_setting('FALSE_POSITIVE_RATE'))
+        for jti in jtis:
+            self._filter.add(jti)
+        self._seq = seq
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._filter is not None and now - self._synced_at < revocation_setting('SYNC_SECONDS'):
+            return
+        with self._lock:
+            if self._filter is None:
+                self._rebuild(revocation_setting('CAPACITY'))
+            else:
+                self._seq, jtis = self.store.read_after(self._seq)
+                for jti in jtis:
+                    self._filter.add(jti)
+                if self._filter.count > self._filter.capacity:
+                    # Past capacity the false-positive rate climbs; start over bigger
+                    self._rebuild(2 * self._filter.capacity)
+            self._synced_at = now
+
+    def revoke(self, jti, expires):
+        """Revoke ``jti`` until ``expires`` (a Unix timestamp)"""
+        self.store.add(jti, expires)
+        self._sync()
+        with self._lock:
+            self._filter.add(jti)
+            if time.monotonic() - self._compacted_at > revocation_setting('COMPACT_SECONDS'):
+                self._compacted_at = time.monotonic()
+                if self.store.compact():
+                    # Lapsed entries can't be taken out of a Bloom filter
+                    self._rebuild(self._filter.capacity)
+
+    def is_revoked(self, jti):
+        self._sync()
+        if jti not in self._filter:
+            return False
+        return self.store.contains(jti)  # Filter hits may be false positives
+
+    def reset(self):
+        """Forget the in-memory filter; the next check reloads it"""
+        with self._lock:
+            self._filter = None
+            self._store = None
+
+
+revocations = RevocationList()
+
+
+def revoke_token(token):
+    """Revoke a validated simplejwt token (access or refresh)"""
+    revocations.revoke(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+def is_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and revocations.is_revoked(jti)
@@ -0,0 +1,152 @@
+# complaint_system/rollups.py
+"""
+Hourly and daily complaint rollups for trend charts.
+
+Each complaint is counted once in the hour and the day it was created,
+under its current category and status. Saves and deletes are recorded by
+the signals in ``signals.py``; code that writes complaints with
+``QuerySet.update()``, ``bulk_update()`` or ``bulk_create()`` reports the
+change here itself.
+"""
+import operator
+from collections import Counter
+from datetime import datetime, time, timezone as dt_timezone
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Complaint, DailyComplaintRollup, HourlyComplaintRollup
+
+BUCKETS = {
+    'hour': (HourlyComplaintRollup, TruncHour),
+    'day': (DailyComplaintRollup, TruncDay),
+}
+
+
+def parse_moment(value):
+    """Parse an ISO date or date-time (naive values are UTC); ``None`` if invalid"""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def truncate(moment, bucket):
+    moment = moment.astimezone(dt_timezone.utc)
+    if bucket == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def apply(deltas):
+    """
+    Apply ``{(created_at, category, status): delta}`` to both rollup tables.
+
+    Deltas landing in the same bucket are merged, then each table takes two
+    queries however many buckets are touched: an INSERT that ignores
+    existing rows, and one relative UPDATE.
+    """
+    for bucket, (model, _) in BUCKETS.items():
+        merged = Counter()
+        for (created_at, category, status), delta in deltas.items():
+            merged[(truncate(created_at, bucket), category, status)] += delta
+        items = [(key, delta) for key, delta in merged.items() if delta]
+        with transaction.atomic():
+            for start in range(0, len(items), 300):
+                chunk = items[start:start + 300]
+                model.objects.bulk_create(
+                    [model(bucket=b, category=c, status=s, count=0) for (b, c, s), _ in chunk],
+                    ignore_conflicts=True,
+                )
+                conditions = [(Q(bucket=b, category=c, status=s), delta) for (b, c, s), delta in chunk]
+                model.objects.filter(reduce(operator.or_, (q for q, _ in conditions))).update(
+                    count=F('count') + Case(*[When(q, then=Value(delta)) for q, delta in conditions],
+                                            default=Value(0))
+                )
+
+
+def record_created(complaints):
+    apply(Counter((c.created_at, c.category, c.status) for c in complaints))
+
+
+def record_deleted(complaints):
+    deltas = Counter()
+    for c in complaints:
+        deltas[(c.created_at, c.category, c.status)] -= 1
+    apply(deltas)
+
+
+def record_change(complaints, old_status, new_status, old_category=None):
+    """
+    Move ``complaints`` from ``old_status`` to ``new_status``. Their current
+    ``category`` is used on both sides unless ``old_category`` says otherwise.
+    """
+    deltas = Counter()
+    for c in complaints:
+        deltas[(c.created_at, old_category or c.category, old_status)] -= 1
+        deltas[(c.created_at, c.category, new_status)] += 1
+    apply(deltas)
+
+
+def backfill(start=None, end=None):
+    """
+    Recompute the rollups for complaints created in ``[start, end)`` (whole
+    buckets; open-ended when omitted). Returns rows written per bucket size.
+    """
+    written = {}
+    with transaction.atomic():
+        for bucket, (model, trunc) in BUCKETS.items():
+            complaints = Complaint.objects.order_by()
+            rollups = model.objects.all()
+            if start is not None:
+                complaints = complaints.filter(created_at__gte=truncate(start, bucket))
+                rollups = rollups.filter(bucket__gte=truncate(start, bucket))
+            if end is not None:
+                complaints = complaints.filter(created_at__lt=truncate(end, bucket))
+                rollups = rollups.filter(bucket__lt=truncate(end, bucket))
+            rows = (
+                complaints.annotate(period=trunc('created_at', tzinfo=dt_timezone.utc))
+                .values('period', 'category', 'status')
+                .annotate(total=Count('id'))
+            )
+            rollups.delete()
+            model.objects.bulk_create(
+                (model(bucket=row['period'], category=row['category'], status=row['status'], count=row['total'])
+                 for row in rows.iterator()),
+                batch_size=1000,
+            )
+            written[bucket] = rollups.count()
+    return written
+
+
+def trends(start, end, bucket='day', category=None, status=None):
+    """Non-empty rollup rows with a bucket in ``[start, end)``, oldest first"""
+    model, _ = BUCKETS[bucket]
+    rows = model.objects.filter(bucket__gte=truncate(start, bucket), bucket__lt=end, count__gt=0)
+    if category:
+        rows = rows.filter(category=category)
+    if status:
+        rows = rows.filter(status=status)
+    return rows.values('bucket', 'category', 'status', 'count').order_by('bucket', 'category', 'status')
+
+
+def created_since(moment):
+    """
+    Complaints created since ``moment``, counted from the hourly rollups, so
+    the cost depends on the span rather than on the complaint history.
+    Counts from the start of ``moment``'s hour.
+    """
+    rows = HourlyComplaintRollup.objects.filter(bucket__gte=truncate(moment, 'hour'))
+    return rows.aggregate(total=Sum('count'))['total'] or 0
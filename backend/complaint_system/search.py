@@ -0,0 +1,93 @@
+# complaint_system/search.py
+"""
+Full-text complaint search on SQLite FTS5.
+
+``complaint_search`` is an external-content FTS5 table over the complaint
+table's ``description`` and ``category``: it stores only the inverted
+index, and the triggers created in migration 0011 keep it in step with
+every INSERT, UPDATE and DELETE -- including ``bulk_create()`` and
+``QuerySet.update()``, which skip model signals. The UPDATE trigger is
+limited to statements that set ``description`` or ``category``; a plain
+``Complaint.save()`` sets every column and so re-indexes the row, which is
+why the status and assignment paths write with ``QuerySet.update()``.
+Results are ranked by bm25 with description matches weighted above
+category matches, over a bounded window of the newest matches.
+"""
+import re
+
+from django.db import connection
+
+TABLE = 'complaint_search'
+# bm25() column weights: description, category
+WEIGHTS = (1.0, 0.25)
+MAX_TERMS = 16
+# Newest matches ranked per query; pages are cut from this one ranking
+RANK_WINDOW = 2000
+
+TERM = re.compile(r'\w+\*?')
+
+
+def match_expression(query, category=None):
+    """
+    Turn user input into a safe FTS5 MATCH expression: every word must
+    match (a trailing ``*`` makes it a prefix), operators and column
+    filters in the input are treated as plain words. Returns ``None`` when
+    there is nothing to search for.
+    """
+    terms = []
+    for term in TERM.findall(query)[:MAX_TERMS]:
+        prefix = term.endswith('*')
+        word = term.rstrip('*')
+        terms.append(f'"{word}"' + ('*' if prefix else ''))
+    if not terms:
+        return None
+    expression = ' '.join(terms)
+    if category:
+        expression = f'({expression}) AND category : "{category}"'
+    return expression
+
+
+def search(query, category=None, limit=50, offset=0):
+    """
+    ``[(complaint_id, score)]`` best match first; lower bm25 scores rank
+    higher. Only the newest ``RANK_WINDOW`` matches are ranked, so a common
+    word costs the same as a rare one. Every page is a slice of that one
+    ranking, and there are no results past it.
+    """
+    expression = match_expression(query, category)
+    limit = min(limit, RANK_WINDOW - offset)
+    if expression is None or limit <= 0:
+        return []
+    weights = ', '.join(str(weight) for weight in WEIGHTS)
+    with connection.cursor() as cursor:
+        # Walking the doclist newest-first is cheap; scoring every match is not
+        cursor.execute(
+            f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY rowid DESC LIMIT 1 OFFSET %s",
+            [expression, RANK_WINDOW - 1],
+        )
+        cutoff = cursor.fetchone()
+        # rowid breaks score ties, so pages neither repeat nor skip matches
+        cursor.execute(
+            f"SELECT rowid, bm25({TABLE}, {weights}) AS score FROM {TABLE} "
+            f"WHERE {TABLE} MATCH %s AND rowid >= %s ORDER BY score, rowid DESC LIMIT %s OFFSET %s",
+            [expression, cutoff[0] if cutoff else 0, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def rebuild():
+    """Re-read every complaint into the index"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+
+
+def optimize():
+    """Merge the index b-trees into one, which speeds up later queries"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+
+
+def integrity_check():
+    """Raise ``DatabaseError`` if the index disagrees with the complaint table"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}, rank) VALUES ('integrity-check', 1)")
@@ -3,6 +3,49 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from .models import CustomUser, Worker, Complaint, Notification
 
+
+class EagerLoadingMixin:
+    """
+    Lets a serializer declare the relations it reads, so views can load
+    them up front instead of once per row.
+
+    Nested serializer fields are picked up automatically (a single object
+    becomes a ``select_related`` path, ``many=True`` a ``prefetch_related``
+    one, each including the nested serializer's own needs); anything read
+    in other ways goes in ``Meta.select_related`` / ``Meta.prefetch_related``.
+    """
+
+    @classmethod
+    def related_needs(cls):
+        """Return ``(select_related, prefetch_related)`` lookup lists"""
+        meta = getattr(cls, 'Meta', None)
+        select = list(getattr(meta, 'select_related', ()))
+        prefetch = list(getattr(meta, 'prefetch_related', ()))
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, EagerLoadingMixin):
+                continue
+            source = field.source or name
+            nested_select, nested_prefetch = type(nested).related_needs()
+            if many:
+                prefetch.append(source)
+                prefetch += [f"{source}__{lookup}" for lookup in nested_select + nested_prefetch]
+            else:
+                select.append(source)
+                select += [f"{source}__{lookup}" for lookup in nested_select]
+                prefetch += [f"{source}__{lookup}" for lookup in nested_prefetch]
+        return select, prefetch
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select, prefetch = cls.related_needs()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     password2 = serializers.CharField(write_only=True)
@@ -51,20 +94,20 @@ class UserLoginSerializer(serializers.Serializer):
             return attrs
         raise serializers.ValidationError('Must include username and password')
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 
                  'phone_number', 'address', 'role', 'date_joined')
 
-class WorkerSerializer(serializers.ModelSerializer):
+class WorkerSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     user = UserProfileSerializer(read_only=True)
     
     class Meta:
         model = Worker
         fields = ['id', 'user', 'is_available', 'current_location', 
                  'latitude', 'longitude', 'active_complaint_count']
-class ComplaintSerializer(serializers.ModelSerializer):
+class ComplaintSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = Complaint
         fields = [
@@ -74,10 +117,24 @@ class ComplaintSerializer(serializers.ModelSerializer):
             "description",
             "status",
             "created_at",
+            "latitude",
+            "longitude",
+            "assigned_worker",
+            "assigned_at",
+            "resolved_at",
+            "updated_at",
+            "is_ai_validated",
+            "ai_validation_score",
+            "ai_feedback",
+            "validated_at",
+            "duplicate_of",
         ]
-        read_only_fields = ["id", "user", "status", "created_at"]
+        read_only_fields = ["id", "user", "status", "created_at",
+                            "assigned_worker", "assigned_at", "resolved_at", "updated_at",
+                            "is_ai_validated", "ai_validation_score", "ai_feedback", "validated_at",
+                            "duplicate_of"]
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     worker = WorkerSerializer(read_only=True)
     complaint = ComplaintSerializer(read_only=True)
     
@@ -1,38 +1,123 @@
 # complaint_system/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from .models import CustomUser, Complaint, Notification, Worker
+from .models import Complaint, CustomUser, Notification, Worker
+from . import auth, counters, inbox, push, response_cache, rollups
+from .assignment import release_worker, sync_worker
+from .jobs import enqueue
+from .metrics import timed
+
+@receiver(post_init, sender=Complaint)
+def remember_loaded_status(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not fetched
+    instance._loaded_status = instance.__dict__.get('status')
+    instance._loaded_category = instance.__dict__.get('category')
+
+
+@receiver(post_save, sender=Complaint)
+def count_complaint(sender, instance, created, **kwargs):
+    if created:
+        counters.record_complaints_created([instance.status])
+        rollups.record_created([instance])
+    elif instance._loaded_status is not None and instance._loaded_category is not None:
+        counters.record_status_change(instance._loaded_status, instance.status)
+        rollups.record_change([instance], instance._loaded_status, instance.status,
+                              old_category=instance._loaded_category)
+    instance._loaded_status = instance.status
+    instance._loaded_category = instance.category
+
+
+@receiver(post_delete, sender=Complaint)
+def uncount_complaint(sender, instance, **kwargs):
+    counters.record_complaints_deleted([instance.status])
+    rollups.record_deleted([instance])
+
+
+@receiver(post_save, sender=CustomUser)
+def count_user(sender, instance, created, **kwargs):
+    if created:
+        counters.record_users(1)
+
+
+@receiver(post_delete, sender=CustomUser)
+def uncount_user(sender, instance, **kwargs):
+    counters.record_users(-1)
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_loaded_claims(sender, instance, **kwargs):
+    instance._loaded_claims = (instance.__dict__.get('role'), instance.__dict__.get('is_active'))
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_token_version(sender, instance, created, **kwargs):
+    loaded = instance._loaded_claims
+    if not created and None not in loaded and loaded != (instance.role, instance.is_active):
+        auth.bump_token_version([instance.id])
+    instance._loaded_claims = (instance.role, instance.is_active)
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def bump_worker_token_version(sender, instance, created=False, **kwargs):
+    # The worker_id claim changes when the profile appears or goes away
+    if created or kwargs['signal'] is post_delete:
+        auth.bump_token_version([instance.user_id])
+
 
 @receiver(post_save, sender=Complaint)
+@timed('handle_new_complaint')
 def handle_new_complaint(sender, instance, created, **kwargs):
     if created:
-        # Trigger AI validation process (you can call your AI service here)
-        # For now, let's do basic validation
-        if len(instance.description) >= 10:
-            instance.is_ai_validated = True
-            instance.ai_validation_score = min(len(instance.description) / 100, 1.0)
-            instance.ai_feedback = "Description validated successfully"
-            instance.validated_description = instance.description
-        else:
-            instance.is_ai_validated = False
-            instance.ai_validation_score = 0.0
-            instance.ai_feedback = "Description too short. Minimum 10 characters required."
-        
-        instance.save()
-        
-        # Auto-assign to nearest available worker (basic implementation)
-        available_workers = Worker.objects.filter(is_available=True)
-        if available_workers.exists():
-            worker = available_workers.first()  # Simple assignment - improve with location logic
-            instance.assigned_worker = worker
-            instance.status = 'ASSIGNED'
-            instance.assigned_at = timezone.now()
-            instance.save()
-            
-            # Create notification for worker
-            Notification.objects.create(
-                worker=worker,
-                complaint=instance,
-                message=f"New complaint assigned to you: {instance.get_category_display()}"
-            )
\ No newline at end of file
+        # Validation, assignment and notification run on the job queue so
+        # that submitting a complaint stays a couple of INSERTs
+        enqueue('complaints.validate', {'complaint_id': instance.id})
+
+
+@receiver(post_delete, sender=Complaint)
+def release_deleted_complaint(sender, instance, **kwargs):
+    if instance.status == 'ASSIGNED' and instance.assigned_worker_id:
+        release_worker(instance.assigned_worker_id)
+
+
+@receiver(post_save, sender=Worker)
+def update_worker_index(sender, instance, **kwargs):
+    sync_worker(instance)
+
+
+@receiver(post_delete, sender=Worker)
+def remove_from_worker_index(sender, instance, **kwargs):
+    sync_worker(instance, deleted=True)
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        push.publish_notifications([instance])
+
+
+@receiver(post_init, sender=Notification)
+def remember_loaded_read_state(sender, instance, **kwargs):
+    instance._loaded_is_read = instance.__dict__.get('is_read')
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, **kwargs):
+    if created:
+        inbox.record_created([instance])
+    elif instance._loaded_is_read is not None and instance._loaded_is_read != instance.is_read:
+        inbox.adjust_unread({instance.worker_id: -1 if instance.is_read else 1})
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_unread_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        inbox.adjust_unread({instance.worker_id: -1})
+
+
+@receiver([post_save, post_delete], sender=Complaint)
+@receiver([post_save, post_delete], sender=Worker)
+@receiver([post_save, post_delete], sender=Notification)
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_responses(sender, **kwargs):
+    response_cache.invalidate(sender)
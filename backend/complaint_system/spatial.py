@@ -0,0 +1,153 @@
+# complaint_system/spatial.py
+import math
+import threading
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class WorkerGridIndex:
+    """
+    In-memory uniform lat/lon grid over available workers.
+
+    Workers are bucketed into square cells of ``cell_size`` degrees, so a
+    nearest-neighbour lookup only has to visit the rings of cells around the
+    query point instead of every worker. Available workers without
+    coordinates are kept aside and returned after all located workers.
+    """
+
+    def __init__(self, cell_size=0.01):
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)
+        self._positions = {}
+        self._unplaced = set()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._positions) + len(self._unplaced)
+
+    def __contains__(self, worker_id):
+        return worker_id in self._positions or worker_id in self._unplaced
+
+    def _cell(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_size), math.floor(longitude / self.cell_size))
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._positions.clear()
+            self._unplaced.clear()
+
+    def load(self, rows):
+        """Replace the index contents with ``(worker_id, latitude, longitude)`` rows"""
+        with self._lock:
+            self.clear()
+            for worker_id, latitude, longitude in rows:
+                self._add(worker_id, latitude, longitude)
+
+    def update(self, worker_id, is_available, latitude=None, longitude=None):
+        """Insert, move or drop a single worker"""
+        with self._lock:
+            self.remove(worker_id)
+            if is_available:
+                self._add(worker_id, latitude, longitude)
+
+    def remove(self, worker_id):
+        with self._lock:
+            self._unplaced.discard(worker_id)
+            position = self._positions.pop(worker_id, None)
+            if position is not None:
+                cell = position[2]
+                self._cells[cell].discard(worker_id)
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+    def _add(self, worker_id, latitude, longitude):
+        if latitude is None or longitude is None:
+            self._unplaced.add(worker_id)
+            return
+        latitude, longitude = float(latitude), float(longitude)
+        cell = self._cell(latitude, longitude)
+        self._positions[worker_id] = (latitude, longitude, cell)
+        self._cells[cell].add(worker_id)
+
+    def _ring(self, row, col, radius):
+        if radius == 0:
+            yield (row, col)
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield (row - radius, c)
+            yield (row + radius, c)
+        for r in range(row - radius + 1, row + radius):
+            yield (r, col - radius)
+            yield (r, col + radius)
+
+    def _collect(self, cells, latitude, longitude, exclude, found):
+        for cell in cells:
+            for worker_id in self._cells.get(cell, ()):
+                if worker_id in exclude:
+                    continue
+                w_lat, w_lon, _ = self._positions[worker_id]
+                found.append((haversine_km(latitude, longitude, w_lat, w_lon), worker_id))
+
+    def nearest(self, latitude, longitude, limit=1, exclude=()):
+        """
+        Return up to ``limit`` ``(worker_id, distance_km)`` pairs ordered by
+        distance. Workers without coordinates (or every worker, when the
+        query point itself has no coordinates) come last with a ``None``
+        distance.
+        """
+        exclude = set(exclude)
+        with self._lock:
+            if latitude is None or longitude is None:
+                ids = [w for w in self._positions if w not in exclude]
+                ids += [w for w in self._unplaced if w not in exclude]
+                return [(w, None) for w in ids[:limit]]
+
+            latitude, longitude = float(latitude), float(longitude)
+            found = []
+            if self._cells:
+                row, col = self._cell(latitude, longitude)
+                rows = [cell[0] for cell in self._cells]
+                cols = [cell[1] for cell in self._cells]
+                max_radius = max(abs(row - min(rows)), abs(row - max(rows)),
+                                 abs(col - min(cols)), abs(col - max(cols)))
+                radius = 0
+                while radius <= max_radius:
+                    if 8 * radius > len(self._cells):
+                        # The ring has more cells than the grid has occupied
+                        # ones (a far-away or sparse query): visit the
+                        # occupied cells not covered yet instead of walking
+                        # ever larger rings of empty ones.
+                        self._collect(
+                            (cell for cell in self._cells
+                             if max(abs(cell[0] - row), abs(cell[1] - col)) >= radius),
+                            latitude, longitude, exclude, found,
+                        )
+                        break
+                    self._collect(self._ring(row, col, radius), latitude, longitude, exclude, found)
+                    if len(found) >= limit:
+                        # Anything in the next ring is at least ``radius`` whole
+                        # cells away; a degree of longitude shrinks towards the poles.
+                        edge_lat = min(90.0, abs(latitude) + (radius + 1) * self.cell_size)
+                        lower_bound = radius * self.cell_size * KM_PER_DEGREE * math.cos(math.radians(edge_lat))
+                        found.sort()
+                        if found[limit - 1][0] <= lower_bound:
+                            break
+                    radius += 1
+                found.sort()
+
+            result = [(worker_id, distance) for distance, worker_id in found[:limit]]
+            if len(result) < limit:
+                spare = [w for w in self._unplaced if w not in exclude]
+                result += [(w, None) for w in spare[:limit - len(result)]]
+            return result
@@ -0,0 +1,60 @@
+# complaint_system/storage.py
+"""
+Write retries for the SQLite storage profile.
+
+``settings.DATABASES`` runs SQLite in WAL mode with connections kept open
+between requests, so readers never block the writer. Transactions begin
+``IMMEDIATE``: a writer takes the write lock when its transaction starts
+and waits up to the busy timeout for it. Without this, a reader that later
+writes would fail at once with "database is locked", because SQLite cannot
+upgrade its lock then.
+
+Under a burst of writers, waiting can still run out. ``retry_on_locked``
+retries the whole write after a short random backoff that doubles on each
+attempt. It only retries when the call owns its transaction. Inside an
+outer ``atomic()`` block, the error propagates so that the transaction's
+owner can retry it as a whole.
+"""
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'RETRIES': 5,          # Attempts after the first one
+    'BACKOFF': 0.02,       # Seconds; the upper bound of the first random wait
+    'MAX_BACKOFF': 1.0,
+}
+
+
+def storage_setting(name):
+    return getattr(settings, 'DATABASE_RETRY', {}).get(name, DEFAULTS[name])
+
+
+def is_locked_error(exc):
+    message = str(exc).lower()
+    return isinstance(exc, OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def retry_on_locked(func):
+    """Retry ``func`` while SQLite reports the database locked"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if (not is_locked_error(exc) or connection.in_atomic_block
+                        or attempt >= storage_setting('RETRIES')):
+                    raise
+                delay = min(storage_setting('MAX_BACKOFF'), storage_setting('BACKOFF') * 2 ** attempt)
+                attempt += 1
+                logger.info("%s: database locked, retry %s in up to %.3fs", func.__qualname__, attempt, delay)
+                time.sleep(random.uniform(0, delay))
+    return wrapper
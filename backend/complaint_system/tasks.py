@@ -0,0 +1,62 @@
+# complaint_system/tasks.py
+"""
+Background jobs for complaint post-processing.
+
+A new complaint flows through ``complaints.validate`` ->
+``complaints.assign`` -> ``notifications.assignment``, unless it turns out
+to be a near-duplicate of an open complaint, which is linked instead. Every handler is
+idempotent, because a job can run more than once after a retry or an
+expired visibility timeout.
+"""
+from .assignment import auto_assign_complaint
+from .duplicates import link_duplicates
+from .jobs import enqueue, heartbeat, job
+from .models import Complaint, Notification
+from .validation import revalidate, validate_complaints
+
+
+@job('complaints.validate')
+def validate_complaint(complaint_id):
+    complaint = Complaint.objects.filter(id=complaint_id).only(
+        'id', 'category', 'description', 'latitude', 'longitude', 'created_at'
+    ).first()
+    if complaint is None:
+        return
+
+    validate_complaints([complaint])
+    if link_duplicates([complaint]):
+        return  # The parent complaint's worker covers it
+    enqueue('complaints.assign', {'complaint_id': complaint_id})
+
+
+@job('complaints.revalidate')
+def revalidate_complaints(stale_only=True):
+    # One job for the whole backlog, e.g. after the scorer version changes;
+    # the heartbeat keeps other workers from reclaiming it while it runs
+    revalidate(stale_only=stale_only, on_batch=heartbeat)
+
+
+@job('complaints.assign')
+def assign_new_complaint(complaint_id):
+    complaint = Complaint.objects.filter(
+        id=complaint_id, status='PENDING', assigned_worker__isnull=True, duplicate_of__isnull=True
+    ).first()
+    if complaint is None:
+        return  # Already assigned (e.g. by an admin) or gone
+
+    # Auto-assign to nearest available worker with spare capacity
+    worker = auto_assign_complaint(complaint)
+    if worker is not None:
+        enqueue('notifications.assignment', {'complaint_id': complaint_id, 'worker_id': worker.id})
+
+
+@job('notifications.assignment')
+def notify_assignment(complaint_id, worker_id):
+    complaint = Complaint.objects.filter(id=complaint_id, assigned_worker_id=worker_id).first()
+    if complaint is None or Notification.objects.filter(complaint=complaint, worker_id=worker_id).exists():
+        return
+    Notification.objects.create(
+        worker_id=worker_id,
+        complaint=complaint,
+        message=f"New complaint assigned to you: {complaint.get_category_display()}"
+    )
@@ -1,3 +1,693 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import assignment, concurrency, counters, jobs, push, revocation, rollups, search, throttling
+from .auth import issue_tokens
+from .models import Complaint, CustomUser, DashboardCounter, Job, Notification, Worker
+from .queryplans import check_query_plans
+from .spatial import WorkerGridIndex, haversine_km
+
+# Keep the side stores (revocation list, throttle buckets, metrics...) out of
+# the project directory and away from other test runs
+SCRATCH = tempfile.mkdtemp(prefix='complaint_system_tests_')
+
+
+def isolated(test_class):
+    return override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        },
+        TOKEN_REVOCATION={'STORE_PATH': os.path.join(SCRATCH, f'{test_class.__name__}-revoked.sqlite3')},
+        THROTTLE={'STORE_PATH': os.path.join(SCRATCH, f'{test_class.__name__}-throttle.sqlite3')},
+        CONCURRENCY_LIMIT={'LOCK_DIR': os.path.join(SCRATCH, f'{test_class.__name__}-slots')},
+        METRICS={'ENABLED': False},
+        PUSH={'SPOOL_PATH': os.path.join(SCRATCH, f'{test_class.__name__}-push.sqlite3')},
+    )(test_class)
+
+
+def client_for_token(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def client_for(user):
+    return client_for_token(issue_tokens(user)['access'])
+
+
+def make_worker(username, latitude, longitude, capacity=3):
+    user = CustomUser.objects.create_user(username, password='pw-12345!', role='WORKER')
+    return Worker.objects.create(user=user, latitude=latitude, longitude=longitude,
+                                 max_active_complaints=capacity)
+
+
+def make_complaint(user, **fields):
+    fields.setdefault('category', 'DOG')
+    fields.setdefault('description', 'Stray dog chasing children near the school')
+    fields.setdefault('latitude', 12.97)
+    fields.setdefault('longitude', 77.59)
+    return Complaint.objects.create(user=user, **fields)
+
+
+@isolated
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+
+    def test_user_can_update_own_complaint_status(self):
+        complaint = make_complaint(self.user)
+        response = client_for(self.user).post(f'/api/complaints/{complaint.id}/status/', {'status': 'RESOLVED'},
+                                              format='json')
+        self.assertEqual(response.status_code, 200)
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.status, 'RESOLVED')
+
+    def test_user_cannot_update_someone_elses_complaint(self):
+        other = CustomUser.objects.create_user('neighbour', password='pw-12345!', role='USER')
+        complaint = make_complaint(other)
+        response = client_for(self.user).post(f'/api/complaints/{complaint.id}/status/', {'status': 'RESOLVED'},
+                                              format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_created_complaint_reports_integer_user(self):
+        client = client_for(self.user)
+        created = client.post('/api/complaints/', {
+            'category': 'DOG', 'description': 'Pack of dogs barking all night', 'latitude': '12.9',
+            'longitude': '77.5',
+        }, format='json')
+        self.assertEqual(created.status_code, 201)
+        fetched = client.get(f"/api/complaints/{created.data['id']}/")
+        self.assertEqual(created.data['user'], self.user.id)
+        self.assertEqual(fetched.data['user'], created.data['user'])
+
+
+class WorkerGridIndexTests(TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.index = WorkerGridIndex(cell_size=0.01)
+        self.workers = {i: (19 + rng.uniform(-0.3, 0.3), 73 + rng.uniform(-0.3, 0.3)) for i in range(500)}
+        self.index.load((i, lat, lon) for i, (lat, lon) in self.workers.items())
+
+    def brute_force(self, latitude, longitude, limit, exclude=()):
+        ranked = sorted((haversine_km(latitude, longitude, lat, lon), i)
+                        for i, (lat, lon) in self.workers.items() if i not in exclude)
+        return [(i, distance) for distance, i in ranked[:limit]]
+
+    def test_matches_brute_force(self):
+        rng = random.Random(2)
+        queries = [(19 + rng.uniform(-0.5, 0.5), 73 + rng.uniform(-0.5, 0.5)) for _ in range(200)]
+        queries += [(25, 80), (0, 0), (-40, -70), (80, 10)]
+        for latitude, longitude in queries:
+            for limit in (1, 5, 30):
+                exclude = set(rng.sample(range(500), 10))
+                self.assertEqual(self.index.nearest(latitude, longitude, limit=limit, exclude=exclude),
+                                 self.brute_force(latitude, longitude, limit, exclude))
+
+    def test_far_query_is_fast(self):
+        for latitude, longitude in ((25, 80), (0, 0)):
+            started = time.perf_counter()
+            self.index.nearest(latitude, longitude, limit=5)
+            self.assertLess(time.perf_counter() - started, 0.05)
+
+
+@isolated
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+        self.complaints = [make_complaint(self.user) for _ in range(3)]
+        self.client = client_for(self.user)
+
+    def test_list_stamp_does_not_count_the_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/complaints/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.client.get('/api/complaints/')['ETag']
+        self.assertEqual(self.client.get('/api/complaints/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_delete_changes_the_etag(self):
+        etag = self.client.get('/api/complaints/')['ETag']
+        # Not the newest one, so MAX(updated_at) stays the same
+        self.complaints[0].delete()
+        response = self.client.get('/api/complaints/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        self.assertEqual(check_query_plans(), [])
+
+
+@isolated
+class WorkerReservationTests(TestCase):
+    def setUp(self):
+        assignment._index_loaded_at = None  # Reload the index from this test's rows
+        self.citizen = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+
+    def load(self, worker):
+        return Worker.objects.values_list('active_complaint_count', flat=True).get(id=worker.id)
+
+    def test_full_worker_rejects_reservation(self):
+        worker = make_worker('worker', 12.97, 77.59, capacity=1)
+        self.assertTrue(assignment.reserve_worker(worker.id))
+        self.assertFalse(assignment.reserve_worker(worker.id))
+        self.assertEqual(self.load(worker), 1)
+
+    def test_unavailable_worker_rejects_reservation(self):
+        worker = make_worker('worker', 12.97, 77.59)
+        Worker.objects.filter(id=worker.id).update(is_available=False)
+        self.assertFalse(assignment.reserve_worker(worker.id))
+        self.assertEqual(self.load(worker), 0)
+
+    def test_nearest_skips_full_workers(self):
+        near = make_worker('near', 12.970, 77.590, capacity=1)
+        far = make_worker('far', 12.990, 77.610, capacity=1)
+        self.assertEqual(assignment.reserve_nearest_worker(12.97, 77.59).id, near.id)
+        self.assertEqual(assignment.reserve_nearest_worker(12.97, 77.59).id, far.id)
+        self.assertIsNone(assignment.reserve_nearest_worker(12.97, 77.59))
+        self.assertEqual((self.load(near), self.load(far)), (1, 1))
+
+    def test_resolving_releases_the_slot(self):
+        worker = make_worker('worker', 12.97, 77.59, capacity=1)
+        complaint = make_complaint(self.citizen)
+        self.assertEqual(assignment.auto_assign_complaint(complaint).id, worker.id)
+        self.assertEqual(self.load(worker), 1)
+        self.assertTrue(assignment.change_complaint_status(complaint, 'RESOLVED'))
+        self.assertEqual(self.load(worker), 0)
+
+    def test_stale_assignment_loses_and_releases(self):
+        first = make_worker('first', 12.97, 77.59)
+        second = make_worker('second', 12.98, 77.60)
+        complaint = make_complaint(self.citizen)
+        stale = Complaint.objects.get(id=complaint.id)
+        self.assertTrue(assignment.reserve_worker(first.id))
+        self.assertTrue(assignment.assign_complaint(complaint, first))
+        # A second assignment from an outdated copy must not double-book
+        self.assertTrue(assignment.reserve_worker(second.id))
+        self.assertFalse(assignment.assign_complaint(stale, second))
+        self.assertEqual((self.load(first), self.load(second)), (1, 0))
+
+
+calls = []
+
+
+@jobs.job('tests.record')
+def _record(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError("failed on purpose")
+
+
+@jobs.job('tests.heartbeat')
+def _heartbeat(steal=False):
+    if steal:
+        Job.objects.filter(status='RUNNING').update(locked_by='worker-b')
+    jobs.heartbeat()
+    calls.append(Job.objects.get(status='RUNNING').locked_until)
+
+
+@override_settings(JOB_QUEUE={'EAGER': False, 'RETRY_BACKOFF': 5, 'MAX_ATTEMPTS': 2})
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_is_claimed_once(self):
+        job_row = jobs.enqueue('tests.record', {'value': 1})
+        self.assertEqual([j.id for j in jobs.claim_jobs('worker-a')], [job_row.id])
+        self.assertEqual(jobs.claim_jobs('worker-b'), [])
+
+    def test_expired_claim_is_picked_up_again(self):
+        job_row = jobs.enqueue('tests.record', {'value': 1})
+        jobs.claim_jobs('worker-a')
+        Job.objects.filter(id=job_row.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = jobs.claim_jobs('worker-b')
+        self.assertEqual([(j.id, j.locked_by, j.attempts) for j in reclaimed], [(job_row.id, 'worker-b', 2)])
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        job_row = jobs.enqueue('tests.record', {'value': 1, 'fail': True})
+        self.assertFalse(jobs.run_job(jobs.claim_jobs('worker-a')[0], 'worker-a'))
+        job_row.refresh_from_db()
+        self.assertEqual(job_row.status, 'QUEUED')
+        self.assertGreater(job_row.available_at, timezone.now())
+        self.assertEqual(jobs.claim_jobs('worker-a'), [])
+
+        Job.objects.filter(id=job_row.id).update(available_at=timezone.now())
+        self.assertFalse(jobs.run_job(jobs.claim_jobs('worker-a')[0], 'worker-a'))
+        job_row.refresh_from_db()
+        self.assertEqual(job_row.status, 'FAILED')
+        self.assertEqual(calls, [1, 1])
+
+    def test_heartbeat_extends_the_claim(self):
+        job_row = jobs.enqueue('tests.heartbeat')
+        with self.settings(JOB_QUEUE={'EAGER': False, 'VISIBILITY_TIMEOUT': 0}):
+            claimed = jobs.claim_jobs('worker-a')[0]
+        self.assertTrue(jobs.run_job(claimed, 'worker-a'))
+        self.assertGreater(calls[0], timezone.now() + timedelta(seconds=30))
+        job_row.refresh_from_db()
+        self.assertEqual(job_row.status, 'DONE')
+
+    def test_reclaimed_job_stops_at_the_heartbeat(self):
+        job_row = jobs.enqueue('tests.heartbeat', {'steal': True})
+        with self.settings(JOB_QUEUE={'EAGER': False, 'VISIBILITY_TIMEOUT': 0}):
+            claimed = jobs.claim_jobs('worker-a')[0]
+        self.assertFalse(jobs.run_job(claimed, 'worker-a'))
+        self.assertEqual(calls, [])
+        job_row.refresh_from_db()
+        # Left to the worker that took it over
+        self.assertEqual((job_row.status, job_row.locked_by), ('RUNNING', 'worker-b'))
+
+    def test_success_is_recorded(self):
+        jobs.enqueue('tests.record', {'value': 7})
+        self.assertEqual(jobs.work('worker-a', once=True), 1)
+        self.assertEqual(calls, [7])
+        self.assertEqual(Job.objects.get().status, 'DONE')
+
+
+@isolated
+class DashboardCounterTests(TestCase):
+    def assertCountersMatchTables(self):
+        recorded = dict(DashboardCounter.objects.values_list('name', 'value'))
+        actual = counters.rebuild()
+        self.assertEqual({name: recorded.get(name, 0) for name in actual}, actual)
+
+    def test_counters_follow_saves_updates_and_deletes(self):
+        assignment._index_loaded_at = None
+        citizen = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+        make_worker('worker', 12.97, 77.59)
+        complaints = [make_complaint(citizen) for _ in range(4)]
+        self.assertCountersMatchTables()
+
+        complaints[0].status = 'RESOLVED'
+        complaints[0].save()
+        assignment.auto_assign_complaint(complaints[1])
+        assignment.change_complaint_status(complaints[1], 'RESOLVED')
+        complaints[2].delete()
+        self.assertCountersMatchTables()
+        self.assertEqual(DashboardCounter.objects.get(name=DashboardCounter.status_key('RESOLVED')).value, 2)
+
+    def test_dashboard_reports_counters(self):
+        admin = CustomUser.objects.create_user('admin', password='pw-12345!', role='ADMIN')
+        make_complaint(admin)
+        old = make_complaint(admin)
+        Complaint.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=10))
+        rollups.backfill()
+        with CaptureQueriesContext(connection) as queries:
+            response = client_for(admin).get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_complaints'], 2)
+        self.assertEqual(response.data['recent_complaints'], 1)
+        self.assertEqual(response.data['total_users'], 1)
+        # Counters and rollups only; the complaint table is never read
+        self.assertFalse([q['sql'] for q in queries if '"complaint_system_complaint"' in q['sql']])
+
+
+@isolated
+class RevocationTests(TestCase):
+    def setUp(self):
+        revocation.revocations.reset()  # Reopen the store at this test's path
+        self.user = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+        self.tokens = issue_tokens(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def tearDown(self):
+        revocation.revocations.reset()
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        other = issue_tokens(self.user)
+        response = self.client.post('/api/auth/logout/', {'refresh_token': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/my-complaints/').status_code, 401)
+        refreshed = APIClient().post('/api/auth/token/refresh/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(refreshed.status_code, 401)
+        # Other sessions of the same user are unaffected
+        self.assertEqual(client_for_token(other['access']).get('/api/my-complaints/').status_code, 200)
+
+    def test_cannot_revoke_someone_elses_token(self):
+        other = CustomUser.objects.create_user('neighbour', password='pw-12345!', role='USER')
+        response = self.client.post('/api/auth/logout/', {'refresh_token': issue_tokens(other)['refresh']},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(TOKEN_REVOCATION={'STORE_PATH': os.path.join(SCRATCH, 'shared-revoked.sqlite3'),
+                                         'SYNC_SECONDS': 0})
+    def test_revocation_reaches_other_processes(self):
+        revocation.revocations.reset()
+        other_process = revocation.RevocationList()
+        self.assertFalse(other_process.is_revoked('some-jti'))
+        revocation.revocations.revoke('some-jti', time.time() + 60)
+        self.assertTrue(other_process.is_revoked('some-jti'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"in-{i}")
+        self.assertTrue(all(f"in-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"out-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@isolated
+class ThrottleTests(TestCase):
+    def setUp(self):
+        # Each test gets empty buckets
+        self.store_path = os.path.join(SCRATCH, f'{self._testMethodName}-throttle.sqlite3')
+        self.override = self.settings(THROTTLE={'STORE_PATH': self.store_path})
+        self.override.enable()
+        self.user = CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER')
+
+    def tearDown(self):
+        self.override.disable()
+
+    def test_bucket_refills_over_time(self):
+        store = throttling.BucketStore(os.path.join(SCRATCH, 'bucket.sqlite3'))
+        self.assertEqual([store.take('k', 2, 1.0, now=100.0) for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(store.take('k', 2, 1.0, now=100.0), 1.0)
+        self.assertAlmostEqual(store.take('k', 2, 1.0, now=100.5), 0.5)
+        self.assertEqual(store.take('k', 2, 1.0, now=101.0), 0)
+
+    def test_buckets_are_charged_together_or_not_at_all(self):
+        store = throttling.BucketStore(os.path.join(SCRATCH, 'buckets.sqlite3'))
+        self.assertEqual(store.take('burst', 1, 1.0, now=100.0), 0)
+        self.assertAlmostEqual(store.take_all([('burst', 1, 1.0), ('sustained', 2, 0.1)], now=100.0), 1.0)
+        # The rejected request left the sustained bucket full
+        self.assertEqual([store.take('sustained', 2, 0.1, now=100.0) for _ in range(2)], [0, 0])
+
+    def test_rejected_logins_do_not_drain_the_address_bucket(self):
+        client = APIClient()
+        codes = [client.post('/api/auth/login/', {'username': 'citizen', 'password': 'wrong'},
+                             format='json').status_code for _ in range(10)]
+        self.assertEqual(codes, [400] * 5 + [429] * 5)
+        # 20/min per address: only the 5 admitted attempts were charged
+        tokens, = throttling.get_store()._connect().execute(
+            "SELECT tokens FROM token_bucket WHERE key = 'login.ip:127.0.0.1'"
+        ).fetchone()
+        self.assertGreaterEqual(tokens, 15)
+
+    def test_login_attempts_per_username_are_limited(self):
+        client = APIClient()
+        responses = [client.post('/api/auth/login/', {'username': 'Citizen', 'password': 'wrong'}, format='json')
+                     for _ in range(6)]
+        self.assertEqual([r.status_code for r in responses], [400] * 5 + [429])
+        self.assertTrue(int(responses[-1]['Retry-After']) > 0)
+        # Another account from the same address still gets through
+        other = client.post('/api/auth/login/', {'username': 'someone', 'password': 'wrong'}, format='json')
+        self.assertEqual(other.status_code, 400)
+
+    def test_only_complaint_submission_is_limited(self):
+        client = client_for(self.user)
+        codes = [client.post('/api/complaints/', {'category': 'DOG', 'description': 'Dog barking all night long',
+                                                  'latitude': '12.9', 'longitude': '77.5'}, format='json').status_code
+                 for _ in range(11)]
+        self.assertEqual(codes, [201] * 10 + [429])
+        self.assertEqual(client.get('/api/complaints/').status_code, 200)
+
+    def test_throttles_can_be_switched_off(self):
+        with self.settings(THROTTLE={'STORE_PATH': self.store_path, 'ENABLED': False}):
+            client = APIClient()
+            codes = {client.post('/api/auth/login/', {'username': 'citizen', 'password': 'wrong'},
+                                 format='json').status_code for _ in range(8)}
+        self.assertEqual(codes, {400})
+
+
+@isolated
+class ConcurrencyLimitTests(TestCase):
+    def test_requests_over_the_cap_get_503(self):
+        lock_dir = os.path.join(SCRATCH, 'cap-slots')
+        with self.settings(CONCURRENCY_LIMIT={'LOCK_DIR': lock_dir, 'MAX_CONCURRENT': 2, 'WAIT_SECONDS': 0.05}):
+            release = threading.Event()
+            entered = threading.Semaphore(0)
+
+            def slow_view(request):
+                if request.path.endswith('/stream/'):
+                    return HttpResponse('stream')
+                entered.release()
+                release.wait(5)
+                return HttpResponse('ok')
+
+            middleware = concurrency.ConcurrencyLimitMiddleware(slow_view)
+            factory = RequestFactory()
+            statuses = []
+            threads = [threading.Thread(target=lambda: statuses.append(middleware(factory.get('/api/x/')).status_code))
+                       for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            entered.acquire()
+            entered.acquire()
+
+            rejected = middleware(factory.get('/api/x/'))
+            self.assertEqual(rejected.status_code, 503)
+            self.assertEqual(rejected['Retry-After'], '1')
+            # Long-lived streams don't take a slot
+            self.assertEqual(middleware(factory.get('/api/my-notifications/stream/')).status_code, 200)
+
+            release.set()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(statuses, [200, 200])
+            self.assertEqual(middleware(factory.get('/api/x/')).status_code, 200)
+
+
+@isolated
+class UnreadCountTests(TestCase):
+    def test_count_follows_notifications_and_mark_read(self):
+        worker = make_worker('badge', 12.97, 77.59)
+        complaint = make_complaint(CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER'))
+        for message in ('one', 'two', 'three'):
+            Notification.objects.create(worker=worker, complaint=complaint, message=message)
+        client = client_for(worker.user)
+        self.assertEqual(client.get('/api/my-notifications/unread-count/').data, {'unread': 3})
+
+        response = client.post('/api/my-notifications/mark-all-read/')
+        self.assertEqual(response.data, {'marked': 3, 'unread': 0})
+        self.assertEqual(client.get('/api/my-notifications/unread-count/').data, {'unread': 0})
+
+    def test_worker_account_without_profile_gets_404(self):
+        user = CustomUser.objects.create_user('no-profile', password='pw-12345!', role='WORKER')
+        self.assertEqual(client_for(user).get('/api/my-notifications/unread-count/').status_code, 404)
+
+
+@isolated
+class NotificationStreamTests(TestCase):
+    def test_wsgi_stream_replays_delivers_and_ends(self):
+        worker = make_worker('streamer', 12.97, 77.59)
+        complaint = make_complaint(CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER'))
+        seen = Notification.objects.create(worker=worker, complaint=complaint, message='seen')
+        missed = Notification.objects.create(worker=worker, complaint=complaint, message='missed')
+        # Pushed only, never stored, so it can't arrive through the replay
+        live = Notification(id=missed.id + 100, worker=worker, complaint=complaint, message='live',
+                            created_at=timezone.now())
+        spool = os.path.join(SCRATCH, 'stream-push.sqlite3')
+        with self.settings(PUSH={'SPOOL_PATH': spool, 'SYNC_STREAM_SECONDS': 0.5, 'KEEPALIVE_SECONDS': 0.2}):
+            response = client_for(worker.user).get('/api/my-notifications/stream/', HTTP_LAST_EVENT_ID=str(seen.id))
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            threading.Timer(0.1, push.broker.deliver, (worker.id, push.notification_event(live))).start()
+            started = time.monotonic()
+            body = b''.join(response.streaming_content).decode()
+            response.close()
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertNotIn(f"id: {seen.id}\n", body)
+        self.assertIn(f"id: {missed.id}\n", body)
+        self.assertIn(f"id: {live.id}\n", body)
+        self.assertIn('"message": "live"', body)
+        self.assertIn(": keepalive", body)
+        self.assertNotIn(worker.id, push.broker._subscribers)
+
+
+@isolated
+class ImportTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user('importer', password='pw-12345!', role='ADMIN')
+        self.owner = CustomUser.objects.create_user('owner', password='pw-12345!', role='USER')
+
+    def test_csv_upload_reports_row_errors_and_resolves_owners(self):
+        body = (
+            "category,description,latitude,longitude,username,user_id\n"
+            "DOG,Stray dog chasing children near the school gate,12.97,77.59,owner,\n"
+            f"GARBAGE,Garbage pile not cleared for a week behind the market,12.98,77.60,,{self.owner.id}\n"
+            "GARBAGE,Overflowing dustbin at the bus stop on the main road,,,,\n"
+            "CATS,Too short,12.97,77.59,,\n"
+            "DOG,Pack of dogs barking all night near the temple,95,77.59,nobody,\n"
+        )
+        response = client_for(self.admin).post('/api/complaints/import/?assign=false', body,
+                                               content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['imported'], response.data['failed']), (3, 2))
+        self.assertNotIn('ids', response.data)
+        self.assertEqual([error['row'] for error in response.data['errors']], [5, 6])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'category', 'description'})
+        self.assertEqual(set(response.data['errors'][1]['errors']), {'latitude', 'user'})
+        owners = dict(Complaint.objects.values_list('description', 'user__username'))
+        self.assertEqual(sorted(owners.values()), ['importer', 'owner', 'owner'])
+
+    def test_ndjson_rows_are_validated_and_assigned(self):
+        worker = make_worker('nearby', 12.97, 77.59)
+        lines = [
+            {'category': 'DOG', 'description': 'Stray dog biting people near the school gate',
+             'latitude': 12.97, 'longitude': 77.59},
+            {'category': 'GARBAGE', 'description': 'Garbage dump burning behind the vegetable market',
+             'latitude': 12.971, 'longitude': 77.591, 'status': 'RESOLVED'},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+        response = client_for(self.admin).post('/api/complaints/import/?type=ndjson', body,
+                                               content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['imported'], response.data['failed'], response.data['assigned']),
+                         (2, 1, 1))
+        self.assertEqual(response.data['errors'], [{'row': 3, 'errors': {'row': 'not a JSON object'}}])
+        self.assertFalse(Complaint.objects.filter(validated_at__isnull=True).exists())
+        pending = Complaint.objects.get(category='DOG')
+        self.assertEqual((pending.status, pending.assigned_worker_id), ('ASSIGNED', worker.id))
+
+    def test_command_imports_in_batches_and_links_duplicates(self):
+        path = os.path.join(SCRATCH, 'import.ndjson')
+        row = {'category': 'DOG', 'description': 'Stray dog chasing children near the school gate',
+               'latitude': 12.97, 'longitude': 77.59}
+        with open(path, 'w') as handle:
+            handle.write('\n'.join(json.dumps(row) for _ in range(3)) + '\n')
+        output = io.StringIO()
+        call_command('import_complaints', path, '--user', 'owner', '--batch-size', '2', '--no-assign',
+                     stdout=output, stderr=io.StringIO())
+        self.assertIn("Imported 3 complaint(s), 0 row(s) failed, 2 linked as duplicates", output.getvalue())
+        self.assertEqual(Complaint.objects.filter(user=self.owner, duplicate_of__isnull=False).count(), 2)
+        self.assertFalse(Complaint.objects.filter(validated_at__isnull=True).exists())
+
+
+@isolated
+class SearchTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user('searcher', password='pw-12345!', role='ADMIN')
+        self.client = client_for(self.admin)
+
+    def found(self, **params):
+        response = self.client.get('/api/complaints/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_triggers_follow_inserts_updates_and_deletes(self):
+        dog = make_complaint(self.admin, description='Stray dog sleeping outside the library')
+        garbage = make_complaint(self.admin, category='GARBAGE', description='Garbage left outside the library')
+        self.assertEqual(set(self.found(q='library')), {dog.id, garbage.id})
+        self.assertEqual(self.found(q='library', category='garbage'), [garbage.id])
+
+        dog.description = 'Stray dog sleeping outside the post office'
+        dog.save()
+        self.assertEqual(self.found(q='library'), [garbage.id])
+        self.assertEqual(self.found(q='post offic*'), [dog.id])
+
+        garbage.delete()
+        self.assertEqual(self.found(q='library'), [])
+        search.integrity_check()
+
+    def test_rebuild_command_restores_the_index(self):
+        complaint = make_complaint(self.admin, description='Broken streetlight next to the stadium')
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {search.TABLE}({search.TABLE}) VALUES ('delete-all')")
+        self.assertEqual(self.found(q='stadium'), [])
+
+        call_command('rebuild_search_index', '--optimize', stdout=io.StringIO())
+        self.assertEqual(self.found(q='stadium'), [complaint.id])
+        call_command('rebuild_search_index', '--check', stdout=io.StringIO())
+
+    def test_pages_are_slices_of_one_ranked_window(self):
+        for i in range(7):
+            make_complaint(self.admin, description=f"Dog barking near house {i} " + 'dog ' * (i % 3))
+        seen = []
+        with mock.patch.object(search, 'RANK_WINDOW', 5):
+            for page in (1, 2, 3):
+                response = self.client.get('/api/complaints/search/', {'q': 'dog', 'page_size': 2, 'page': page})
+                seen += [row['id'] for row in response.data['results']]
+            self.assertIsNone(response.data['next'])
+            self.assertEqual(self.found(q='dog', page_size=2, page=4), [])
+        newest = list(Complaint.objects.order_by('-id').values_list('id', flat=True)[:5])
+        self.assertEqual(sorted(seen), sorted(newest))
+
+
+@isolated
+class ResponseCacheTests(TestCase):
+    def test_worker_pages_survive_load_and_unread_changes(self):
+        locmem = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-pages'}
+        with self.settings(CACHES={'default': locmem, 'responses': locmem}):
+            worker = make_worker('cached', 12.97, 77.59)
+            complaint = make_complaint(worker.user)
+            client = client_for(CustomUser.objects.create_user('boss', password='pw-12345!', role='ADMIN'))
+            self.assertEqual(client.get('/api/admin/workers/')['X-Cache'], 'MISS')
+            self.assertEqual(client.get('/api/admin/workers/')['X-Cache'], 'HIT')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(assignment.reserve_worker(worker.id))
+                Notification.objects.create(worker=worker, complaint=complaint, message='new')
+            self.assertEqual(client.get('/api/admin/workers/')['X-Cache'], 'HIT')
+
+            with self.captureOnCommitCallbacks(execute=True):
+                worker.is_available = False
+                worker.save()
+            self.assertEqual(client.get('/api/admin/workers/')['X-Cache'], 'MISS')
+
+
+@isolated
+class EagerLoadingTests(TestCase):
+    def assertFlatQueryCount(self, user, path, add_rows):
+        """The query count for ``path`` doesn't change when ``add_rows()`` adds rows"""
+        client = client_for(user)
+        add_rows(2)
+        client.get(path)  # Warm the token-version cache
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(len(client.get(path).data['results']), 2)
+        add_rows(6)
+        with self.assertNumQueries(len(small)):
+            self.assertEqual(len(client.get(path).data['results']), 8)
+
+    def test_complaint_list(self):
+        admin = CustomUser.objects.create_user('admin', password='pw-12345!', role='ADMIN')
+        workers = [make_worker('eager-worker', 12.97, 77.59)]
+
+        def add_rows(count):
+            for _ in range(count):
+                make_complaint(CustomUser.objects.create_user(f'citizen-{uuid.uuid4().hex[:8]}', role='USER'),
+                               assigned_worker=workers[0], status='ASSIGNED')
+
+        self.assertFlatQueryCount(admin, '/api/complaints/', add_rows)
+
+    def test_worker_lists(self):
+        admin = CustomUser.objects.create_user('admin', password='pw-12345!', role='ADMIN')
+
+        def add_rows(count):
+            for _ in range(count):
+                make_worker(f'worker-{uuid.uuid4().hex[:8]}', 12.97, 77.59)
+
+        self.assertFlatQueryCount(admin, '/api/workers/', add_rows)
+        Worker.objects.all().delete()
+        self.assertFlatQueryCount(admin, '/api/admin/workers/', add_rows)
+
+    def test_notification_list(self):
+        worker = make_worker('inbox', 12.97, 77.59)
+        complaint = make_complaint(CustomUser.objects.create_user('citizen', password='pw-12345!', role='USER'))
+
+        def add_rows(count):
+            Notification.objects.bulk_create(
+                Notification(worker=worker, complaint=complaint, message='assigned') for _ in range(count)
+            )
+
+        self.assertFlatQueryCount(worker.user, '/api/my-notifications/', add_rows)
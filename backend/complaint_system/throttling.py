@@ -0,0 +1,221 @@
+# complaint_system/throttling.py
+"""
+Token-bucket rate limits shared by every process on the host.
+
+Buckets live in a small SQLite file (like the push spool). A request's
+buckets are refilled for the time elapsed and charged in one write
+transaction, and only when every one of them has a token left: concurrent
+processes can't overspend a bucket, and a request turned away by one
+bucket costs nothing from the others. A bucket that has refilled
+completely is the same as no row, so full buckets are pruned now and then.
+
+Views opt in with a ``throttle_scope`` and ``BUCKET_THROTTLES``. Each
+bucket kind looks up ``'<scope>.user'``, ``'<scope>.ip'`` or
+``'<scope>.endpoint'`` in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``
+(``'burst/period'`` strings as DRF uses: a bucket of ``burst`` tokens
+refilled over ``period``) and does nothing for scopes without a rate.
+Rejections are DRF 429 responses with ``Retry-After``.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    'ENABLED': True,        # Off only for load tests, which would otherwise measure 429s
+    'STORE_PATH': None,     # Defaults to throttle.sqlite3 in VAR_DIR
+    'PRUNE_SECONDS': 300,   # Minimum time between deletions of refilled buckets
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def throttle_setting(name):
+    value = getattr(settings, 'THROTTLE', {}).get(name, DEFAULTS[name])
+    if name == 'STORE_PATH' and value is None:
+        value = os.path.join(getattr(settings, 'VAR_DIR', settings.BASE_DIR), 'throttle.sqlite3')
+    return value
+
+
+def parse_rate(rate):
+    """``'10/min'`` -> ``(capacity, tokens per second)``"""
+    burst, period = rate.split('/')
+    burst = int(burst)
+    return burst, burst / PERIODS[period[0]]
+
+
+class BucketStore:
+    """Token buckets in their own SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._ready = False
+        self._local = threading.local()
+        self._pruned_at = 0.0
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            if not self._ready:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS token_bucket ("
+                    " key TEXT PRIMARY KEY,"
+                    " tokens REAL NOT NULL,"
+                    " updated REAL NOT NULL,"
+                    " full_at REAL NOT NULL"
+                    ") WITHOUT ROWID"
+                )
+                self._ready = True
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, rate, now=None):
+        """
+        Take one token from ``key``'s bucket. Returns ``0`` on success, or
+        the seconds until a token will be available.
+        """
+        return self.take_all([(key, capacity, rate)], now)
+
+    def take_all(self, buckets, now=None):
+        """
+        Take one token from each ``(key, capacity, rate)`` bucket, or from
+        none of them. Returns ``0`` on success, or the seconds until every
+        bucket will have a token.
+        """
+        now = time.time() if now is None else now
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, capacity, rate in buckets:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM token_bucket WHERE key = ?", (key,)
+                ).fetchone()
+                level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                levels.append(level)
+            wait = max((1 - level) / rate for level, (_, _, rate) in zip(levels, buckets))
+            if wait <= 0:
+                connection.executemany(
+                    "INSERT INTO token_bucket (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET"
+                    " tokens = excluded.tokens, updated = excluded.updated, full_at = excluded.full_at",
+                    [(key, level - 1, now, now + (capacity - level + 1) / rate)
+                     for level, (key, capacity, rate) in zip(levels, buckets)],
+                )
+            if now - self._pruned_at > throttle_setting('PRUNE_SECONDS'):
+                self._pruned_at = now
+                connection.execute("DELETE FROM token_bucket WHERE full_at < ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return max(0.0, wait)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None or _store.path != throttle_setting('STORE_PATH'):
+        _store = BucketStore(throttle_setting('STORE_PATH'))
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses set ``kind`` and implement ``get_ident_key()``"""
+    kind = None
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None, None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}.{self.kind}")
+        return scope, rate and parse_rate(rate)
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def get_bucket(self, request, view):
+        """``(key, capacity, rate)`` of the bucket this request draws from, or ``None``"""
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return None
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        return (f"{scope}.{self.kind}:{ident}", *rate)
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        bucket = self.get_bucket(request, view)
+        if bucket is None or not throttle_setting('ENABLED'):
+            return True
+        self.retry_after = get_store().take(*bucket) or None
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """
+    Per user: the authenticated user, or for login attempts the submitted
+    username, so credential stuffing against one account is capped however
+    many addresses it comes from.
+    """
+    kind = 'user'
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"id:{request.user.id}"
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        return f"name:{str(username).strip().lower()}" if username else None
+
+
+class IPBucketThrottle(TokenBucketThrottle):
+    """Per client address (``NUM_PROXIES`` aware, like DRF's throttles)"""
+    kind = 'ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EndpointBucketThrottle(TokenBucketThrottle):
+    """One bucket for the whole endpoint, whoever calls it"""
+    kind = 'endpoint'
+
+    def get_ident_key(self, request, view):
+        return '*'
+
+
+class AllBucketsThrottle(BaseThrottle):
+    """
+    The endpoint, address and user buckets as one throttle: DRF runs every
+    throttle class, so separate ones would each charge a request that
+    another one turns away.
+    """
+    kinds = (EndpointBucketThrottle, IPBucketThrottle, UserBucketThrottle)
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if not throttle_setting('ENABLED'):
+            return True
+        buckets = [bucket for bucket in (kind().get_bucket(request, view) for kind in self.kinds) if bucket]
+        if not buckets:
+            return True
+        self.retry_after = get_store().take_all(buckets) or None
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+BUCKET_THROTTLES = [AllBucketsThrottle]
@@ -11,23 +11,31 @@ from .views import (
     
     # Auth
     UserLoginView,
+    UserLogoutView,
     UserRegistrationView,
     UserProfileView,
     
     # Admin
     AdminUserManagementView,
     WorkerManagementView,
+    ComplaintExport,
     
     # Dashboard & Stats
     DashboardStats,
+    ComplaintTrends,
+    ResponseCacheStats,
     
     # Complaints
+    ImportComplaints,
+    SearchComplaints,
     AssignComplaint,
     UpdateComplaintStatus,
     ValidateComplaintAI,
+    ValidateComplaintsBatch,
     UserComplaints,
     WorkerComplaints,
     AutoAssignComplaint,
+    BatchAutoAssignComplaints,
     
     # Workers
     UpdateWorkerAvailability,
@@ -35,6 +43,10 @@ from .views import (
     
     # Notifications
     UserNotifications,
+    NotificationStream,
+    UnreadNotificationCount,
+    MarkAllNotificationsRead,
+    MarkNotificationsRead,
 )
 
 # DRF Router for standard CRUD endpoints
@@ -46,6 +58,7 @@ router.register(r'users', UserViewSet, basename='user')
 urlpatterns = [
     # Auth endpoints
     path('auth/login/', UserLoginView.as_view(), name='login'),
+    path('auth/logout/', UserLogoutView.as_view(), name='logout'),
     path('auth/register/', UserRegistrationView.as_view(), name='register'),
     path('auth/profile/', UserProfileView.as_view(), name='profile'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -53,11 +66,18 @@ urlpatterns = [
     # Admin management
     path('admin/users/', AdminUserManagementView.as_view(), name='admin-users'),
     path('admin/workers/', WorkerManagementView.as_view(), name='admin-workers'),
+    path('admin/complaints/export/', ComplaintExport.as_view(), name='admin-complaint-export'),
 
     # Dashboard
     path('dashboard/stats/', DashboardStats.as_view(), name='dashboard-stats'),
+    path('dashboard/trends/', ComplaintTrends.as_view(), name='dashboard-trends'),
+    path('dashboard/cache-stats/', ResponseCacheStats.as_view(), name='dashboard-cache-stats'),
 
     # Complaint-related
+    path('complaints/search/', SearchComplaints.as_view(), name='search-complaints'),
+    path('complaints/import/', ImportComplaints.as_view(), name='import-complaints'),
+    path('complaints/validate/', ValidateComplaintsBatch.as_view(), name='validate-complaints'),
+    path('complaints/batch-assign/', BatchAutoAssignComplaints.as_view(), name='batch-assign-complaints'),
     path('complaints/<int:pk>/assign/', AssignComplaint.as_view(), name='assign-complaint'),
     path('complaints/<int:pk>/status/', UpdateComplaintStatus.as_view(), name='update-complaint-status'),
     path('complaints/<int:pk>/validate-ai/', ValidateComplaintAI.as_view(), name='validate-complaint-ai'),
@@ -71,6 +91,10 @@ urlpatterns = [
 
     # Notifications
     path('my-notifications/', UserNotifications.as_view(), name='user-notifications'),
+    path('my-notifications/stream/', NotificationStream.as_view(), name='notification-stream'),
+    path('my-notifications/unread-count/', UnreadNotificationCount.as_view(), name='notification-unread-count'),
+    path('my-notifications/mark-all-read/', MarkAllNotificationsRead.as_view(), name='notifications-mark-all-read'),
+    path('my-notifications/mark-read/', MarkNotificationsRead.as_view(), name='notifications-mark-read'),
 
     # Router endpoints (CRUD for complaints, workers, users)
     path('', include(router.urls)),
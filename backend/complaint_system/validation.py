@@ -0,0 +1,228 @@
+# complaint_system/validation.py
+"""
+Complaint validation engine.
+
+A scorer rates a whole batch of complaints at once and the results are
+written back to the complaints with one ``bulk_update()`` per batch.
+Results are cached by scorer version and a hash of category and
+description, so duplicate texts and re-runs skip the scorer entirely.
+
+The scorer is pluggable (``COMPLAINT_VALIDATION['SCORER']``, a dotted
+path). It needs a ``version`` string and ``score(categories, descriptions)``
+returning one ``ValidationResult`` per complaint. Bump ``version`` whenever
+the model changes; ``revalidate()`` then picks up every complaint scored by
+an older version.
+"""
+import hashlib
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import response_cache
+from .models import Complaint
+
+DEFAULTS = {
+    'SCORER': 'complaint_system.validation.KeywordTfidfScorer',
+    'THRESHOLD': 0.35,          # Minimum score for a complaint to count as valid
+    'BATCH_SIZE': 1000,         # Complaints scored and written per batch
+    'CACHE': 'default',         # Cache alias for results keyed by description hash
+    'CACHE_TIMEOUT': 7 * 24 * 3600,
+}
+
+ValidationResult = namedtuple('ValidationResult', ['is_valid', 'score', 'feedback'])
+
+RESULT_FIELDS = ['is_ai_validated', 'ai_validation_score', 'ai_feedback', 'validation_model', 'validated_at',
+                 'updated_at']
+
+
+def validation_setting(name):
+    return getattr(settings, 'COMPLAINT_VALIDATION', {}).get(name, DEFAULTS[name])
+
+
+@lru_cache(maxsize=None)
+def _load_scorer(path):
+    return import_string(path)()
+
+
+def get_scorer():
+    return _load_scorer(validation_setting('SCORER'))
+
+
+TOKEN = re.compile(r"[a-z]+")
+
+
+class KeywordTfidfScorer:
+    """
+    Local TF-IDF model over a fixed keyword vocabulary.
+
+    Each category has a weighted keyword profile; a description's sublinear
+    term-frequency vector, weighted by the keyword IDF weights, is compared
+    against every profile with one matrix product. The score blends how
+    well the text matches its declared category with how much detail it
+    gives.
+    """
+    version = 'keyword-tfidf-1'
+
+    # term: weight (an IDF-like rarity/importance prior)
+    PROFILES = {
+        'DOG': {
+            'dog': 3.0, 'dogs': 3.0, 'stray': 3.0, 'strays': 3.0, 'puppy': 2.5, 'puppies': 2.5,
+            'canine': 2.5, 'bite': 3.0, 'bit': 2.0, 'bitten': 3.0, 'biting': 3.0, 'bark': 2.5,
+            'barking': 2.5, 'barks': 2.5, 'rabies': 3.0, 'rabid': 3.0, 'pack': 2.0, 'aggressive': 2.0,
+            'chased': 2.0, 'chasing': 2.0, 'attack': 2.0, 'attacked': 2.0, 'howling': 2.0,
+            'injured': 1.5, 'sterilization': 2.5, 'vaccination': 2.0, 'animal': 1.5, 'animals': 1.5,
+        },
+        'GARBAGE': {
+            'garbage': 3.0, 'trash': 3.0, 'waste': 3.0, 'rubbish': 3.0, 'litter': 2.5, 'littered': 2.5,
+            'dump': 2.5, 'dumped': 2.5, 'dumping': 2.5, 'bin': 2.0, 'bins': 2.0, 'dustbin': 3.0,
+            'overflowing': 2.5, 'smell': 2.0, 'stink': 2.0, 'stinking': 2.0, 'rotting': 2.0,
+            'plastic': 1.5, 'debris': 2.0, 'sewage': 2.0, 'collection': 1.5, 'collected': 1.5,
+            'pile': 2.0, 'heap': 2.0, 'burning': 1.5, 'flies': 1.5, 'mosquitoes': 1.5,
+        },
+    }
+    # Words that place a complaint somewhere, shared by every category
+    LOCATION_TERMS = {
+        'street': 1.0, 'road': 1.0, 'lane': 1.0, 'near': 0.8, 'park': 1.0, 'market': 1.0,
+        'colony': 1.0, 'area': 0.8, 'school': 1.0, 'gate': 0.8, 'corner': 0.8, 'ward': 1.0,
+        'block': 0.8, 'sector': 0.8, 'building': 0.8, 'house': 0.8, 'opposite': 0.8, 'behind': 0.8,
+    }
+    MIN_LENGTH = 10
+    DETAIL_TOKENS = 12          # Descriptions this long get full marks for detail
+    RELEVANCE_SCALE = 0.45      # Cosine similarity that counts as a full match
+    RELEVANCE_WEIGHT = 0.7
+
+    def __init__(self):
+        terms = sorted(set(self.LOCATION_TERMS).union(*self.PROFILES.values()))
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+        self.categories = list(self.PROFILES)
+        self.idf = np.zeros(len(terms))
+        for weights in list(self.PROFILES.values()) + [self.LOCATION_TERMS]:
+            for term, weight in weights.items():
+                self.idf[self.vocabulary[term]] = max(self.idf[self.vocabulary[term]], weight)
+        # One unit-length profile row per category (location terms count for all of them)
+        profiles = np.zeros((len(self.categories), len(terms)))
+        for row, category in enumerate(self.categories):
+            for term, weight in list(self.PROFILES[category].items()) + list(self.LOCATION_TERMS.items()):
+                profiles[row, self.vocabulary[term]] = weight * (0.3 if term in self.LOCATION_TERMS else 1.0)
+        self.profiles = profiles / np.linalg.norm(profiles, axis=1, keepdims=True)
+
+    def term_matrix(self, descriptions):
+        """Sparse-built (documents x vocabulary) TF-IDF matrix plus token counts"""
+        rows, cols, lengths = [], [], []
+        for row, text in enumerate(descriptions):
+            tokens = TOKEN.findall(text.lower())
+            lengths.append(len(tokens))
+            for token in tokens:
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        counts = np.zeros((len(descriptions), len(self.vocabulary)))
+        np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+        tfidf = np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0) * self.idf
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        return tfidf / np.where(norms > 0, norms, 1.0), np.array(lengths, dtype=float)
+
+    def score(self, categories, descriptions):
+        vectors, lengths = self.term_matrix(descriptions)
+        similarity = vectors @ self.profiles.T                          # documents x categories
+        declared = np.array([self.categories.index(c) if c in self.categories else -1 for c in categories])
+        known = declared >= 0
+        own = np.where(known, similarity[np.arange(len(declared)), np.maximum(declared, 0)], 0.0)
+        best = similarity.argmax(axis=1) if len(descriptions) else np.zeros(0, dtype=int)
+        relevance = np.minimum(own / self.RELEVANCE_SCALE, 1.0)
+        detail = np.minimum(lengths / self.DETAIL_TOKENS, 1.0)
+        scores = np.round(self.RELEVANCE_WEIGHT * relevance + (1 - self.RELEVANCE_WEIGHT) * detail, 4)
+
+        threshold = validation_setting('THRESHOLD')
+        results = []
+        for i, description in enumerate(descriptions):
+            if len(description.strip()) < self.MIN_LENGTH:
+                results.append(ValidationResult(
+                    False, 0.0, f"Description too short. Minimum {self.MIN_LENGTH} characters required."
+                ))
+                continue
+            score = float(scores[i])
+            if not known[i]:
+                feedback = "Unknown category"
+            elif similarity[i].max() > 0 and best[i] != declared[i] and similarity[i, best[i]] > 2 * own[i]:
+                feedback = f"Description reads like a {self.categories[best[i]].lower()} complaint"
+            elif relevance[i] < 0.3:
+                feedback = "Description does not mention the problem clearly"
+            elif detail[i] < 0.5:
+                feedback = "Please add more detail, e.g. where exactly the problem is"
+            else:
+                feedback = "Description validated successfully"
+            results.append(ValidationResult(score >= threshold, score, feedback))
+        return results
+
+
+def _cache_key(version, category, description):
+    digest = hashlib.sha256(f"{category}\x00{description}".encode()).hexdigest()
+    return f"validation:{version}:{validation_setting('THRESHOLD')}:{digest}"
+
+
+def score_batch(complaints):
+    """Score ``complaints`` (only ``category`` and ``description`` are read), using the cache"""
+    scorer = get_scorer()
+    cache = caches[validation_setting('CACHE')]
+    keys = [_cache_key(scorer.version, c.category, c.description) for c in complaints]
+    cached = cache.get_many(keys)
+    todo = [i for i, key in enumerate(keys) if key not in cached]
+    if todo:
+        fresh = scorer.score([complaints[i].category for i in todo], [complaints[i].description for i in todo])
+        new_entries = {keys[i]: tuple(result) for i, result in zip(todo, fresh)}
+        cache.set_many(new_entries, timeout=validation_setting('CACHE_TIMEOUT'))
+        cached.update(new_entries)
+    return [ValidationResult(*cached[key]) for key in keys]
+
+
+def validate_complaints(complaints):
+    """Score ``complaints``, store the results on them and in the database; returns the results"""
+    if not complaints:
+        return []
+    scorer = get_scorer()
+    results = score_batch(complaints)
+    now = timezone.now()
+    for complaint, result in zip(complaints, results):
+        complaint.is_ai_validated = result.is_valid
+        complaint.ai_validation_score = result.score
+        complaint.ai_feedback = result.feedback
+        complaint.validation_model = scorer.version
+        complaint.validated_at = now
+        complaint.updated_at = now
+    with transaction.atomic():
+        Complaint.objects.bulk_update(complaints, RESULT_FIELDS, batch_size=500)
+        response_cache.invalidate(Complaint)
+    return results
+
+
+def validate_queryset(queryset, batch_size=None, on_batch=None):
+    """
+    Validate every complaint in ``queryset`` one batch at a time, calling
+    ``on_batch()`` after each; returns how many
+    """
+    batch_size = batch_size or validation_setting('BATCH_SIZE')
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), batch_size):
+        batch = list(Complaint.objects.filter(id__in=ids[start:start + batch_size]).only('id', 'category', 'description'))
+        validate_complaints(batch)
+        if on_batch is not None:
+            on_batch()
+    return len(ids)
+
+
+def stale_complaints():
+    """Complaints never validated, or validated by another scorer version"""
+    return Complaint.objects.exclude(validation_model=get_scorer().version)
+
+
+def revalidate(stale_only=True, on_batch=None):
+    return validate_queryset(stale_complaints() if stale_only else Complaint.objects.all(), on_batch=on_batch)
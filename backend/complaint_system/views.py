@@ -3,43 +3,82 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.urls import replace_query_param
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from .auth import ClaimsAuthentication, ClaimsUser, issue_tokens
+from .revocation import revoke_token
+from .storage import retry_on_locked
+from .throttling import BUCKET_THROTTLES
 from django.contrib.auth import authenticate
 from django.utils import timezone  # ADD THIS IMPORT
+from datetime import timedelta
 from .models import CustomUser, Complaint, Worker, Notification
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     ComplaintSerializer, WorkerSerializer, NotificationSerializer
 )
 from .permissions import IsAdminUser, IsWorkerUser, IsRegularUser, IsAdminOrWorker
+from . import exports, imports, inbox, metrics, push, response_cache, rollups, search, validation
+from .response_cache import cache_response
+from .conditional import conditional_get
+from .jobs import enqueue
+from .renderers import streaming_json_response, streaming_response
+from .pagination import (
+    NewestFirstCursorPagination, UserCursorPagination, WorkerCursorPagination, paginated_response
+)
+from .assignment import (
+    assign_complaint, auto_assign_complaint, batch_assign_pending, change_complaint_status, reserve_worker
+)
 
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-
+from django.views import View
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+import asyncio
+import hmac
+import json
+import time
+from queue import Empty
+
+
+class EagerLoadingViewMixin:
+    """Load the relations the view's serializer declares, for list and detail alike"""
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
 
 
 # Authentication Views
 class UserRegistrationView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = 'register'
     
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            
             return Response({
                 'message': 'User registered successfully',
                 'user': UserProfileSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+                'tokens': issue_tokens(user),
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UserLoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = BUCKET_THROTTLES
+    throttle_scope = 'login'
     
     @method_decorator(csrf_exempt)
     def dispatch(self, request, *args, **kwargs):
@@ -57,7 +96,6 @@ class UserLoginView(APIView):
         
         if user is not None:
             if user.is_active:
-                refresh = RefreshToken.for_user(user)
                 return Response({
                     'message': 'Login successful',
                     'user': {
@@ -66,10 +104,7 @@ class UserLoginView(APIView):
                         'email': user.email,
                         'role': user.role
                     },
-                    'tokens': {
-                        'refresh': str(refresh),
-                        'access': str(refresh.access_token),
-                    }
+                    'tokens': issue_tokens(user),
                 }, status=status.HTTP_200_OK)
             else:
                 return Response({'error': 'Account disabled'}, 
@@ -80,24 +115,33 @@ class UserLoginView(APIView):
 
 class UserLogoutView(APIView):
     def post(self, request):
+        """Revoke the refresh token and the access token this request was made with"""
         try:
-            refresh_token = request.data.get('refresh_token')
-            token = RefreshToken(refresh_token)
-            token.blacklist()
-            return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
-        except Exception as e:
+            token = RefreshToken(request.data.get('refresh_token'))
+        except TokenError:
+            return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
+        if ClaimsUser(token).id != request.user.id:
             return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        revoke_token(token)
+        if isinstance(request.auth, Token):
+            revoke_token(request.auth)
+        return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
 
 class UserProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_object(self):
+        # request.user may be a token user with no row behind it
+        return CustomUser.objects.get(id=self.request.user.id)
+
     def get(self, request):
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(self.get_object())
         return Response(serializer.data)
 
     def patch(self, request):
         """Partial update of user profile"""
-        serializer = UserProfileSerializer(request.user, data=request.data, partial=True)
+        serializer = UserProfileSerializer(self.get_object(), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -109,17 +153,24 @@ class AdminUserManagementView(APIView):
     permission_classes = [IsAdminUser]
     
     def get(self, request):
+        """One cursor page, or every user streamed in a single response with ``?stream=true``"""
         users = CustomUser.objects.all()
-        serializer = UserProfileSerializer(users, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('stream') == 'true':
+            return streaming_json_response(request, users.order_by('id'), UserProfileSerializer)
+        return paginated_response(self, users, UserProfileSerializer, UserCursorPagination)
 
 class WorkerManagementView(APIView):
     permission_classes = [IsAdminUser]
     
+    # Reservations change active_complaint_count without invalidating Worker
+    # responses (every assignment would), so the load shown may lag by 30s
+    @cache_response(Worker, CustomUser, timeout=30)
     def get(self, request):
+        """One cursor page, or every worker streamed in a single response with ``?stream=true``"""
         workers = Worker.objects.all()
-        serializer = WorkerSerializer(workers, many=True)
-        return Response(serializer.data)
+        if request.query_params.get('stream') == 'true':
+            return streaming_json_response(request, workers.order_by('id'), WorkerSerializer)
+        return paginated_response(self, workers, WorkerSerializer, WorkerCursorPagination)
     
     def post(self, request):
         user_id = request.data.get('user_id')
@@ -143,10 +194,18 @@ from .serializers import ComplaintSerializer
 
 from complaint_system.models import Complaint
 
-class ComplaintViewSet(viewsets.ModelViewSet):
+class ComplaintViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     serializer_class = ComplaintSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
     queryset = Complaint.objects.all()  # <-- add this default
+    throttle_scope = 'complaint-create'
+
+    def get_throttles(self):
+        # Only submissions are rate limited; reads are cheap and cached
+        if self.action == 'create':
+            return [throttle() for throttle in BUCKET_THROTTLES]
+        return super().get_throttles()
 
     def get_queryset(self):
         user = self.request.user
@@ -154,15 +213,25 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             return Complaint.objects.all()
         return Complaint.objects.none()
 
+    @conditional_get
+    @cache_response(Complaint)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        retry_on_locked(serializer.save)(user_id=self.request.user.id)
 
 
 
-class WorkerViewSet(viewsets.ModelViewSet):
+class WorkerViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     queryset = Worker.objects.all()
     serializer_class = WorkerSerializer
     permission_classes = [IsAdminUser]  # Only admin can manage workers
+    pagination_class = WorkerCursorPagination
     
     @action(detail=True, methods=['post'])
     def update_availability(self, request, pk=None):
@@ -173,48 +242,183 @@ class WorkerViewSet(viewsets.ModelViewSet):
         worker.save()
         return Response({'message': 'Availability updated successfully'})
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAdminUser]  # Only admin can manage users
+    pagination_class = UserCursorPagination
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'WORKER':
-            return Notification.objects.filter(worker__user=user)
+            return Notification.objects.filter(worker_id=user.worker_id)
         return Notification.objects.none()  # Only workers get notifications
 
 # Custom API Views
 class DashboardStats(APIView):
     permission_classes = [IsAdminUser]
     
+    # The recent-complaints window slides, so entries also expire after a minute
+    @cache_response(Complaint, CustomUser, timeout=60)
     def get(self, request):
         from django.utils import timezone
         from datetime import timedelta
         
-        total_users = CustomUser.objects.count()
-        total_complaints = Complaint.objects.count()
-        resolved_complaints = Complaint.objects.filter(status='RESOLVED').count()
-        pending_complaints = Complaint.objects.filter(status='PENDING').count()
+        stats = Complaint.objects.get_dashboard_stats()
         
-        # Recent complaints (last 7 days)
+        # Recent complaints (last 7 days, to the hour)
         week_ago = timezone.now() - timedelta(days=7)
-        recent_complaints = Complaint.objects.filter(created_at__gte=week_ago).count()
-        
-        stats = {
-            'total_users': total_users,
-            'total_complaints': total_complaints,
-            'resolved_complaints': resolved_complaints,
-            'pending_complaints': pending_complaints,
-            'recent_complaints': recent_complaints,
-            'resolution_rate': (resolved_complaints / total_complaints * 100) if total_complaints > 0 else 0
-        }
+        stats['recent_complaints'] = rollups.created_since(week_ago)
         return Response(stats)
 
+class ComplaintExport(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """
+        Stream complaints with user and worker details as CSV or NDJSON
+        (``?type=``), filtered by ``from``/``to`` (created), ``status`` and
+        ``category``.
+        """
+        export_type = request.query_params.get('type', 'csv')
+        if export_type not in exports.CONTENT_TYPES:
+            return Response({'error': 'type must be "csv" or "ndjson"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        bounds = {}
+        for param in ('from', 'to'):
+            if request.query_params.get(param):
+                bounds[param] = rollups.parse_moment(request.query_params[param])
+                if bounds[param] is None:
+                    return Response({'error': f'{param} must be an ISO date or date-time'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+        complaint_status = request.query_params.get('status')
+        if complaint_status and complaint_status not in dict(Complaint.STATUS_CHOICES):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        category = request.query_params.get('category')
+        if category and category not in dict(Complaint.CATEGORY_CHOICES):
+            return Response({'error': 'Invalid category'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        complaints = exports.export_queryset(bounds.get('from'), bounds.get('to'), complaint_status, category)
+        return streaming_response(
+            exports.export_chunks(complaints, export_type),
+            exports.CONTENT_TYPES[export_type],
+            request=request,
+            filename=f"complaints-{timezone.now():%Y%m%d-%H%M%S}.{export_type}",
+        )
+
+class ResponseCacheStats(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Response cache hits, misses and invalidations in this server process"""
+        return Response(response_cache.stats())
+
+class ComplaintTrends(APIView):
+    permission_classes = [IsAdminUser]
+    
+    # Longest range served per bucket size, to keep responses bounded
+    MAX_RANGE = {'hour': timedelta(days=92), 'day': timedelta(days=3660)}
+    
+    def get(self, request):
+        """Complaint counts per time bucket, category and status from the rollup tables"""
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in rollups.BUCKETS:
+            return Response({'error': 'bucket must be "hour" or "day"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        end = timezone.now()
+        if request.query_params.get('to'):
+            end = rollups.parse_moment(request.query_params['to'])
+        start = end - timedelta(days=30) if end else None
+        if request.query_params.get('from'):
+            start = rollups.parse_moment(request.query_params['from'])
+        if start is None or end is None:
+            return Response({'error': 'from/to must be ISO dates or date-times'}, status=status.HTTP_400_BAD_REQUEST)
+        if start >= end or end - start > self.MAX_RANGE[bucket]:
+            return Response({'error': f'Invalid range for bucket "{bucket}"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rows = rollups.trends(
+            start, end, bucket=bucket,
+            category=request.query_params.get('category'),
+            status=request.query_params.get('status'),
+        )
+        return Response({
+            'bucket': bucket,
+            'from': start,
+            'to': end,
+            'results': list(rows),
+        })
+
+class ImportComplaints(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        """
+        Bulk-import complaints from an uploaded ``file`` (or the raw request
+        body) in CSV or NDJSON (``?type=``). Returns counts and per-row errors.
+        """
+        import_type = request.query_params.get('type', 'csv')
+        if import_type not in exports.CONTENT_TYPES:
+            return Response({'error': 'type must be "csv" or "ndjson"'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.content_type.startswith('multipart/form-data'):
+            stream = request.FILES.get('file')
+        else:
+            stream = request.stream  # Raw body, read as it is parsed
+        if stream is None:
+            return Response({'error': 'No data uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        report = imports.import_complaints(
+            imports.read_rows(stream, import_type),
+            default_owner_id=request.user.id,
+            assign=request.query_params.get('assign', 'true') != 'false',
+        )
+        return Response(report, status=status.HTTP_201_CREATED if report['imported'] else status.HTTP_400_BAD_REQUEST)
+
+class SearchComplaints(APIView):
+    permission_classes = [IsAdminUser]
+    page_size = 20
+    max_page_size = 100
+    
+    def get(self, request):
+        """
+        Ranked full-text search over descriptions: ``?q=`` (every word must
+        match, ``word*`` for a prefix), optional ``category``, ``page`` and
+        ``page_size``. Best matches come first; only the newest
+        ``search.RANK_WINDOW`` matches are ranked and paged.
+        """
+        query = request.query_params.get('q', '')
+        category = request.query_params.get('category', '').upper() or None
+        if category and category not in dict(Complaint.CATEGORY_CHOICES):
+            return Response({'error': 'Unknown category'}, status=status.HTTP_400_BAD_REQUEST)
+        if search.match_expression(query) is None:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # One extra hit tells whether there is a next page without counting every match
+        hits = search.search(query, category, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(hits) > page_size
+        scores = dict(hits[:page_size])
+        found = ComplaintSerializer.setup_eager_loading(Complaint.objects.all()).in_bulk(list(scores))
+        complaints = [found[complaint_id] for complaint_id in scores if complaint_id in found]
+        results = ComplaintSerializer(complaints, many=True, context={'request': request}).data
+        for row, complaint in zip(results, complaints):
+            row['relevance'] = round(-scores[complaint.id], 4)  # bm25 is lower-is-better
+        
+        url = request.build_absolute_uri()
+        return Response({
+            'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'results': results,
+        })
+
 class AssignComplaint(APIView):
     permission_classes = [IsAdminUser]
     
@@ -226,11 +430,11 @@ class AssignComplaint(APIView):
             
             if not worker.is_available:
                 return Response({'error': 'Worker is not available'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            complaint.assigned_worker = worker
-            complaint.status = 'ASSIGNED'
-            complaint.assigned_at = timezone.now()
-            complaint.save()
+            if not reserve_worker(worker.id):
+                return Response({'error': 'Worker has no spare capacity'}, status=status.HTTP_400_BAD_REQUEST)
+            if not assign_complaint(complaint, worker):
+                return Response({'error': 'Complaint was modified concurrently, please retry'},
+                                status=status.HTTP_409_CONFLICT)
             
             return Response({'message': 'Complaint assigned successfully'})
         except Complaint.DoesNotExist:
@@ -247,16 +451,16 @@ class UpdateComplaintStatus(APIView):
             new_status = request.data.get('status')
             
             # Authorization check
-            if request.user.role == 'WORKER' and complaint.assigned_worker.user != request.user:
+            if request.user.role == 'WORKER' and (complaint.assigned_worker_id is None or
+                                                  complaint.assigned_worker_id != request.user.worker_id):
                 return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
-            if request.user.role == 'USER' and complaint.user != request.user:
+            if request.user.role == 'USER' and complaint.user_id != request.user.id:
                 return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
             
             if new_status in dict(Complaint.STATUS_CHOICES):
-                complaint.status = new_status
-                if new_status == 'RESOLVED':
-                    complaint.resolved_at = timezone.now()
-                complaint.save()
+                if not change_complaint_status(complaint, new_status):
+                    return Response({'error': 'Complaint was modified concurrently, please retry'},
+                                    status=status.HTTP_409_CONFLICT)
                 return Response({'message': 'Status updated successfully'})
             return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         except Complaint.DoesNotExist:
@@ -269,7 +473,7 @@ class UpdateWorkerAvailability(APIView):
         try:
             worker = Worker.objects.get(id=pk)
             # Workers can only update their own availability
-            if request.user.role == 'WORKER' and worker.user != request.user:
+            if request.user.role == 'WORKER' and worker.id != request.user.worker_id:
                 return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
             
             is_available = request.data.get('is_available')
@@ -282,63 +486,131 @@ class UpdateWorkerAvailability(APIView):
 class AvailableWorkers(APIView):
     permission_classes = [IsAdminUser]
     
+    @cache_response(Worker, CustomUser, timeout=30)  # Load may lag, as in WorkerManagementView
     def get(self, request):
         workers = Worker.objects.filter(is_available=True)
-        serializer = WorkerSerializer(workers, many=True)
-        return Response(serializer.data)
+        return paginated_response(self, workers, WorkerSerializer, WorkerCursorPagination)
 
 class ValidateComplaintAI(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, pk):
-        try:
-            complaint = Complaint.objects.get(id=pk)
-            # Simple AI validation simulation
-            description = complaint.description
-            
-            # Basic validation logic (you'll replace this with actual AI)
-            is_valid = len(description) >= 10  # Minimum length
-            score = min(len(description) / 100, 1.0)  # Simple scoring
-            
-            complaint.is_ai_validated = is_valid
-            complaint.ai_validation_score = score
-            complaint.ai_feedback = "Description meets basic requirements" if is_valid else "Description too short"
-            complaint.validated_description = description  # In real app, this would be corrected version
-            complaint.save()
-            
-            return Response({
-                'is_valid': is_valid,
-                'score': float(score),
-                'feedback': complaint.ai_feedback
-            })
-        except Complaint.DoesNotExist:
+        complaint = Complaint.objects.filter(id=pk).only('id', 'category', 'description').first()
+        if complaint is None:
             return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        result, = validation.validate_complaints([complaint])
+        return Response({
+            'is_valid': result.is_valid,
+            'score': result.score,
+            'feedback': result.feedback
+        })
+
+class ValidateComplaintsBatch(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        """
+        Validate ``{"ids": [...]}`` (at most 1000) inline, or queue a
+        revalidation of everything with ``{"all": true, "stale_only": true}``
+        """
+        if request.data.get('all'):
+            stale_only = request.data.get('stale_only', True) not in (False, 'false')
+            enqueue('complaints.revalidate', {'stale_only': stale_only})
+            return Response({'message': 'Revalidation queued', 'stale_only': stale_only},
+                            status=status.HTTP_202_ACCEPTED)
+        
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > 1000:
+            return Response({'error': 'At most 1000 ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(value) for value in ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        complaints = list(Complaint.objects.filter(id__in=ids).only('id', 'category', 'description'))
+        results = validation.validate_complaints(complaints)
+        return Response({
+            'validated': len(complaints),
+            'missing': sorted(set(ids) - {c.id for c in complaints}),
+            'results': [
+                {'id': c.id, 'is_valid': r.is_valid, 'score': r.score, 'feedback': r.feedback}
+                for c, r in zip(complaints, results)
+            ],
+        })
 
 class UserComplaints(APIView):
     permission_classes = [IsRegularUser]
     
+    def get_queryset(self):
+        return Complaint.objects.filter(user_id=self.request.user.id)
+    
+    @conditional_get
     def get(self, request):
-        complaints = Complaint.objects.filter(user=request.user)
-        serializer = ComplaintSerializer(complaints, many=True)
-        return Response(serializer.data)
+        return paginated_response(self, self.get_queryset(), ComplaintSerializer)
 
 class UserNotifications(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         if request.user.role == 'WORKER':
-            notifications = Notification.objects.filter(worker__user=request.user)
-            serializer = NotificationSerializer(notifications, many=True)
-            return Response(serializer.data)
-        return Response([])  # Only workers have notifications
+            notifications = Notification.objects.filter(worker_id=request.user.worker_id)
+        else:
+            notifications = Notification.objects.none()  # Only workers have notifications
+        return paginated_response(self, notifications, NotificationSerializer)
+
+class UnreadNotificationCount(APIView):
+    permission_classes = [IsWorkerUser]
+    
+    def get(self, request):
+        """Badge count, read from the worker's counter rather than the notifications"""
+        worker_id = request.user.worker_id
+        if worker_id is None:
+            return Response({'error': 'Worker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'unread': inbox.unread_count(worker_id)})
+
+class MarkAllNotificationsRead(APIView):
+    permission_classes = [IsWorkerUser]
+    
+    def post(self, request):
+        worker_id = request.user.worker_id
+        if worker_id is None:
+            return Response({'error': 'Worker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        marked = inbox.mark_read(worker_id)
+        return Response({'marked': marked, 'unread': inbox.unread_count(worker_id)})
+
+class MarkNotificationsRead(APIView):
+    permission_classes = [IsWorkerUser]
+    
+    def post(self, request):
+        """Mark the notifications in ``?ids=1,2,3`` as read"""
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            return Response({'error': 'ids must be a comma-separated list of integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'error': 'ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > 1000:
+            return Response({'error': 'At most 1000 ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        worker_id = request.user.worker_id
+        if worker_id is None:
+            return Response({'error': 'Worker profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        marked = inbox.mark_read(worker_id, ids=ids)
+        return Response({'marked': marked, 'unread': inbox.unread_count(worker_id)})
 
 class WorkerComplaints(APIView):
     permission_classes = [IsWorkerUser]
     
+    def get_queryset(self):
+        return Complaint.objects.filter(assigned_worker_id=self.request.user.worker_id)
+    
+    @conditional_get
     def get(self, request):
-        complaints = Complaint.objects.filter(assigned_worker__user=request.user)
-        serializer = ComplaintSerializer(complaints, many=True)
-        return Response(serializer.data)
+        return paginated_response(self, self.get_queryset(), ComplaintSerializer)
 
 class AutoAssignComplaint(APIView):
     permission_classes = [IsAdminUser]
@@ -346,29 +618,160 @@ class AutoAssignComplaint(APIView):
     def post(self, request, pk):
         try:
             complaint = Complaint.objects.get(id=pk)
-            # Simple auto-assignment logic (nearest available worker)
-            available_workers = Worker.objects.filter(is_available=True)
+            # Nearest available worker with spare capacity, via the spatial index
+            worker = auto_assign_complaint(
+                complaint,
+                message=f"New complaint auto-assigned to you: {complaint.get_category_display()}"
+            )
             
-            if available_workers.exists():
-                # For now, assign to first available worker
-                # In real app, implement distance calculation
-                worker = available_workers.first()
-                complaint.assigned_worker = worker
-                complaint.status = 'ASSIGNED'
-                complaint.assigned_at = timezone.now()
-                complaint.save()
-                
-                # Create notification
-                Notification.objects.create(
-                    worker=worker,
-                    complaint=complaint,
-                    message=f"New complaint auto-assigned to you: {complaint.get_category_display()}"
-                )
-                
+            if worker is not None:
                 return Response({
                     'message': 'Complaint auto-assigned successfully',
                     'assigned_worker': WorkerSerializer(worker).data
                 })
             return Response({'error': 'No available workers'}, status=status.HTTP_400_BAD_REQUEST)
         except Complaint.DoesNotExist:
-            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({'error': 'Complaint not found'}, status=status.HTTP_404_NOT_FOUND)
+
+class BatchAutoAssignComplaints(APIView):
+    permission_classes = [IsAdminUser]
+    
+    def post(self, request):
+        """Assign all pending complaints in one global matching pass"""
+        limit = request.data.get('limit')
+        try:
+            limit = int(limit) if limit else None
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        assigned, considered = batch_assign_pending(limit=limit)
+        return Response({
+            'message': 'Batch assignment completed',
+            'pending_considered': considered,
+            'assigned': assigned,
+            'unassigned': considered - assigned,
+        })
+
+# Real-time push
+class NotificationStream(View):
+    """
+    Server-Sent Events stream of a worker's new notifications.
+    
+    A plain async Django view, since DRF views are synchronous: served by
+    an ASGI server (``backend.asgi``) each open stream costs a coroutine
+    rather than a thread. Served over WSGI a stream holds a thread, so it
+    ends after ``PUSH['SYNC_STREAM_SECONDS']`` and ``EventSource`` resumes
+    from ``Last-Event-ID``. ``EventSource`` cannot send headers, so the JWT
+    access token may also be passed as ``?token=``.
+    """
+    
+    async def get(self, request):
+        worker_id = await sync_to_async(self.authenticate_worker)(request)
+        if worker_id is None:
+            return JsonResponse({'error': 'Worker authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        try:
+            last_event_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0)
+        except ValueError:
+            last_event_id = 0
+        if isinstance(request, ASGIRequest):
+            events = self.events(worker_id, last_event_id)
+        else:
+            # WSGI would buffer an async iterator to the end before sending anything
+            events = self.bounded_events(worker_id, last_event_id)
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Don't let nginx hold events back
+        return response
+    
+    def authenticate_worker(self, request):
+        authentication = ClaimsAuthentication()
+        try:
+            raw_token = request.GET.get('token')
+            if raw_token:
+                user = authentication.get_user(authentication.get_validated_token(raw_token))
+            else:
+                user = (authentication.authenticate(request) or (None,))[0]
+        except (InvalidToken, AuthenticationFailed):
+            return None
+        if user is None or user.role != 'WORKER':
+            return None
+        return user.worker_id
+    
+    def missed_events(self, worker_id, last_event_id):
+        notifications = Notification.objects.filter(worker_id=worker_id, id__gt=last_event_id).order_by('-id')
+        return [push.notification_event(n) for n in reversed(notifications[:push.push_setting('REPLAY_LIMIT')])]
+    
+    async def events(self, worker_id, last_event_id):
+        subscription = push.broker.subscribe(worker_id)
+        _, queue = subscription
+        keepalive = push.push_setting('KEEPALIVE_SECONDS')
+        try:
+            yield "retry: 3000\n\n"
+            if last_event_id:
+                for event in await sync_to_async(self.missed_events)(worker_id, last_event_id):
+                    last_event_id = event['id']
+                    yield self.format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event['id'] > last_event_id:
+                    yield self.format_event(event)
+        finally:
+            push.broker.unsubscribe(worker_id, subscription)
+    
+    def bounded_events(self, worker_id, last_event_id):
+        """``events()`` for a blocking thread, closed after ``SYNC_STREAM_SECONDS``"""
+        subscription = push.broker.subscribe(worker_id, threaded=True)
+        _, queue = subscription
+        keepalive = push.push_setting('KEEPALIVE_SECONDS')
+        deadline = time.monotonic() + push.push_setting('SYNC_STREAM_SECONDS')
+        try:
+            yield "retry: 3000\n\n"
+            if last_event_id:
+                for event in self.missed_events(worker_id, last_event_id):
+                    last_event_id = event['id']
+                    yield self.format_event(event)
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = queue.get(timeout=min(keepalive, remaining))
+                except Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event['id'] > last_event_id:
+                    last_event_id = event['id']
+                    yield self.format_event(event)
+        finally:
+            push.broker.unsubscribe(worker_id, subscription)
+    
+    def format_event(self, event):
+        return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
+
+# Monitoring
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint for every server and job process on the host.
+    
+    Open to the scraper's bearer token (``METRICS['TOKEN']``) and to admins'
+    JWTs.
+    """
+    
+    def get(self, request):
+        if not self.authorized(request):
+            return JsonResponse({'error': 'Metrics token or admin credentials required'},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    def authorized(self, request):
+        token = metrics.metrics_setting('TOKEN')
+        header = request.headers.get('Authorization', '')
+        if token and hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            return True
+        try:
+            user = (ClaimsAuthentication().authenticate(request) or (None,))[0]
+        except (InvalidToken, AuthenticationFailed):
+            return False
+        return user is not None and user.role == 'ADMIN'